@@ -0,0 +1,170 @@
+"""
+Compare laserMeasure.intersection.OutlineIntersector
+to fontTools.misc.bezierTools on real glyphs.
+
+    python intersectionValidation.py MyFont.ufo MyFont.ttf
+
+UFOs are read with defcon and binary fonts with
+fontTools. Every glyph is cut with horizontal, vertical
+and diagonal lines across its bounds. The hits from both
+are compared and the mismatches and timings are printed.
+"""
+
+import os
+import sys
+import time
+from fontTools.misc import bezierTools
+from fontTools.pens.boundsPen import BoundsPen
+from fontTools.pens.recordingPen import DecomposingRecordingPen
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "source", "code"))
+
+from laserMeasure.geometry import RelativeSegmentsPen
+from laserMeasure.intersection import OutlineIntersector
+
+lineCount = 20
+tolerance = 0.01
+
+
+def iterateGlyphs(path):
+    # components are decomposed
+    if os.path.splitext(path)[1].lower() == ".ufo":
+        import defcon
+        glyphSet = defcon.Font(path)
+        glyphNames = glyphSet.keys()
+    else:
+        from fontTools.ttLib import TTFont
+        font = TTFont(path)
+        glyphSet = font.getGlyphSet()
+        glyphNames = font.getGlyphOrder()
+    for glyphName in glyphNames:
+        glyph = glyphSet[glyphName]
+        pen = DecomposingRecordingPen(glyphSet)
+        glyph.draw(pen)
+        yield glyphName, pen.replay, glyph.width
+
+def makeLines(bounds):
+    xMin, yMin, xMax, yMax = bounds
+    xMin -= 10
+    yMin -= 10
+    xMax += 10
+    yMax += 10
+    lines = []
+    for i in range(1, lineCount + 1):
+        f = i / (lineCount + 1)
+        y = yMin + (yMax - yMin) * f
+        x = xMin + (xMax - xMin) * f
+        lines.append(((xMin, y), (xMax, y)))
+        lines.append(((x, yMin), (x, yMax)))
+        lines.append(((xMin, yMin + (yMax - yMin) * f), (xMax, yMax - (yMax - yMin) * f)))
+    return lines
+
+def referenceIntersections(pieces, line):
+    # the line is treated as infinite by fontTools
+    # so the hits are limited to the line's extent.
+    found = []
+    for segmentType, points in pieces:
+        for hit in bezierTools.segmentSegmentIntersections(list(points), list(line)):
+            if not (-1e-9 <= hit.t1 <= 1 + 1e-9):
+                continue
+            if not (-1e-9 <= hit.t2 <= 1 + 1e-9):
+                continue
+            found.append(tuple(hit.pt))
+    return clusterPoints(found)
+
+def clusterPoints(points):
+    # shared on curves are found by both segments
+    clustered = []
+    for point in points:
+        for other in clustered:
+            if abs(point[0] - other[0]) <= tolerance and abs(point[1] - other[1]) <= tolerance:
+                break
+        else:
+            clustered.append(point)
+    return sorted(clustered, key=lambda point: (round(point[0], 3), round(point[1], 3)))
+
+def collinearEnds(pieces, line):
+    # fontTools doesn't consistently report the ends of
+    # segments that run along the line. those are
+    # compared separately.
+    (x1, y1), (x2, y2) = line
+    length = ((x2 - x1) ** 2 + (y2 - y1) ** 2) ** 0.5
+    ends = []
+    for segmentType, points in pieces:
+        if segmentType != "line":
+            continue
+        across = [
+            abs((y - y1) * (x2 - x1) - (x - x1) * (y2 - y1)) / length
+            for (x, y) in points
+        ]
+        if max(across) <= tolerance:
+            ends.extend(points)
+    return ends
+
+def removePoints(points, removals):
+    return [
+        point for point in points
+        if not any(
+            abs(point[0] - x) <= tolerance and abs(point[1] - y) <= tolerance
+            for (x, y) in removals
+        )
+    ]
+
+def pointsMatch(points1, points2):
+    if len(points1) != len(points2):
+        return False
+    for (x1, y1), (x2, y2) in zip(points1, points2):
+        if abs(x1 - x2) > tolerance or abs(y1 - y2) > tolerance:
+            return False
+    return True
+
+def validate(path):
+    glyphCount = 0
+    lineTotal = 0
+    mismatches = []
+    collinear = 0
+    engineTime = 0
+    referenceTime = 0
+    for glyphName, draw, width in iterateGlyphs(path):
+        boundsPen = BoundsPen(None)
+        draw(boundsPen)
+        if boundsPen.bounds is None:
+            continue
+        segmentsPen = RelativeSegmentsPen()
+        draw(segmentsPen)
+        intersector = OutlineIntersector(segmentsPen.segments, width)
+        glyphCount += 1
+        for line in makeLines(boundsPen.bounds):
+            lineTotal += 1
+            start = time.perf_counter()
+            found = intersector.intersectLine(line)
+            engineTime += time.perf_counter() - start
+            start = time.perf_counter()
+            expected = referenceIntersections(intersector.segments, line)
+            referenceTime += time.perf_counter() - start
+            found = clusterPoints(found)
+            if not pointsMatch(found, expected):
+                ends = collinearEnds(intersector.segments, line)
+                if ends and pointsMatch(removePoints(found, ends), removePoints(expected, ends)):
+                    collinear += 1
+                    continue
+                mismatches.append((glyphName, line, found, expected))
+    print(path)
+    print(f"  glyphs: {glyphCount}")
+    print(f"  lines: {lineTotal}")
+    print(f"  mismatches: {len(mismatches)}")
+    print(f"  differences only at collinear segment ends: {collinear}")
+    if lineTotal:
+        print(f"  engine: {engineTime / lineTotal * 1000000:.1f} µs per line")
+        print(f"  fontTools: {referenceTime / lineTotal * 1000000:.1f} µs per line")
+    for glyphName, line, found, expected in mismatches[:20]:
+        print(f"  {glyphName} {line}")
+        print(f"    engine:    {found}")
+        print(f"    fontTools: {expected}")
+    return not mismatches
+
+
+if __name__ == "__main__":
+    results = [validate(path) for path in sys.argv[1:]]
+    if not all(results):
+        sys.exit(1)
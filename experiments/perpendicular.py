@@ -4,6 +4,7 @@ import defcon
 from mojo.subscriber import Subscriber, registerGlyphEditorSubscriber
 from lib.tools import bezierTools
 from fontTools.misc import bezierTools as ftBezierTools
+from fontTools.pens.basePen import decomposeQuadraticSegment
 from mojo import tools
 
 radius = 25
@@ -124,24 +125,32 @@ class PerpendicularTest(Subscriber):
                 radius
             )
         elif segmentType == "qcurve":
-            # XXX
-            # this will require conversion to
-            # cubic and I don't want to deal
-            # with that right now so...
-            # but, it's possible.
-            return
+            # quadratics are handled natively: the spline
+            # is split at its implied on curves and the
+            # nearest point on each piece is found in
+            # closed form.
+            quadratic = nearestQuadraticSplinePoint(segmentPoints, cursorPoint)
+            if quadratic is None:
+                return
+            distance, quadraticPoints, t = quadratic
+            if distance > radius:
+                return
         else:
             return
-        if intersection is None or not intersection.points:
-            return
-        for point in intersection.points:
+        if segmentType == "qcurve":
+            hitPoints = [ftBezierTools.quadraticPointAtT(*quadraticPoints, t)]
+        else:
+            if intersection is None or not intersection.points:
+                return
+            hitPoints = [(point.x, point.y) for point in intersection.points]
+            t = sum(intersection.t) / len(intersection.t)
+        for point in hitPoints:
             self.pointsLayer.appendOvalSublayer(
                 size=(5, 5),
-                position=(point.x, point.y),
+                position=point,
                 fillColor=(1, 0, 0, 0.75),
                 anchor=(0.5, 0.5)
             )
-        t = sum(intersection.t) / len(intersection.t)
         if segmentType == "line":
             angleAnchor1 = segmentPoints[0]
             angleAnchor2 = segmentPoints[1]
@@ -162,8 +171,15 @@ class PerpendicularTest(Subscriber):
             angleAnchor1 = splitSegment1[-2]
             angleAnchor2 = splitSegment2[1]
         else:
-            # XXX see note about qcurve above
-            pass
+            splitSegment1, splitSegment2 = ftBezierTools.splitQuadraticAtT(
+                quadraticPoints[0],
+                quadraticPoints[1],
+                quadraticPoints[2],
+                t
+            )
+            hit = splitSegment1[-1]
+            angleAnchor1 = splitSegment1[-2]
+            angleAnchor2 = splitSegment2[1]
         # highlight the intersection
         self.insertionPointLayer.setPosition(hit)
         self.insertionPointAngle.setStartPoint(angleAnchor1)
@@ -219,5 +235,38 @@ class PerpendicularTest(Subscriber):
             self.foundLine.setEndPoint(intersection)
 
 
+def nearestQuadraticSplinePoint(points, location):
+    """
+    Return (distance, piecePoints, t) for the point on
+    the quadratic spline nearest to location.
+    """
+    lx, ly = location
+    best = None
+    start = points[0]
+    for offCurve, onCurve in decomposeQuadraticSegment(points[1:]):
+        (x0, y0), (x1, y1), (x2, y2) = start, offCurve, onCurve
+        ax = x0 - 2 * x1 + x2
+        ay = y0 - 2 * y1 + y2
+        bx = 2 * (x1 - x0)
+        by = 2 * (y1 - y0)
+        cx = x0 - lx
+        cy = y0 - ly
+        # the derivative of the squared distance is a cubic
+        roots = ftBezierTools.solveCubic(
+            2 * (ax * ax + ay * ay),
+            3 * (ax * bx + ay * by),
+            bx * bx + by * by + 2 * (ax * cx + ay * cy),
+            bx * cx + by * cy
+        )
+        for t in [0, 1] + [t for t in roots if 0 < t < 1]:
+            x = ax * t * t + bx * t + x0
+            y = ay * t * t + by * t + y0
+            distance = math.hypot(x - lx, y - ly)
+            if best is None or distance < best[0]:
+                best = (distance, (start, offCurve, onCurve), t)
+        start = onCurve
+    return best
+
+
 if __name__ == '__main__':
     registerGlyphEditorSubscriber(PerpendicularTest)
\ No newline at end of file
@@ -0,0 +1,131 @@
+"""
+Time laserMeasure.selection.SelectionStatistics on large
+selections and check the incremental updates.
+
+    python selectionBenchmark.py
+
+Every statistic that the expanded display shows is
+computed for 5000 point selections of a few shapes, from
+scratch and after a small change. The best time of a
+few runs has to fit in a 60 fps frame. The statistics
+after a series of small changes have to match the ones
+computed from scratch.
+"""
+
+import gc
+import os
+import sys
+import math
+import time
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "source", "code"))
+
+from laserMeasure.selection import SelectionStatistics
+
+pointCount = 5000
+changeCount = 10
+runCount = 10
+frameBudget = 1 / 60
+checkSteps = 200
+
+
+def makeSelections(randomizer):
+    uniform = [
+        (randomizer.randint(0, 1000), randomizer.randint(-200, 800))
+        for i in range(pointCount)
+    ]
+    stems = [
+        (randomizer.choice((50, 130, 400, 480, 600)) + randomizer.randint(0, 2), randomizer.randint(-200, 800))
+        for i in range(pointCount)
+    ]
+    outline = []
+    for i in range(pointCount):
+        angle = randomizer.random() * math.pi * 2
+        outline.append((round(500 + 300 * math.cos(angle)), round(300 + 400 * math.sin(angle))))
+    return dict(uniform=uniform, stems=stems, outline=outline)
+
+def measure(statistics, points):
+    statistics.update(points)
+    return (
+        statistics.measurements(),
+        statistics.nearestPair(),
+        statistics.farthestPair(),
+        statistics.xClusters(),
+        statistics.yClusters(),
+        statistics.dxHistogram(),
+        statistics.dyHistogram()
+    )
+
+def change(randomizer, points):
+    points = list(points)
+    for i in range(changeCount // 2):
+        points.pop(randomizer.randrange(len(points)))
+    for i in range(changeCount // 2):
+        points.append((randomizer.randint(-100, 1100), randomizer.randint(-300, 900)))
+    return points
+
+def timed(function):
+    # like timeit, garbage collection is paused
+    # so that it doesn't land in one of the runs.
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        function()
+        return time.perf_counter() - start
+    finally:
+        gc.enable()
+
+def bestTime(function):
+    best = None
+    for i in range(runCount):
+        duration = timed(function)
+        if best is None or duration < best:
+            best = duration
+    return best
+
+def compare(statistics, points):
+    # the pairs are compared by distance because
+    # ties may be broken differently.
+    fresh = SelectionStatistics()
+    fresh.update(points)
+    assert statistics.measurements() == fresh.measurements()
+    for name in ("nearestPair", "farthestPair"):
+        result = getattr(statistics, name)()
+        expected = getattr(fresh, name)()
+        if expected is None:
+            assert result is None
+        else:
+            assert math.isclose(result[0], expected[0]), (name, result, expected)
+    assert sorted(statistics.hull()) == sorted(fresh.hull())
+    assert statistics.sortedPoints() == fresh.sortedPoints()
+
+def main():
+    randomizer = random.Random(1)
+    failed = False
+    for name, points in makeSelections(randomizer).items():
+        scratch = bestTime(lambda: measure(SelectionStatistics(), points))
+        statistics = SelectionStatistics()
+        measure(statistics, points)
+        changed = [change(randomizer, points) for i in range(runCount)]
+        durations = []
+        for other in changed:
+            durations.append(timed(lambda: measure(statistics, other)))
+            compare(statistics, other)
+        incremental = min(durations)
+        print(f"{name:10} scratch {scratch * 1000:6.2f} ms  small change {incremental * 1000:6.2f} ms")
+        if scratch > frameBudget or incremental > frameBudget:
+            failed = True
+    # many small changes to a small selection
+    statistics = SelectionStatistics()
+    points = [(randomizer.randint(0, 100), randomizer.randint(0, 100)) for i in range(50)]
+    for i in range(checkSteps):
+        points = change(randomizer, points)
+        statistics.update(points)
+        compare(statistics, points)
+    assert not failed, "a selection took longer than a frame"
+    print("ok")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Check that laserMeasure.trace.SessionTrace files written
+by two recorders at the same time read back separately.
+
+    python traceValidation.py
+
+Two traces, like the ones from two glyph editors, are
+written alternately in several parts. Each file has to
+read back as its own header and events, in order.
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "source", "code"))
+
+from laserMeasure.trace import SessionTrace, readTrace
+
+writeCount = 3
+eventsPerWrite = 4
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    traces = {
+        character: (SessionTrace(), os.path.join(directory, f"{character}.json.gz"))
+        for character in "ab"
+    }
+    for i in range(writeCount):
+        for character, (sessionTrace, path) in traces.items():
+            sessionTrace.record("keyDown", [character, 1.0, ""])
+            for j in range(eventsPerWrite):
+                sessionTrace.record("mouseMove", [i, j, 1.0, ""])
+            sessionTrace.record("keyUp", [character, 1.0, ""])
+            sessionTrace.write(path)
+    for character, (sessionTrace, path) in traces.items():
+        header, events = readTrace(path)
+        assert header["format"] == "laserMeasureTrace"
+        assert header["dropped"] == 0
+        assert len(events) == writeCount * (eventsPerWrite + 2)
+        characters = {event[3][0] for event in events if event[0] in ("keyDown", "keyUp")}
+        assert characters == {character}
+        moves = [tuple(event[3][:2]) for event in events if event[0] == "mouseMove"]
+        assert moves == [(i, j) for i in range(writeCount) for j in range(eventsPerWrite)]
+    print("ok")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Check that laserMeasure.worker.MeasurementWorker
+survives a query that raises an exception.
+
+    python workerValidation.py
+
+A raising function is submitted and has to be delivered
+as None, with the traceback reported, and a query that
+is submitted after it has to be delivered normally.
+"""
+
+import os
+import sys
+import queue
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "source", "code"))
+
+from laserMeasure.worker import MeasurementWorker
+
+timeout = 5
+
+
+def fail():
+    raise ZeroDivisionError("degenerate outline")
+
+def succeed(value):
+    return value * 2
+
+def callback(generation, result):
+    return generation, result
+
+def main():
+    delivered = queue.Queue()
+    reports = []
+    worker = MeasurementWorker(
+        lambda callback, generation, result: delivered.put(callback(generation, result)),
+        reports.append
+    )
+    worker.submit(1, fail, (), callback)
+    assert delivered.get(timeout=timeout) == (1, None)
+    assert len(reports) == 1 and "ZeroDivisionError" in reports[0]
+    worker.submit(2, succeed, (21,), callback)
+    assert delivered.get(timeout=timeout) == (2, 42)
+    worker.stop()
+    print("ok")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,28 @@
-from .subscriber import (
-    storePersistentPointMeasurementReferences,
-    removePersistentPointMeasurementReferences,
-    clearPersistentPointMeasurementReferences,
-    getPersistentPointMeasurementReferences,
-    getPersistentPointMeasurements
-)
\ No newline at end of file
+# The subscriber module requires RoboFont so it is
+# only imported when one of its functions is requested.
+# This lets the headless modules be imported (in process
+# pool workers, for example) without RoboFont. The audit
+# is also only imported when it is requested so that
+# importing the subscriber at launch doesn't import it.
+
+_subscriberFunctionNames = (
+    "storePersistentPointMeasurementReferences",
+    "removePersistentPointMeasurementReferences",
+    "clearPersistentPointMeasurementReferences",
+    "getPersistentPointMeasurementReferences",
+    "getPersistentPointMeasurements",
+    "setMeasurementDesignspace"
+)
+
+_auditFunctionNames = (
+    "auditFont",
+)
+
+def __getattr__(name):
+    if name in _auditFunctionNames:
+        from . import audit
+        return getattr(audit, name)
+    if name in _subscriberFunctionNames:
+        from . import subscriber
+        return getattr(subscriber, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,301 @@
+import os
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from fontTools.pens.pointPen import (
+    AbstractPointPen,
+    PointToSegmentPen
+)
+from fontTools.pens.transformPen import TransformPointPen
+from .geometry import RelativeGeometryPen
+from .intersection import (
+    horizontalIntersections,
+    verticalIntersections
+)
+from .namedValues import libKey
+
+# -----
+# Audit
+# -----
+#
+# The audit runs in two phases:
+#
+# 1. Candidate extraction: the glyph geometry is reduced
+#    to a flat, picklable snapshot and every measurement
+#    that could be found by hovering (segments, handles,
+#    stems and counters) is collected. This is the
+#    expensive part so it is spread across a process
+#    pool and the results are cached by snapshot hash.
+# 2. Matching: the candidates are compared to the named
+#    values. This is cheap and runs in the calling process
+#    so that changing the named values or the tolerance
+#    never requires a new extraction.
+#
+# Nothing in here may import from subscriber.py since
+# the extraction needs to run outside of RoboFont.
+
+candidateCache = {}
+maxCandidateCacheSize = 20000
+
+minimumPoolSize = 50
+
+def auditFont(
+        font,
+        glyphNames=None,
+        tolerance=2,
+        processes=None
+    ):
+    """
+    Audit the glyphs in font against the font's
+    named values. The result is a dictionary of
+    glyph names and dictionaries of this form:
+
+        {
+            hits : {name : [(kind, width, height), ...]},
+            nearHits : {name : [(kind, width, height), ...]},
+            misses : [name, ...]
+        }
+
+    kind will be "segment", "handle" or "stem".
+    width or height will be None when the candidate
+    has only one dimension. A near hit is within
+    tolerance units of the named value.
+
+    processes is passed to the process pool. Set
+    it to 1 to do all of the work in this process.
+    """
+    namedValues = font.lib.get(libKey, {})
+    if glyphNames is None:
+        glyphNames = sorted(font.keys())
+    glyphHashes = {}
+    pending = {}
+    for glyphName in glyphNames:
+        snapshot = makeGlyphSnapshot(font[glyphName], font)
+        snapshotHash = hashSnapshot(snapshot)
+        glyphHashes[glyphName] = snapshotHash
+        if snapshotHash in candidateCache:
+            continue
+        pending[snapshotHash] = snapshot
+    if pending:
+        hashes = list(pending.keys())
+        snapshots = [pending[snapshotHash] for snapshotHash in hashes]
+        extracted = _extractMeasurementCandidates(snapshots, processes)
+        _pruneCandidateCache(len(hashes))
+        for snapshotHash, candidates in zip(hashes, extracted):
+            candidateCache[snapshotHash] = candidates
+    report = {}
+    for glyphName, snapshotHash in glyphHashes.items():
+        report[glyphName] = matchNamedValues(
+            candidateCache[snapshotHash],
+            namedValues,
+            tolerance
+        )
+    return report
+
+def clearAuditCache():
+    candidateCache.clear()
+
+def _pruneCandidateCache(incoming):
+    excess = len(candidateCache) + incoming - maxCandidateCacheSize
+    if excess <= 0:
+        return
+    for snapshotHash in list(candidateCache.keys())[:excess]:
+        del candidateCache[snapshotHash]
+
+def _extractMeasurementCandidates(snapshots, processes):
+    if processes == 1 or len(snapshots) < minimumPoolSize:
+        return [extractMeasurementCandidates(snapshot) for snapshot in snapshots]
+    workers = processes or os.cpu_count() or 1
+    chunkSize = max(1, len(snapshots) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        return list(pool.map(extractMeasurementCandidates, snapshots, chunksize=chunkSize))
+
+# Snapshots
+# ---------
+#
+# A snapshot is a tuple of contours. Each contour is
+# a tuple of (x, y, segmentType) tuples. Components
+# are decomposed into the snapshot.
+
+class SnapshotPointPen(AbstractPointPen):
+
+    def __init__(self, glyphSet):
+        self.glyphSet = glyphSet
+        self.contours = []
+        self._contour = None
+
+    def beginPath(self, **kwargs):
+        self._contour = []
+
+    def endPath(self):
+        self.contours.append(tuple(self._contour))
+        self._contour = None
+
+    def addPoint(self, pt, segmentType=None, smooth=False, name=None, **kwargs):
+        x, y = pt
+        self._contour.append((x, y, segmentType))
+
+    def addComponent(self, baseGlyphName, transformation, **kwargs):
+        if baseGlyphName not in self.glyphSet:
+            return
+        baseGlyph = self.glyphSet[baseGlyphName]
+        baseGlyph.drawPoints(TransformPointPen(self, transformation))
+
+
+def makeGlyphSnapshot(glyph, glyphSet):
+    pen = SnapshotPointPen(glyphSet)
+    glyph.drawPoints(pen)
+    return tuple(pen.contours)
+
+def hashSnapshot(snapshot):
+    return hashlib.sha1(repr(snapshot).encode("utf-8")).hexdigest()
+
+def drawSnapshot(snapshot, pointPen):
+    for contour in snapshot:
+        pointPen.beginPath()
+        for x, y, segmentType in contour:
+            pointPen.addPoint((x, y), segmentType)
+        pointPen.endPath()
+
+# Candidates
+# ----------
+
+stemLevelOffset = 0.01
+
+def extractMeasurementCandidates(snapshot):
+    """
+    Find everything measurable in a snapshot. This
+    returns a dictionary of this form:
+
+        {
+            segment : [(width, height), ...],
+            handle : [(width, height), ...],
+            stemWidth : [width, ...],
+            stemHeight : [height, ...]
+        }
+
+    Stems are found by casting horizontal and vertical
+    lines just beside every on-curve point and through
+    the middle of every segment. The distances between
+    adjacent intersections are the same values that
+    hovering with the outline test would display.
+    """
+    geometryPen = RelativeGeometryPen()
+    drawSnapshot(snapshot, PointToSegmentPen(geometryPen))
+    segments = geometryPen.segments
+    segmentMeasurements = set()
+    handleMeasurements = set()
+    xLevels = set()
+    yLevels = set()
+    for segment in segments:
+        (x1, y1) = segment.original[0]
+        (x2, y2) = segment.original[-1]
+        segmentMeasurements.add(_measureEnds(segment.original))
+        # lines exactly on a point are ambiguous at
+        # corners, so look slightly to either side.
+        for offset in (-stemLevelOffset, stemLevelOffset):
+            xLevels.add(round(x1 + offset, 3))
+            yLevels.add(round(y1 + offset, 3))
+        xLevels.add((x1 + x2) / 2)
+        yLevels.add((y1 + y2) / 2)
+    for handle in geometryPen.handles:
+        handleMeasurements.add(_measureEnds(handle.original))
+    stemWidths = set()
+    for y in yLevels:
+        stemWidths.update(_adjacentDistances(horizontalIntersections(segments, y)))
+    stemHeights = set()
+    for x in xLevels:
+        stemHeights.update(_adjacentDistances(verticalIntersections(segments, x)))
+    candidates = dict(
+        segment=sorted(segmentMeasurements),
+        handle=sorted(handleMeasurements),
+        stemWidth=sorted(stemWidths),
+        stemHeight=sorted(stemHeights)
+    )
+    return candidates
+
+def _measureEnds(points):
+    (x1, y1) = points[0]
+    (x2, y2) = points[-1]
+    width = int(round(abs(x1 - x2)))
+    height = int(round(abs(y1 - y2)))
+    return (width, height)
+
+def _adjacentDistances(values):
+    distances = set()
+    for i in range(len(values) - 1):
+        distance = int(round(values[i + 1] - values[i]))
+        if distance:
+            distances.add(distance)
+    return distances
+
+# Matching
+# --------
+
+def matchNamedValues(candidates, namedValues, tolerance):
+    """
+    Compare extracted candidates to named values
+    as stored in the font lib. Width and height
+    named values are compared to segments and
+    handles. Width only and height only named
+    values are also compared to stems.
+    """
+    pairs = [
+        ("segment", width, height)
+        for (width, height) in candidates["segment"]
+    ] + [
+        ("handle", width, height)
+        for (width, height) in candidates["handle"]
+    ]
+    widths = [
+        (kind, width, None)
+        for (kind, width, height) in pairs
+    ] + [
+        ("stem", width, None)
+        for width in candidates["stemWidth"]
+    ]
+    heights = [
+        (kind, None, height)
+        for (kind, width, height) in pairs
+    ] + [
+        ("stem", None, height)
+        for height in candidates["stemHeight"]
+    ]
+    hits = {}
+    nearHits = {}
+    misses = []
+    for name, data in sorted(namedValues.items()):
+        namedWidth = data.get("width")
+        namedHeight = data.get("height")
+        if namedWidth is not None and namedHeight is not None:
+            pool = pairs
+        elif namedWidth is not None:
+            pool = widths
+        elif namedHeight is not None:
+            pool = heights
+        else:
+            continue
+        found = []
+        near = []
+        for candidate in pool:
+            kind, width, height = candidate
+            delta = 0
+            if namedWidth is not None:
+                delta = abs(width - namedWidth)
+            if namedHeight is not None:
+                delta = max(delta, abs(height - namedHeight))
+            if delta == 0:
+                found.append(candidate)
+            elif delta <= tolerance:
+                near.append((delta, candidate))
+        if found:
+            hits[name] = found
+        if near:
+            near.sort(key=lambda i: i[0])
+            nearHits[name] = [candidate for (delta, candidate) in near]
+        if not found and not near:
+            misses.append(name)
+    return dict(
+        hits=hits,
+        nearHits=nearHits,
+        misses=misses
+    )
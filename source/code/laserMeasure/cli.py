@@ -0,0 +1,424 @@
+import os
+import sys
+import json
+import argparse
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    FIRST_COMPLETED,
+    wait
+)
+from .audit import (
+    makeGlyphSnapshot,
+    drawSnapshot,
+    extractMeasurementCandidates,
+    matchNamedValues
+)
+from .geometry import (
+    CombinedGeometryPointPen,
+    groupMatchingSegments,
+    makePointArrays
+)
+from .namedValues import (
+    libKey,
+    loadNamedMeasurements,
+    findMatchingNamedMeasurements
+)
+from .overshoot import (
+    auditSnapshotOvershoots,
+    makeOvershootExpectations,
+    getDefaultSearchDistance
+)
+from .profiles import (
+    makeProfileLevels,
+    OutlineProfile
+)
+
+# ---
+# CLI
+# ---
+#
+# Run the analyses on UFOs and designspaces without
+# RoboFont. The glyphs are split into chunks that are
+# spread across a process pool. Each worker opens the
+# font itself, so only paths and glyph names are sent
+# to the workers. Only a few chunks per process are
+# submitted at a time and one JSON object is written
+# per glyph as soon as its chunk is finished, so the
+# memory use doesn't grow with the size of the fonts.
+# The chunks are written in the order they finish.
+#
+#     python -m laserMeasure MyFont.ufo --analyses segments,names
+#
+# Nothing in here may import from subscriber.py.
+
+# same as subscriber.persistentPointsKey
+persistentPointsKey = "com.typesupply.LaserMeasure.persistentPointMeasurements"
+italicSlantOffsetKey = "com.typemytype.robofont.italicSlantOffset"
+
+defaultChunkSize = 50
+chunksPerProcess = 2
+defaultProfileLevels = 20
+
+# Analyses
+# --------
+#
+# Each analysis is given a GlyphContext and returns
+# something that can be written as JSON.
+
+class GlyphContext:
+
+    def __init__(self, glyph, layer, font, options):
+        self.glyph = glyph
+        self.layer = layer
+        self.font = font
+        self.options = options
+        self._snapshot = None
+        self._geometry = None
+        self._candidates = None
+
+    def _get_snapshot(self):
+        if self._snapshot is None:
+            self._snapshot = makeGlyphSnapshot(self.glyph, self.layer)
+        return self._snapshot
+
+    snapshot = property(_get_snapshot)
+
+    def _get_geometry(self):
+        if self._geometry is None:
+            pen = CombinedGeometryPointPen()
+            drawSnapshot(self.snapshot, pen)
+            self._geometry = pen.getCombinedGeometry()
+        return self._geometry
+
+    geometry = property(_get_geometry)
+
+    def _get_segments(self):
+        return self.geometry.segments
+
+    segments = property(_get_segments)
+
+    def _get_candidates(self):
+        if self._candidates is None:
+            self._candidates = extractMeasurementCandidates(self.snapshot)
+        return self._candidates
+
+    candidates = property(_get_candidates)
+
+
+def analyzeSegments(context):
+    return [
+        dict(type=segmentType, segments=originals)
+        for (segmentType, originals) in context.geometry.segmentGroups
+    ]
+
+def analyzeHandles(context):
+    return [
+        originals
+        for (segmentType, originals) in groupMatchingSegments(context.geometry.handles)
+    ]
+
+def analyzeLinks(context):
+    glyph = context.glyph
+    links = glyph.lib.get(persistentPointsKey, [])
+    if not links:
+        return []
+    pointArrays = makePointArrays(glyph)
+    named = loadNamedMeasurements(context.font)
+    result = []
+    for link in links:
+        positions = []
+        for identifier in link:
+            index = pointArrays.identifierToIndex.get(identifier)
+            if index is None:
+                continue
+            positions.append((pointArrays.xs[index], pointArrays.ys[index]))
+        if len(positions) < 2:
+            continue
+        xs = [x for (x, y) in positions]
+        ys = [y for (x, y) in positions]
+        width = max(xs) - min(xs)
+        height = max(ys) - min(ys)
+        result.append(dict(
+            identifiers=list(link),
+            positions=positions,
+            width=width,
+            height=height,
+            names=findMatchingNamedMeasurements((width, height), *named)
+        ))
+    return result
+
+def analyzeNames(context):
+    namedValues = context.font.lib.get(libKey, {})
+    return matchNamedValues(
+        context.candidates,
+        namedValues,
+        context.options["tolerance"]
+    )
+
+def analyzeProfiles(context):
+    info = context.font.info
+    bottom = info.descender or 0
+    top = info.ascender or info.unitsPerEm or 1000
+    levels = makeProfileLevels(bottom, top, context.options["profileLevels"])
+    profile = OutlineProfile(context.segments)
+    sidebearings = profile.sidebearings(
+        levels,
+        context.glyph.width,
+        info.italicAngle or 0,
+        context.font.lib.get(italicSlantOffsetKey, 0)
+    )
+    return [
+        dict(y=y, left=left, right=right)
+        for (y, left, right) in sidebearings
+    ]
+
+def analyzeStems(context):
+    candidates = context.candidates
+    return dict(
+        widths=candidates["stemWidth"],
+        heights=candidates["stemHeight"]
+    )
+
+def analyzeOvershoots(context):
+    info = context.font.info
+    tolerance = context.options["tolerance"]
+    return auditSnapshotOvershoots(
+        context.snapshot,
+        makeOvershootExpectations(info),
+        tolerance,
+        getDefaultSearchDistance(info, tolerance)
+    )
+
+analyses = {
+    "segments" : analyzeSegments,
+    "handles" : analyzeHandles,
+    "links" : analyzeLinks,
+    "names" : analyzeNames,
+    "profiles" : analyzeProfiles,
+    "stems" : analyzeStems,
+    "overshoots" : analyzeOvershoots
+}
+
+# Workers
+# -------
+
+_workerFont = None
+_workerFontPath = None
+
+def _openFont(path):
+    # only one font is kept open per worker
+    # so that memory use doesn't grow with
+    # the size of the family.
+    global _workerFont, _workerFontPath
+    if path != _workerFontPath:
+        import defcon
+        _workerFont = defcon.Font(path)
+        _workerFontPath = path
+    return _workerFont
+
+def analyzeGlyphs(task):
+    path, layerName, glyphNames, analysisNames, options = task
+    font = _openFont(path)
+    if layerName is None:
+        layer = font.layers.defaultLayer
+    else:
+        layer = font.layers[layerName]
+    records = []
+    for glyphName in glyphNames:
+        context = GlyphContext(layer[glyphName], layer, font, options)
+        record = dict(
+            font=path,
+            layer=layerName,
+            glyph=glyphName
+        )
+        for name in analysisNames:
+            record[name] = analyses[name](context)
+        records.append(record)
+    return records
+
+# Tasks
+# -----
+
+def expandSources(paths):
+    """
+    Return a list of (path, layerName) for the given
+    UFO and designspace paths. Designspace sources
+    without a path are skipped with a warning.
+    """
+    sources = []
+    for path in paths:
+        if os.path.splitext(path)[1].lower() == ".designspace":
+            from fontTools.designspaceLib import DesignSpaceDocument
+            document = DesignSpaceDocument.fromfile(path)
+            for source in document.sources:
+                if source.path is None:
+                    name = source.name or source.filename or "unnamed"
+                    sys.stderr.write(f"Skipping the {name} source in {path} because it has no path.\n")
+                    continue
+                sources.append((source.path, source.layerName))
+        else:
+            sources.append((path, None))
+    unique = []
+    for source in sources:
+        if source not in unique:
+            unique.append(source)
+    return unique
+
+def makeTasks(sources, glyphNames, analysisNames, options, chunkSize):
+    import defcon
+    for path, layerName in sources:
+        # only the glyph names are needed here
+        font = defcon.Font(path)
+        if layerName is None:
+            layer = font.layers.defaultLayer
+        else:
+            layer = font.layers[layerName]
+        names = sorted(layer.keys())
+        del font
+        if glyphNames is not None:
+            names = [name for name in names if name in glyphNames]
+        for i in range(0, len(names), chunkSize):
+            yield (path, layerName, names[i:i + chunkSize], analysisNames, options)
+
+def runAnalyses(
+        paths,
+        analysisNames=None,
+        glyphNames=None,
+        tolerance=2,
+        profileLevels=defaultProfileLevels,
+        processes=None,
+        chunkSize=defaultChunkSize
+    ):
+    """
+    Yield one record per glyph in the fonts at paths.
+    paths may be UFOs or designspaces. Set processes
+    to 1 to do all of the work in this process. With
+    more than one process, the records are yielded in
+    the order that their chunks finish.
+    """
+    if analysisNames is None:
+        analysisNames = list(analyses.keys())
+    options = dict(
+        tolerance=tolerance,
+        profileLevels=profileLevels
+    )
+    sources = expandSources(paths)
+    tasks = makeTasks(sources, glyphNames, analysisNames, options, chunkSize)
+    if processes == 1:
+        for task in tasks:
+            yield from analyzeGlyphs(task)
+        return
+    if processes is None:
+        processes = os.cpu_count() or 1
+    windowSize = processes * chunksPerProcess
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        pending = set()
+        try:
+            for task in tasks:
+                pending.add(pool.submit(analyzeGlyphs, task))
+                if len(pending) < windowSize:
+                    continue
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+        finally:
+            # if the records stop being read, the chunks
+            # that haven't started are dropped instead
+            # of being waited for.
+            for future in pending:
+                future.cancel()
+
+# Main
+# ----
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        prog="lasermeasure",
+        description="Run Laser Measure analyses on UFOs and designspaces and write JSON lines."
+    )
+    parser.add_argument(
+        "paths",
+        nargs="+",
+        help="UFO or designspace paths."
+    )
+    parser.add_argument(
+        "--analyses",
+        default=",".join(analyses.keys()),
+        help="Comma separated analyses: " + ", ".join(analyses.keys()) + ". (All by default.)"
+    )
+    parser.add_argument(
+        "--glyphs",
+        default=None,
+        help="Comma separated glyph names. (All by default.)"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=2,
+        help="Named value near hit and overshoot tolerance."
+    )
+    parser.add_argument(
+        "--profile-levels",
+        type=int,
+        default=defaultProfileLevels,
+        help="Number of heights in the sidebearing profiles."
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=None,
+        help="Number of processes. (The number of CPUs by default.)"
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=defaultChunkSize,
+        help="Number of glyphs given to a process at a time."
+    )
+    parser.add_argument(
+        "-o", "--output",
+        default=None,
+        help="Output path. (Standard output by default.)"
+    )
+    args = parser.parse_args(args)
+    analysisNames = [name.strip() for name in args.analyses.split(",") if name.strip()]
+    for name in analysisNames:
+        if name not in analyses:
+            parser.error(f"unknown analysis: {name}")
+    glyphNames = None
+    if args.glyphs:
+        glyphNames = set(name.strip() for name in args.glyphs.split(","))
+    records = runAnalyses(
+        args.paths,
+        analysisNames=analysisNames,
+        glyphNames=glyphNames,
+        tolerance=args.tolerance,
+        profileLevels=args.profile_levels,
+        processes=args.processes,
+        chunkSize=args.chunk_size
+    )
+    if args.output is None:
+        output = sys.stdout
+    else:
+        output = open(args.output, "w", encoding="utf-8")
+    try:
+        for record in records:
+            output.write(json.dumps(record))
+            output.write("\n")
+            output.flush()
+    except BrokenPipeError:
+        # the reader stopped reading (for example, head.)
+        # stdout is pointed at devnull so that python
+        # doesn't complain again when it flushes it.
+        records.close()
+        if output is sys.stdout:
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, sys.stdout.fileno())
+        sys.exit(1)
+    finally:
+        if output is not sys.stdout:
+            output.close()
@@ -0,0 +1,64 @@
+from mojo.extensions import (
+    registerExtensionDefaults,
+    getExtensionDefault,
+    setExtensionDefault
+)
+
+extensionID = "com.typesupply.LaserMeasure"
+extensionKeyStub = extensionID + "."
+
+# --------
+# Defaults
+# --------
+
+defaults = {
+    extensionKeyStub + "showMeasurementsHUD" : True,
+    extensionKeyStub + "triggerCharacter" : "d",
+    extensionKeyStub + "baseColor" : (0, 0.3, 1, 0.8),
+    extensionKeyStub + "highlightStrokeWidth" : 7,
+    extensionKeyStub + "highlightOpacity" : 0.3,
+    extensionKeyStub + "highlightAnimate" : False,
+    extensionKeyStub + "highlightAnimationDuration" : 1,
+    extensionKeyStub + "persistentMeasurementsColor" : (0.75, 0.75, 0.75, 1),
+    extensionKeyStub + "persistentMeasurementsStrokeWidth" : 15,
+    extensionKeyStub + "persistentMeasurementsOpacity" : 1.0,
+    extensionKeyStub + "measurementTextSize" : 12,
+    extensionKeyStub + "testSelection" : True,
+    extensionKeyStub + "testSegments" : True,
+    extensionKeyStub + "testSegmentMatches" : True,
+    extensionKeyStub + "testOffCurves" : True,
+    extensionKeyStub + "testOffCurveMatches" : True,
+    extensionKeyStub + "testPoints" : True,
+    extensionKeyStub + "testThickness" : False,
+    extensionKeyStub + "showThicknessField" : False,
+    extensionKeyStub + "testGeneral" : True,
+    extensionKeyStub + "testAnchors" : True,
+    extensionKeyStub + "autoTestSegmentMatches" : True,
+    extensionKeyStub + "showPersistentMeasurements" : True,
+    extensionKeyStub + "showDistance" : False,
+    extensionKeyStub + "showMasterMeasurements" : False,
+    extensionKeyStub + "showSidebearings" : False,
+    extensionKeyStub + "showSelectionStatistics" : False,
+    extensionKeyStub + "measureItalicAngle" : False,
+    extensionKeyStub + "designspacePath" : "",
+    extensionKeyStub + "designspaceLocations" : [],
+    extensionKeyStub + "matchColors" : [
+        (1, 0.6, 0, 0.9),
+        (0.3, 1, 0, 0.9),
+        (0, 1, 0.8, 0.9),
+        (0.6, 0.5, 1, 0.9),
+        (1, 0.5, 0.5, 0.9),
+        (0.9, 0.9, 0, 0.9),
+        (0.5, 0.5, 0.5, 0.9)
+    ],
+}
+
+registerExtensionDefaults(defaults)
+
+def internalGetDefault(key):
+    key = extensionKeyStub + key
+    return getExtensionDefault(key)
+
+def internalSetDefault(key, value):
+    key = extensionKeyStub + key
+    setExtensionDefault(key, value)
@@ -0,0 +1,844 @@
+import math
+from array import array
+from fontTools.misc import transform
+from fontTools.pens.basePen import BasePen
+from fontTools.pens.pointPen import (
+    AbstractPointPen,
+    PointToSegmentPen
+)
+
+
+# Adjacent Values
+# ---------------
+
+def findAdjacentValues(
+        value,
+        otherValues,
+        beforeFallback,
+        afterFallback
+    ):
+    # XXX
+    # this can probably be optimized
+    # with bisect.bisect
+    before = []
+    after = []
+    for otherValue in otherValues:
+        d = abs(value - otherValue)
+        if otherValue <= value:
+            before.append((d, otherValue))
+        if otherValue >= value:
+            after.append((d, otherValue))
+    if not before:
+        before.append((0, beforeFallback))
+    if not after:
+        after.append((0, afterFallback))
+    v1 = min(before)[1]
+    v2 = min(after)[1]
+    d = int(round(abs(v1 - v2)))
+    return v1, v2, d
+
+
+# Metrics
+# -------
+
+def getVerticalMetrics(info):
+    """
+    Return a list of (name, value) for the vertical
+    metrics in the font info that are defined.
+    """
+    metrics = [
+        ("descender", info.descender),
+        ("baseline", 0),
+        ("xHeight", info.xHeight),
+        ("capHeight", info.capHeight),
+        ("ascender", info.ascender)
+    ]
+    return [(name, value) for (name, value) in metrics if value is not None]
+
+
+# Angles
+# ------
+
+def normalizeAngle(angle):
+    if angle < 0:
+        angle = 360 + angle
+    return angle
+
+def roundTo(value, multiple):
+    value = int(round(value / float(multiple))) * multiple
+    return value
+
+def isRightAngle(angle):
+    tolerance = 1
+    if angle <= tolerance:
+        return True
+    elif angle >= (90 - tolerance) and angle <= (90 + tolerance):
+        return True
+    elif angle >= (180 - tolerance) and angle <= (180 + tolerance):
+        return True
+    elif angle >= (270 - tolerance) and angle <= (270 + tolerance):
+        return True
+    elif angle >= (360 - tolerance):
+        return True
+    return False
+
+def isCollinear(point1, location, point2, tolerance):
+    tolerance = math.radians(tolerance)
+    x1, y1 = point1
+    x2, y2 = location
+    x3, y3 = point2
+    dx1 = x2 - x1
+    dy1 = y2 - y1
+    dx2 = x3 - x2
+    dy2 = y3 - y2
+    a1 = math.atan2(dy1, dx1)
+    a2 = math.atan2(dy2, dx2)
+    collinearity = abs(a1 - a2)
+    if collinearity > math.pi:
+        collinearity = math.pi * 2 - collinearity
+    if collinearity > tolerance:
+       return False
+    return True
+
+maxCollinearityTolerance = 30
+minCollinearityTolerance = 2
+collinearityToleranceRange = maxCollinearityTolerance - minCollinearityTolerance
+
+def calcCollinearityTolerance(distance, unitsPerEm):
+    minDistance = unitsPerEm * 0.02
+    maxDistance = unitsPerEm * 0.5
+    if distance < minDistance:
+        return maxCollinearityTolerance
+    elif distance > maxDistance:
+        return minCollinearityTolerance
+    proportion = (distance - minDistance) / (maxDistance - minDistance)
+    tolerance = maxCollinearityTolerance - (collinearityToleranceRange * proportion)
+    return tolerance
+
+def angledPoint(pt, angle, offset=0):
+    if not angle:
+        return pt
+    x, y = pt
+    x = x - math.tan(math.radians(angle)) * y
+    x += offset
+    return x, y
+
+
+def makeDeslantTransform(angle, offset=0):
+    """
+    Return a transform that moves points from the
+    slanted space defined by angle and offset to an
+    upright space. This is the inverse of angledPoint
+    for the origin: the slanted origin line becomes x=0.
+    """
+    return transform.Transform(1, 0, math.tan(math.radians(angle)), 1, -offset, 0)
+
+
+# Handles As Lines
+# ----------------
+#
+# The handles are hit tested as straight lines. The
+# line ends are kept in arrays.
+
+class HandleLines:
+
+    """
+    handles is a list of objects with .original
+    (for example, the ones made by RelativeHandlesPen.)
+    """
+
+    def __init__(self, handles):
+        self.x1s = array("d")
+        self.y1s = array("d")
+        self.x2s = array("d")
+        self.y2s = array("d")
+        for handle in handles:
+            (x1, y1), (x2, y2) = handle.original
+            self.x1s.append(x1)
+            self.y1s.append(y1)
+            self.x2s.append(x2)
+            self.y2s.append(y2)
+
+    def __len__(self):
+        return len(self.x1s)
+
+    def find(self, point, tolerance):
+        """
+        Return ((x1, y1), (x2, y2)) for the handle
+        closest to point or None if no handle is
+        within tolerance.
+        """
+        x, y = point
+        found = None
+        best = tolerance * tolerance
+        x1s = self.x1s
+        y1s = self.y1s
+        x2s = self.x2s
+        y2s = self.y2s
+        for i in range(len(x1s)):
+            x1 = x1s[i]
+            y1 = y1s[i]
+            x2 = x2s[i]
+            y2 = y2s[i]
+            if min(x1, x2) - tolerance > x or max(x1, x2) + tolerance < x:
+                continue
+            if min(y1, y2) - tolerance > y or max(y1, y2) + tolerance < y:
+                continue
+            dx = x2 - x1
+            dy = y2 - y1
+            length = dx * dx + dy * dy
+            t = 0
+            if length:
+                t = min(1, max(0, ((x - x1) * dx + (y - y1) * dy) / length))
+            px = x1 + dx * t - x
+            py = y1 + dy * t - y
+            distance = px * px + py * py
+            if distance <= best:
+                best = distance
+                found = ((x1, y1), (x2, y2))
+        return found
+
+
+# Quadratic Splines
+# -----------------
+#
+# The handles of a quadratic B-spline connect the points
+# that are really there: the previous on curve, each off
+# curve and the next on curve. The implied on curves are
+# only used when a spline is split into quadratic pieces
+# (see intersection.segmentPieces.)
+
+def iterateQuadraticSplineHandles(prevPoint, points):
+    """
+    Yield (pt1, pt2) for the handles in the spline that
+    starts at prevPoint and continues with points as given
+    to qCurveTo. The last point is None if the contour has
+    no on curves, in which case the off curves form a loop.
+    """
+    if len(points) < 2:
+        return
+    if points[-1] is None:
+        points = points[:-1]
+        chain = points + (points[0],)
+    else:
+        chain = (prevPoint,) + points
+    for pt1, pt2 in zip(chain, chain[1:]):
+        yield pt1, pt2
+
+def closeQuadraticSpline(prevPoint, points):
+    """
+    Return the complete list of points for the spline that
+    starts at prevPoint and continues with points as given
+    to qCurveTo. If the contour has no on curves, the spline
+    starts and ends at the implied on curve between the last
+    and first off curves.
+    """
+    if points[-1] is None:
+        points = points[:-1]
+        (x1, y1) = points[-1]
+        (x2, y2) = points[0]
+        implied = ((x1 + x2) * 0.5, (y1 + y2) * 0.5)
+        return (implied,) + tuple(points) + (implied,)
+    return (prevPoint,) + tuple(points)
+
+
+# Segment Matching
+# ----------------
+
+class RelativeSegment:
+
+    def __init__(self, type, segment):
+        if type == "move":
+            type = "line"
+        self.type = type
+        self.original = tuple(segment)
+        self._reversedOriginal = None
+        self._base = None
+        self._reversedBase = None
+
+    def __repr__(self):
+        o = repr(self.original)
+        b = repr(self.base)
+        return f"{o}-{b}"
+
+    def __hash__(self):
+        return hash(self.base)
+
+    def _get_base(self):
+        if self._base is None:
+            self._base = makePointsRelative(self.original)
+        return self._base
+
+    base = property(_get_base)
+
+    def _get_reversedBase(self):
+        if self._reversedBase is None:
+            points = reversePoints(self.original)
+            self._reversedBase = makePointsRelative(points)
+        return self._reversedBase
+
+    reversedBase = property(_get_reversedBase)
+
+    def _get_reversedOriginal(self):
+        if self._reversedOriginal is None:
+            self._reversedOriginal = reversePoints(self.original)
+        return self._reversedOriginal
+
+    reversedOriginal = property(_get_reversedOriginal)
+
+    def __cmp__(self, other):
+        return self.__eq__(other)
+
+    def __eq__(self, other):
+        segment = other.base
+        # obvious mismatches
+        if other.type != self.type:
+            return False
+        if len(segment) != len(self.original):
+            return False
+        # obvious matches
+        if segment == self.base:
+            return True
+        if segment == self.reversedBase:
+            return True
+        # transform and compare
+        base = self.base
+        reversedBase = self.reversedBase
+        transformers = (
+            ("rotated90", [base, rotate90Transform.transformPoints]),
+            ("rotated180", [base, rotate180Transform.transformPoints]),
+            ("rotated270", [base, rotate270Transform.transformPoints]),
+            ("flippedHorizontal", [base, flipHorizontalTransform.transformPoints]),
+            ("flippedVertical", [base, flipVerticalTransform.transformPoints]),
+            ("reversedRotated90", [reversedBase, rotate90Transform.transformPoints]),
+            ("reversedRotated180", [reversedBase, rotate180Transform.transformPoints]),
+            ("reversedRotated270", [reversedBase, rotate270Transform.transformPoints]),
+            ("reversedFlippedHorizontal", [reversedBase, flipHorizontalTransform.transformPoints]),
+            ("reversedFlippedVertical", [reversedBase, flipVerticalTransform.transformPoints]),
+        )
+        for attr, (points, transformer) in transformers:
+            if not hasattr(self, attr):
+                transformed = tuple(transformer(points))
+                setattr(self, attr, transformed)
+            transformed = getattr(self, attr)
+            if segment == transformed:
+                return True
+        return False
+
+    def isSame(self, other):
+        if other.original == self.original:
+            return True
+        if other.original == self.reversedOriginal:
+            return True
+        return False
+
+    def transformed(self, transformation):
+        """
+        Return a copy transformed by transformation. This
+        is used for components. A translation doesn't change
+        the relative points, so those are shared.
+        """
+        transformation = transform.Transform(*transformation)
+        segment = self.__class__.__new__(self.__class__)
+        segment.type = self.type
+        segment.original = tuple(transformation.transformPoints(self.original))
+        segment._reversedOriginal = None
+        segment._base = None
+        segment._reversedBase = None
+        if tuple(transformation)[:4] == (1, 0, 0, 1):
+            segment._base = self.base
+            segment._reversedBase = self.reversedBase
+        return segment
+
+
+class RelativeSegmentsPen(BasePen):
+
+    def __init__(self):
+        super().__init__()
+        self.prevPoint = None
+        self.segments = []
+
+    def _moveTo(self, pt):
+        self.firstPoint = pt
+        self.prevPoint = pt
+
+    def _lineTo(self, pt):
+        self.segments.append(RelativeSegment("line", (self.prevPoint, pt)))
+        self.prevPoint = pt
+
+    def _curveToOne(self, pt1, pt2, pt3):
+        self.segments.append(RelativeSegment("curve", (self.prevPoint, pt1, pt2, pt3)))
+        self.prevPoint = pt3
+
+    def qCurveTo(self, *points):
+        # the whole spline is one segment so that it
+        # matches the segments seen in the editor.
+        if len(points) < 2:
+            super().qCurveTo(*points)
+            return
+        spline = closeQuadraticSpline(self.prevPoint, points)
+        super().qCurveTo(*points)
+        self.segments.append(RelativeSegment("qcurve", spline))
+
+    def _qCurveToOne(self, pt1, pt2):
+        self.prevPoint = pt2
+
+    def _closePath(self):
+        if self.prevPoint != self.firstPoint:
+            self.segments.append(RelativeSegment("line", (self.prevPoint, self.firstPoint)))
+        self.firstPoint = None
+        self.prevPoint = None
+
+    def _endPath(self):
+        self.firstPoint = None
+        self.prevPoint = None
+
+    def addComponent(self, *args, **kwargs):
+        pass
+
+
+def groupMatchingSegments(segments):
+    """
+    Group segments (or handles) that match. Returns a
+    sorted list of (type, originals) for the groups with
+    more than one member. originals is a sorted tuple of
+    the original points of the segments in the group.
+    """
+    tree = {}
+    for segment in segments:
+        key = None
+        for candidateKey in tree.keys():
+            if candidateKey == segment:
+                key = candidateKey
+                break
+        if key is None:
+            key = segment
+        if key not in tree:
+            tree[key] = []
+        tree[key].append(segment)
+    sorter = []
+    for key, segments in tree.items():
+        if len(segments) < 2:
+            continue
+        segments = tuple(sorted([s.original for s in segments]))
+        sorter.append((key.type, segments))
+    return list(sorted(sorter))
+
+def makePointRelative(point, basePoint):
+    px, py = point
+    bx, by = basePoint
+    x = px - bx
+    y = py - by
+    return (x, y)
+
+def makePointsRelative(points):
+    points = [(0, 0)] + [
+        makePointRelative(p, points[0])
+        for p in points[1:]
+    ]
+    return tuple(points)
+
+def reversePoints(points):
+    return tuple(reversed(points))
+
+rotate90Transform = transform.Transform().rotate(math.radians(90))
+rotate180Transform = transform.Transform().rotate(math.radians(180))
+rotate270Transform = transform.Transform().rotate(math.radians(270))
+flipHorizontalTransform = transform.Scale(1, -1)
+flipVerticalTransform = transform.Scale(-1, 1)
+
+
+# Handle Matching
+# ---------------
+
+class RelativeHandle(RelativeSegment):
+
+    def __init__(self, points):
+        super().__init__("line", points)
+
+
+class RelativeHandlesPen(BasePen):
+
+    def __init__(self):
+        super().__init__()
+        self.prevPoint = None
+        self.handles = []
+
+    def addComponent(self, *args, **kwargs):
+        pass
+
+    def _moveTo(self, pt):
+        self.prevPoint = pt
+
+    def _lineTo(self, pt):
+        self.prevPoint = pt
+
+    def _curveToOne(self, pt1, pt2, pt3):
+        self.handles.append(RelativeHandle((self.prevPoint, pt1)))
+        self.handles.append(RelativeHandle((pt2, pt3)))
+        self.prevPoint = pt3
+
+    def qCurveTo(self, *points):
+        for handle in iterateQuadraticSplineHandles(self.prevPoint, points):
+            self.handles.append(RelativeHandle(handle))
+        super().qCurveTo(*points)
+
+    def _qCurveToOne(self, pt1, pt2):
+        # the handles are made by qCurveTo
+        self.prevPoint = pt2
+
+    def _closePath(self):
+        self.prevPoint = None
+
+    def _endPath(self):
+        self.prevPoint = None
+
+
+# Point Arrays
+# ------------
+#
+# Point arrays are the compact snapshot of a glyph version:
+# the coordinates are in array("d"), the point types are
+# one byte codes and the contours are index ranges. The
+# snapshot can draw itself, so the pens that make the other
+# geometry read from it instead of walking the glyph's
+# contour and point objects again. Components can be
+# decomposed into a snapshot by joining the transformed
+# snapshots of the base glyphs.
+
+pointTypeNames = (None, "move", "line", "curve", "qcurve")
+pointTypeCodes = {name : code for code, name in enumerate(pointTypeNames)}
+
+class PointArrays:
+
+    """
+    A flat copy of a glyph's points.
+
+    - xs, ys: array("d") of the coordinates
+    - typeCodes: array("b") of indexes in pointTypeNames
+    - types: tuple of segment types (None for off curves)
+    - contourStarts: tuple of the index of the first point
+      in each contour, followed by the total point count
+    - identifiers: tuple of point identifiers (or None)
+    - identifierToIndex: dict of identifiers and indexes
+    """
+
+    def __init__(self, xs, ys, typeCodes, contourStarts, identifiers):
+        self.xs = xs
+        self.ys = ys
+        self.typeCodes = typeCodes
+        self.contourStarts = contourStarts
+        self.identifiers = identifiers
+        self._types = None
+        self._identifierToIndex = None
+
+    def __len__(self):
+        return len(self.xs)
+
+    def _get_types(self):
+        if self._types is None:
+            self._types = tuple(pointTypeNames[code] for code in self.typeCodes)
+        return self._types
+
+    types = property(_get_types)
+
+    def _get_identifierToIndex(self):
+        if self._identifierToIndex is None:
+            self._identifierToIndex = {
+                identifier : index
+                for index, identifier in enumerate(self.identifiers)
+                if identifier is not None
+            }
+        return self._identifierToIndex
+
+    identifierToIndex = property(_get_identifierToIndex)
+
+    def contourRanges(self):
+        starts = self.contourStarts
+        for i in range(len(starts) - 1):
+            yield starts[i], starts[i + 1]
+
+    def indexOfPosition(self, position, onCurve=None):
+        x, y = position
+        for index, (px, py) in enumerate(zip(self.xs, self.ys)):
+            if px != x or py != y:
+                continue
+            if onCurve is not None and bool(self.typeCodes[index]) != onCurve:
+                continue
+            return index
+        return None
+
+    def drawPoints(self, pointPen):
+        xs = self.xs
+        ys = self.ys
+        typeCodes = self.typeCodes
+        identifiers = self.identifiers
+        for start, end in self.contourRanges():
+            pointPen.beginPath()
+            for index in range(start, end):
+                pointPen.addPoint(
+                    (xs[index], ys[index]),
+                    segmentType=pointTypeNames[typeCodes[index]],
+                    identifier=identifiers[index]
+                )
+            pointPen.endPath()
+
+    def draw(self, pen):
+        self.drawPoints(PointToSegmentPen(pen))
+
+    def transformed(self, transformation):
+        """
+        Return a transformed copy. The identifiers are
+        not copied since they belong to the original.
+        """
+        xx, xy, yx, yy, dx, dy = tuple(transformation)
+        xs = array("d")
+        ys = array("d")
+        for x, y in zip(self.xs, self.ys):
+            xs.append(xx * x + yx * y + dx)
+            ys.append(xy * x + yy * y + dy)
+        return PointArrays(
+            xs,
+            ys,
+            self.typeCodes,
+            self.contourStarts,
+            (None,) * len(xs)
+        )
+
+
+def joinPointArrays(pointArrays):
+    """
+    Return the contours of all of the point
+    arrays in one point arrays object.
+    """
+    if len(pointArrays) == 1:
+        return pointArrays[0]
+    xs = array("d")
+    ys = array("d")
+    typeCodes = array("b")
+    contourStarts = []
+    identifiers = []
+    for other in pointArrays:
+        offset = len(xs)
+        contourStarts.extend(start + offset for start in other.contourStarts[:-1])
+        xs.extend(other.xs)
+        ys.extend(other.ys)
+        typeCodes.extend(other.typeCodes)
+        identifiers.extend(other.identifiers)
+    return PointArrays(
+        xs,
+        ys,
+        typeCodes,
+        tuple(contourStarts) + (len(xs),),
+        tuple(identifiers)
+    )
+
+
+class PointArraysPointPen(AbstractPointPen):
+
+    def __init__(self):
+        self.xs = array("d")
+        self.ys = array("d")
+        self.typeCodes = array("b")
+        self.contourStarts = []
+        self.identifiers = []
+
+    def beginPath(self, **kwargs):
+        self.contourStarts.append(len(self.xs))
+
+    def endPath(self):
+        pass
+
+    def addPoint(self, pt, segmentType=None, smooth=False, name=None, identifier=None, **kwargs):
+        x, y = pt
+        self.xs.append(x)
+        self.ys.append(y)
+        self.typeCodes.append(pointTypeCodes[segmentType])
+        self.identifiers.append(identifier)
+
+    def addComponent(self, *args, **kwargs):
+        pass
+
+    def getPointArrays(self):
+        return PointArrays(
+            self.xs,
+            self.ys,
+            self.typeCodes,
+            tuple(self.contourStarts) + (len(self.xs),),
+            tuple(self.identifiers)
+        )
+
+
+def makePointArrays(glyph):
+    """
+    Return the point arrays for the glyph's
+    contours. Components are ignored.
+    """
+    pen = PointArraysPointPen()
+    glyph.drawPoints(pen)
+    return pen.getPointArrays()
+
+def indexedSegments(pointArrays):
+    """
+    Return the segments in the point arrays as a list
+    of (type, controls) tuples. controls is a tuple with
+    one item per Bezier control point. Each item is a
+    tuple of point indexes that are averaged to get the
+    control point: implied on curves in quadratic splines
+    are the average of two off curves. Quadratic splines
+    are split into individual quadratic curves. Contours
+    with no on curve points and curves with more than two
+    off curves are skipped.
+    """
+    types = pointArrays.types
+    segments = []
+    for start, end in pointArrays.contourRanges():
+        onCurves = [i for i in range(start, end) if types[i] is not None]
+        if not onCurves:
+            continue
+        count = end - start
+        isOpen = types[start] == "move"
+        if isOpen:
+            first = start
+        else:
+            first = onCurves[-1]
+        offCurves = []
+        previous = first
+        for step in range(1, count + 1):
+            index = start + (first - start + step) % count
+            segmentType = types[index]
+            if segmentType is None:
+                offCurves.append(index)
+                continue
+            if isOpen and index == start:
+                break
+            if segmentType == "curve" and len(offCurves) > 2:
+                pass
+            elif segmentType == "qcurve" and len(offCurves) > 1:
+                anchor = (previous,)
+                for i, offCurve in enumerate(offCurves):
+                    if i == len(offCurves) - 1:
+                        nextAnchor = (index,)
+                    else:
+                        nextAnchor = (offCurve, offCurves[i + 1])
+                    segments.append(("qcurve", (anchor, (offCurve,), nextAnchor)))
+                    anchor = nextAnchor
+            elif offCurves:
+                if len(offCurves) == 1:
+                    segmentType = "qcurve"
+                segments.append((segmentType, ((previous,),) + tuple((i,) for i in offCurves) + ((index,),)))
+            else:
+                segments.append(("line", ((previous,), (index,))))
+            offCurves = []
+            previous = index
+    return segments
+
+
+# Combined Geometry
+# -----------------
+#
+# Everything that the hover tests need from a glyph
+# version is made in one pass over its points: the
+# segments, the handles, the handle lines and the table
+# of on curve points. The point pen records the on curves
+# and passes the points through to one segment pen that
+# makes the segments and the handles together.
+
+class RelativeGeometryPen(RelativeSegmentsPen):
+
+    """
+    Makes the same segments as RelativeSegmentsPen and
+    the same handles as RelativeHandlesPen.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.handles = []
+
+    def _curveToOne(self, pt1, pt2, pt3):
+        self.handles.append(RelativeHandle((self.prevPoint, pt1)))
+        self.handles.append(RelativeHandle((pt2, pt3)))
+        super()._curveToOne(pt1, pt2, pt3)
+
+    def qCurveTo(self, *points):
+        for handle in iterateQuadraticSplineHandles(self.prevPoint, points):
+            self.handles.append(RelativeHandle(handle))
+        super().qCurveTo(*points)
+
+
+class CombinedGeometry:
+
+    """
+    - segments: list of RelativeSegment
+    - handles: list of RelativeHandle
+    - handleLines: HandleLines for the handles
+    - onCurvePoints: list of (contourIndex, onCurveIndex, (x, y))
+      for every on curve point. onCurveIndex counts the
+      on curves in the contour.
+    - contourOnCurveCounts: dict of contour indexes
+      and on curve counts
+    - segmentGroups: groupMatchingSegments(segments),
+      made the first time it is needed
+    """
+
+    def __init__(self, segments, handles, onCurvePoints, contourOnCurveCounts):
+        self.segments = segments
+        self.handles = handles
+        self.handleLines = HandleLines(handles)
+        self.onCurvePoints = onCurvePoints
+        self.contourOnCurveCounts = contourOnCurveCounts
+        self._segmentGroups = None
+
+    def _get_segmentGroups(self):
+        if self._segmentGroups is None:
+            self._segmentGroups = groupMatchingSegments(self.segments)
+        return self._segmentGroups
+
+    segmentGroups = property(_get_segmentGroups)
+
+
+class CombinedGeometryPointPen(AbstractPointPen):
+
+    def __init__(self):
+        self.segmentsPen = RelativeGeometryPen()
+        self.outPen = PointToSegmentPen(self.segmentsPen)
+        self.onCurvePoints = []
+        self.contourOnCurveCounts = {}
+        self._contourIndex = 0
+        self._onCurveIndex = 0
+
+    def beginPath(self, **kwargs):
+        self.outPen.beginPath()
+
+    def endPath(self):
+        self.outPen.endPath()
+        self.contourOnCurveCounts[self._contourIndex] = self._onCurveIndex
+        self._contourIndex += 1
+        self._onCurveIndex = 0
+
+    def addPoint(self, pt, segmentType=None, smooth=False, name=None, **kwargs):
+        if segmentType is not None:
+            self.onCurvePoints.append((self._contourIndex, self._onCurveIndex, pt))
+            self._onCurveIndex += 1
+        self.outPen.addPoint(pt, segmentType=segmentType, smooth=smooth)
+
+    def addComponent(self, *args, **kwargs):
+        pass
+
+    def getCombinedGeometry(self):
+        return CombinedGeometry(
+            self.segmentsPen.segments,
+            self.segmentsPen.handles,
+            self.onCurvePoints,
+            self.contourOnCurveCounts
+        )
+
+
+def makeCombinedGeometry(pointArrays):
+    """
+    Return the CombinedGeometry for point arrays (or
+    anything else with a drawPoints method.)
+    """
+    pen = CombinedGeometryPointPen()
+    pointArrays.drawPoints(pen)
+    return pen.getCombinedGeometry()
@@ -0,0 +1,128 @@
+from fontTools.designspaceLib import DesignSpaceDocument
+from fontTools.varLib.models import (
+    VariationModel,
+    VariationModelError,
+    normalizeValue
+)
+
+# -------------
+# Interpolation
+# -------------
+#
+# Measurements at designspace locations are made by
+# interpolating only the points in the measured feature.
+# The interpolation is linear in the master values, so
+# every location is reduced to one multiplier per master
+# once (with fontTools.varLib.models) and each hover is a
+# handful of weighted sums. See masters.CrossMasterGeometry.
+#
+# Nothing in here may import from subscriber.py.
+
+class DesignspaceLocations:
+
+    """
+    The sources of a designspace and a list of named
+    locations to measure at. document may be a path
+    or a DesignSpaceDocument. locations is a list of
+    (name, userLocation) tuples. If it is None, the
+    document's instances are used.
+
+    Discrete axes are supported by only interpolating
+    a location from the sources that have the same
+    discrete values.
+    """
+
+    def __init__(self, document, locations=None):
+        if not isinstance(document, DesignSpaceDocument):
+            document = DesignSpaceDocument.fromfile(document)
+        self.document = document
+        self.sources = [
+            (source.path, source.layerName)
+            for source in document.sources
+        ]
+        self.sourceLocations = [
+            self._splitLocation(source.getFullDesignLocation(document))
+            for source in document.sources
+        ]
+        if locations is None:
+            locations = []
+            for index, instance in enumerate(document.instances):
+                name = instance.styleName or instance.name or f"Instance {index + 1}"
+                locations.append((name, instance.getFullUserLocation(document)))
+        self.locationNames = [name for (name, location) in locations]
+        self.locations = [
+            self._splitLocation(document.map_forward(location))
+            for (name, location) in locations
+        ]
+        self._weights = {}
+
+    def _splitLocation(self, designLocation):
+        continuous = {}
+        discrete = []
+        for axis in self.document.axes:
+            value = designLocation.get(axis.name, axis.map_forward(axis.default))
+            if isinstance(value, tuple):
+                value = value[0]
+            if hasattr(axis, "values"):
+                discrete.append(value)
+                continue
+            triple = [
+                axis.map_forward(v)
+                for v in (axis.minimum, axis.default, axis.maximum)
+            ]
+            continuous[axis.name] = normalizeValue(value, triple, allow_decreasing=True)
+        return continuous, tuple(discrete)
+
+    def __len__(self):
+        return len(self.locations)
+
+    def getWeights(self, available):
+        """
+        Return a list with a list of multipliers for every
+        location. The multipliers are in the order of the
+        source indexes in available, which should be the
+        sources that contain the glyph being measured.
+        An item is None if the location can't be made
+        from the available sources. This is cached.
+        """
+        available = tuple(available)
+        if available not in self._weights:
+            self._weights[available] = self._computeWeights(available)
+        return self._weights[available]
+
+    def _computeWeights(self, available):
+        models = {}
+        weights = []
+        for location, discrete in self.locations:
+            if discrete not in models:
+                models[discrete] = self._makeModel(available, discrete)
+            model = models[discrete]
+            if model is None:
+                weights.append(None)
+                continue
+            model, sourceIndexes = model
+            scalars = model.getMasterScalars(location)
+            row = [0.0] * len(available)
+            for sourceIndex, scalar in zip(sourceIndexes, scalars):
+                row[sourceIndex] = scalar
+            weights.append(row)
+        return weights
+
+    def _makeModel(self, available, discrete):
+        sourceIndexes = []
+        locations = []
+        for index, sourceIndex in enumerate(available):
+            location, sourceDiscrete = self.sourceLocations[sourceIndex]
+            if sourceDiscrete != discrete:
+                continue
+            sourceIndexes.append(index)
+            locations.append(location)
+        if not locations:
+            return None
+        try:
+            model = VariationModel(locations)
+        except VariationModelError:
+            # there must be a master at the default
+            # and no duplicate master locations.
+            return None
+        return model, sourceIndexes
@@ -0,0 +1,515 @@
+import math
+from array import array
+from fontTools.misc.bezierTools import (
+    solveQuadratic,
+    solveCubic
+)
+from fontTools.pens.basePen import decomposeQuadraticSegment
+
+# Pieces
+# ------
+#
+# The engines work on single Bezier pieces: lines, cubic
+# curves and quadratic curves with one off curve. Quadratic
+# B-splines are split at their implied on curves, which is
+# exact, so they never need to be converted to cubics.
+
+def segmentPieces(segments):
+    """
+    Return the segments (anything with .type and .original)
+    as a list of (type, points) tuples where every qcurve
+    has exactly one off curve.
+    """
+    pieces = []
+    for segment in segments:
+        segmentType = segment.type
+        points = tuple(segment.original)
+        if segmentType == "qcurve" and len(points) > 3:
+            start = points[0]
+            for offCurve, onCurve in decomposeQuadraticSegment(points[1:]):
+                pieces.append(("qcurve", (start, offCurve, onCurve)))
+                start = onCurve
+        else:
+            pieces.append((segmentType, points))
+    return pieces
+
+# Axis Intersections
+# ------------------
+#
+# These intersect the segments made by RelativeSegmentsPen
+# (anything with .type and .original will do) with horizontal
+# or vertical lines that extend infinitely. The roots are
+# found in closed form for each segment type. Segments are
+# treated as half open (t in [0, 1)) so that a point shared
+# by two consecutive segments is only counted once.
+
+tEpsilon = 1e-9
+vertexTolerance = 1e-7
+
+def horizontalIntersections(segments, y):
+    """
+    Return a sorted list of x values where the
+    segments intersect the horizontal line at y.
+    """
+    return _axisIntersections(segments, y, 1)
+
+def verticalIntersections(segments, x):
+    """
+    Return a sorted list of y values where the
+    segments intersect the vertical line at x.
+    """
+    return _axisIntersections(segments, x, 0)
+
+def axisIntersectionHits(segments, value, axis):
+    """
+    Return a list of (position, segmentIndex, t) for every
+    place where the segments, given as (type, points) tuples,
+    intersect the line at value on axis (0 for a vertical
+    line, 1 for a horizontal line). position is on the
+    other axis. The list is sorted by position.
+    """
+    other = 1 - axis
+    hits = []
+    for index, (segmentType, points) in enumerate(segments):
+        values = [point[axis] for point in points]
+        if value < min(values) or value > max(values):
+            continue
+        for t in _segmentRoots(segmentType, values, value):
+            if t < -tEpsilon or t >= 1 - tEpsilon:
+                continue
+            t = max(t, 0)
+            otherValues = [point[other] for point in points]
+            position = round(evaluateSegment(segmentType, otherValues, t), 6)
+            hits.append((position, index, t))
+    hits.sort()
+    return hits
+
+def rayIntersectionHits(segments, origin, direction, bounds=None):
+    """
+    Return a list of (distance, segmentIndex, t) for every
+    place where the segments, given as (type, points) tuples,
+    intersect the ray starting at origin and going in the
+    (unit length) direction. bounds is an optional list of
+    control point bounds for the segments that is used to
+    skip segments that the ray can't reach. The list is
+    sorted by distance.
+    """
+    ox, oy = origin
+    dx, dy = direction
+    hits = []
+    for index, (segmentType, points) in enumerate(segments):
+        if bounds is not None and not _rayMayHitRect(ox, oy, dx, dy, bounds[index]):
+            continue
+        # rotate into the frame of the ray: along is the
+        # distance along the ray and across is the distance
+        # from the ray. the roots are where across is zero.
+        along = []
+        across = []
+        for (x, y) in points:
+            x -= ox
+            y -= oy
+            along.append(x * dx + y * dy)
+            across.append(y * dx - x * dy)
+        if min(across) > vertexTolerance or max(across) < -vertexTolerance:
+            continue
+        ts = [
+            max(t, 0)
+            for t in _segmentRoots(segmentType, across, 0)
+            if -tEpsilon <= t < 1 - tEpsilon
+        ]
+        # a start point on the ray is a hit even if the
+        # segment only touches the ray there or runs
+        # along it, which the roots don't always show.
+        if abs(across[0]) <= vertexTolerance and not any(t <= tEpsilon for t in ts):
+            ts.append(0)
+        for t in ts:
+            distance = evaluateSegment(segmentType, along, t)
+            if distance < 0:
+                continue
+            hits.append((distance, index, t))
+    hits.sort()
+    return hits
+
+# Line Intersections
+# ------------------
+#
+# This replaces mojo.tools.IntersectGlyphWithLine. The
+# line is finite and the roots are found in the frame
+# of the line, so lines, quadratics and cubics are all
+# solved in closed form. Hits at the line's ends are
+# snapped to the ends so that callers can compare them
+# to the points that they made the line from.
+
+endpointTolerance = 1e-6
+
+class OutlineIntersector:
+
+    """
+    segments is a list of objects with .type and .original
+    (for example, the ones made by RelativeSegmentsPen).
+    width is the glyph's width, used for the side bearings.
+    """
+
+    def __init__(self, segments, width=0):
+        self.segments = segmentPieces(segments)
+        self.bounds = []
+        for segmentType, points in self.segments:
+            xs = [x for (x, y) in points]
+            ys = [y for (x, y) in points]
+            self.bounds.append((min(xs), min(ys), max(xs), max(ys)))
+        self.width = width
+
+    def __len__(self):
+        return len(self.segments)
+
+    def intersectLine(self, line, addSideBearings=False):
+        """
+        Return a list of (x, y) points where the outline
+        intersects the line ((x1, y1), (x2, y2)), in order
+        from the start of the line. If addSideBearings is
+        True, the places where the line crosses x=0 and
+        x=width are included.
+        """
+        (x1, y1), (x2, y2) = line
+        length = math.hypot(x2 - x1, y2 - y1)
+        if not length:
+            return []
+        direction = ((x2 - x1) / length, (y2 - y1) / length)
+        distances = [
+            distance
+            for (distance, index, t) in rayIntersectionHits(self.segments, (x1, y1), direction, self.bounds)
+            if distance <= length + endpointTolerance
+        ]
+        if addSideBearings and x1 != x2:
+            for x in (0, self.width):
+                f = (x - x1) / (x2 - x1)
+                if 0 <= f <= 1:
+                    distances.append(f * length)
+        distances.sort()
+        dx, dy = direction
+        points = []
+        for distance in distances:
+            if distance <= endpointTolerance:
+                point = (x1, y1)
+            elif abs(distance - length) <= endpointTolerance:
+                point = (x2, y2)
+            else:
+                point = (
+                    round(x1 + dx * distance, 6),
+                    round(y1 + dy * distance, 6)
+                )
+            if points and points[-1] == point:
+                continue
+            points.append(point)
+        return points
+
+
+def _rayMayHitRect(ox, oy, dx, dy, rect):
+    xMin, yMin, xMax, yMax = rect
+    tMin = 0
+    tMax = float("inf")
+    for o, d, low, high in ((ox, dx, xMin, xMax), (oy, dy, yMin, yMax)):
+        # the rect is padded so that rays through
+        # a corner aren't lost to rounding.
+        low -= vertexTolerance
+        high += vertexTolerance
+        if d == 0:
+            if o < low or o > high:
+                return False
+            continue
+        t1 = (low - o) / d
+        t2 = (high - o) / d
+        if t1 > t2:
+            t1, t2 = t2, t1
+        tMin = max(tMin, t1)
+        tMax = min(tMax, t2)
+        if tMin > tMax:
+            return False
+    return True
+
+def _axisIntersections(segments, value, axis):
+    segments = segmentPieces(segments)
+    found = set(
+        position
+        for (position, index, t) in axisIntersectionHits(segments, value, axis)
+    )
+    return sorted(found)
+
+def _segmentRoots(segmentType, values, value):
+    if segmentType == "line":
+        v0, v1 = values
+        if v0 == v1:
+            return []
+        return [(value - v0) / (v1 - v0)]
+    elif segmentType == "qcurve":
+        v0, v1, v2 = values
+        a = v0 - 2 * v1 + v2
+        b = 2 * (v1 - v0)
+        c = v0 - value
+        return solveQuadratic(a, b, c)
+    elif segmentType == "curve":
+        v0, v1, v2, v3 = values
+        a = -v0 + 3 * v1 - 3 * v2 + v3
+        b = 3 * v0 - 6 * v1 + 3 * v2
+        c = -3 * v0 + 3 * v1
+        d = v0 - value
+        return solveCubic(a, b, c, d)
+    return []
+
+def evaluateSegment(segmentType, values, t):
+    mt = 1 - t
+    if segmentType == "line":
+        v0, v1 = values
+        return v0 * mt + v1 * t
+    elif segmentType == "qcurve":
+        v0, v1, v2 = values
+        return v0 * mt * mt + 2 * v1 * mt * t + v2 * t * t
+    v0, v1, v2, v3 = values
+    return (
+        v0 * mt * mt * mt
+        + 3 * v1 * mt * mt * t
+        + 3 * v2 * mt * t * t
+        + v3 * t * t * t
+    )
+
+# Flattened Outlines
+# ------------------
+#
+# While the cursor is moving, the hover tests don't need
+# more precision than the screen can show. The pieces are
+# flattened into polylines and the hover lines are cut
+# with the polylines instead of the curves. The number of
+# edges per curve comes from Wang's formula, so no edge
+# strays from its curve by more than the tolerance. The
+# edges are bucketed into rows and columns, so horizontal
+# and vertical lines only look at the nearby edges.
+#
+# A curve can only cross a line where one of its edges
+# is within the tolerance of the line. Those pieces are
+# the only ones that are solved exactly when the hits
+# that are reported are needed.
+
+flatteningBucketCount = 64
+
+class FlattenedOutline:
+
+    """
+    segments is a list of objects with .type and .original
+    (for example, the ones made by RelativeSegmentsPen).
+    tolerance is the largest distance between an edge
+    and its curve.
+    """
+
+    def __init__(self, segments, tolerance):
+        self.pieces = segmentPieces(segments)
+        self.tolerance = tolerance
+        self.bounds = []
+        self.x1s = array("d")
+        self.y1s = array("d")
+        self.x2s = array("d")
+        self.y2s = array("d")
+        self.owners = array("l")
+        for index, (segmentType, points) in enumerate(self.pieces):
+            xs = [x for (x, y) in points]
+            ys = [y for (x, y) in points]
+            self.bounds.append((min(xs), min(ys), max(xs), max(ys)))
+            if segmentType == "line":
+                ts = (0, 1)
+            else:
+                steps = flatteningSteps(segmentType, points, tolerance)
+                ts = [i / steps for i in range(steps + 1)]
+            previous = None
+            for t in ts:
+                current = (
+                    evaluateSegment(segmentType, xs, t),
+                    evaluateSegment(segmentType, ys, t)
+                )
+                if previous is not None:
+                    self.x1s.append(previous[0])
+                    self.y1s.append(previous[1])
+                    self.x2s.append(current[0])
+                    self.y2s.append(current[1])
+                    self.owners.append(index)
+                previous = current
+        self.columns = _makeEdgeBuckets(self.x1s, self.x2s, tolerance)
+        self.rows = _makeEdgeBuckets(self.y1s, self.y2s, tolerance)
+
+    def __len__(self):
+        return len(self.owners)
+
+    def _edgeCandidates(self, line):
+        (x1, y1), (x2, y2) = line
+        if y1 == y2:
+            return _bucketEdges(self.rows, y1, self.tolerance)
+        if x1 == x2:
+            return _bucketEdges(self.columns, x1, self.tolerance)
+        return range(len(self.owners))
+
+    def intersectLine(self, line):
+        """
+        Return a list of ((x, y), pieceIndex) for every
+        place where the edges intersect the line, in order
+        from the start of the line. The points are only
+        as precise as the tolerance.
+        """
+        (lx1, ly1), (lx2, ly2) = line
+        ldx = lx2 - lx1
+        ldy = ly2 - ly1
+        x1s = self.x1s
+        y1s = self.y1s
+        x2s = self.x2s
+        y2s = self.y2s
+        hits = []
+        for i in self._edgeCandidates(line):
+            ex1 = x1s[i]
+            ey1 = y1s[i]
+            edx = x2s[i] - ex1
+            edy = y2s[i] - ey1
+            denominator = ldx * edy - ldy * edx
+            if not denominator:
+                continue
+            ox = ex1 - lx1
+            oy = ey1 - ly1
+            f = (ox * edy - oy * edx) / denominator
+            if f < 0 or f > 1:
+                continue
+            # edges are half open so that a vertex
+            # shared by two edges is only counted once.
+            g = (ox * ldy - oy * ldx) / denominator
+            if g < 0 or g >= 1:
+                continue
+            hits.append((f, (lx1 + ldx * f, ly1 + ldy * f), self.owners[i]))
+        hits.sort()
+        return [hit[1:] for hit in hits]
+
+    def nearbyPieces(self, line):
+        """
+        Return the indexes of the pieces that may
+        cross the line.
+        """
+        (lx1, ly1), (lx2, ly2) = line
+        length = math.hypot(lx2 - lx1, ly2 - ly1)
+        if not length:
+            return []
+        dx = (lx2 - lx1) / length
+        dy = (ly2 - ly1) / length
+        tolerance = self.tolerance
+        x1s = self.x1s
+        y1s = self.y1s
+        x2s = self.x2s
+        y2s = self.y2s
+        owners = self.owners
+        found = set()
+        for i in self._edgeCandidates(line):
+            index = owners[i]
+            if index in found:
+                continue
+            across1 = (y1s[i] - ly1) * dx - (x1s[i] - lx1) * dy
+            across2 = (y2s[i] - ly1) * dx - (x2s[i] - lx1) * dy
+            if across1 > tolerance and across2 > tolerance:
+                continue
+            if across1 < -tolerance and across2 < -tolerance:
+                continue
+            found.add(index)
+        return sorted(found)
+
+    def adjacentHits(self, line, value, axis, approximate=False):
+        """
+        Return the (x, y) points on the line where the
+        outline crosses closest to value on axis (0 for x,
+        1 for y), on or before and on or after the value.
+        Either is None if there is no hit on that side.
+        The points are solved on the curves unless
+        approximate is True.
+        """
+        if approximate:
+            points = [point for (point, index) in self.intersectLine(line)]
+        else:
+            points = self._exactLineHits(line)
+        before = after = None
+        for point in points:
+            position = point[axis]
+            if position <= value and (before is None or position > before[axis]):
+                before = point
+            if position >= value and (after is None or position < after[axis]):
+                after = point
+        return before, after
+
+    def _exactLineHits(self, line):
+        (x1, y1), (x2, y2) = line
+        length = math.hypot(x2 - x1, y2 - y1)
+        if not length:
+            return []
+        dx = (x2 - x1) / length
+        dy = (y2 - y1) / length
+        pieces = [self.pieces[index] for index in self.nearbyPieces(line)]
+        points = []
+        for distance, index, t in rayIntersectionHits(pieces, (x1, y1), (dx, dy)):
+            if distance > length + endpointTolerance:
+                break
+            distance = min(distance, length)
+            points.append((x1 + dx * distance, y1 + dy * distance))
+        return points
+
+
+def flatteningSteps(segmentType, points, tolerance):
+    """
+    Return the number of edges needed to keep a
+    flattened curve within tolerance of the curve.
+    """
+    if segmentType == "curve":
+        degree = 3
+    elif segmentType == "qcurve":
+        degree = 2
+    else:
+        return 1
+    deviation = 0
+    for (x0, y0), (x1, y1), (x2, y2) in zip(points, points[1:], points[2:]):
+        deviation = max(deviation, math.hypot(x0 - 2 * x1 + x2, y0 - 2 * y1 + y2))
+    if not deviation:
+        return 1
+    steps = math.sqrt(degree * (degree - 1) * deviation / (8 * tolerance))
+    return max(1, int(math.ceil(steps)))
+
+def getFlatteningTolerance(scale, pixelTolerance=0.5, minimum=1 / 16, maximum=64):
+    """
+    Return the flattening tolerance, in units, for
+    the view scale. The tolerance is rounded down to
+    a power of two so that only a handful of levels
+    of detail are made while zooming.
+    """
+    tolerance = pixelTolerance / scale
+    tolerance = 2 ** math.floor(math.log2(tolerance))
+    return min(maximum, max(minimum, tolerance))
+
+def _makeEdgeBuckets(values1, values2, tolerance):
+    # edge indexes in even steps along one axis
+    if not values1:
+        return (0, 1, [])
+    low = min(min(values1), min(values2))
+    high = max(max(values1), max(values2))
+    size = max((high - low) / flatteningBucketCount, tolerance, 1)
+    buckets = [array("l") for i in range(int((high - low) / size) + 1)]
+    for i, (value1, value2) in enumerate(zip(values1, values2)):
+        if value1 > value2:
+            value1, value2 = value2, value1
+        start = int((value1 - low) / size)
+        end = int((value2 - low) / size)
+        for bucket in range(start, end + 1):
+            buckets[bucket].append(i)
+    return (low, size, buckets)
+
+def _bucketEdges(buckets, value, tolerance):
+    low, size, buckets = buckets
+    if not buckets:
+        return ()
+    start = max(0, int((value - tolerance - low) // size))
+    end = min(len(buckets) - 1, int((value + tolerance - low) // size))
+    if start > end:
+        return ()
+    if start == end:
+        return buckets[start]
+    found = set()
+    for bucket in range(start, end + 1):
+        found.update(buckets[bucket])
+    return sorted(found)
@@ -0,0 +1,285 @@
+import math
+from array import array
+from .geometry import indexedSegments
+from .intersection import (
+    axisIntersectionHits,
+    evaluateSegment
+)
+
+# -------------
+# Cross Masters
+# -------------
+#
+# The feature under the cursor is measured in the current
+# glyph and then, in one pass, in the same glyph in other
+# masters. The features are described by point indexes
+# (and segment parameters for outline measurements) in the
+# current glyph, so nothing has to be found again in the
+# other masters. Points are matched by identifier when
+# possible and by index when the contour structure is
+# the same. Anything that can't be matched is None.
+#
+# Nothing in here may import from subscriber.py.
+
+class CrossMasterGeometry:
+
+    """
+    pointArrays is a list of geometry.PointArrays objects.
+    The first item is the reference glyph. Every item
+    gets a result in the lists returned by the measure
+    methods.
+    """
+
+    def __init__(self, pointArrays):
+        self.pointArrays = pointArrays
+        reference = pointArrays[0]
+        self.reference = reference
+        self.indexMaps = [
+            _makeIndexMap(reference, other)
+            for other in pointArrays
+        ]
+        # columns of each point's coordinates in every master
+        # (NaN where the point can't be matched.)
+        self.xColumns = []
+        self.yColumns = []
+        nan = math.nan
+        for index in range(len(reference)):
+            xColumn = array("d")
+            yColumn = array("d")
+            for other, indexMap in zip(pointArrays, self.indexMaps):
+                otherIndex = -1
+                if indexMap is not None:
+                    otherIndex = indexMap[index]
+                if otherIndex < 0:
+                    xColumn.append(nan)
+                    yColumn.append(nan)
+                else:
+                    xColumn.append(other.xs[otherIndex])
+                    yColumn.append(other.ys[otherIndex])
+            self.xColumns.append(xColumn)
+            self.yColumns.append(yColumn)
+        self._segments = None
+        self._segmentPoints = None
+
+    def __len__(self):
+        return len(self.pointArrays)
+
+    # Features
+    #
+    # A feature is a (kind, data) tuple:
+    #
+    #   ("points", (position1, position2, onCurve))
+    #   ("outline", (y, x1, x2, x, y1, y2))
+    #
+    # Features are reduced to width ends and height ends.
+    # Each of these is None or a tuple of four columns
+    # (x1s, y1s, x2s, y2s) with one value per master.
+
+    def findPointIndex(self, position, onCurve=None):
+        return self.reference.indexOfPosition(position, onCurve)
+
+    def getFeatureEnds(self, feature):
+        kind, data = feature
+        if kind == "points":
+            position1, position2, onCurve = data
+            index1 = self.findPointIndex(position1, onCurve)
+            index2 = self.findPointIndex(position2, onCurve)
+            if index1 is None or index2 is None:
+                return None
+            ends = (
+                self.xColumns[index1],
+                self.yColumns[index1],
+                self.xColumns[index2],
+                self.yColumns[index2]
+            )
+            return ends, ends
+        elif kind == "outline":
+            y, x1, x2, x, y1, y2 = data
+            widthEnds = self._getOutlineEnds(y, 1, x1, x2)
+            heightEnds = self._getOutlineEnds(x, 0, y1, y2)
+            if widthEnds is None and heightEnds is None:
+                return None
+            return widthEnds, heightEnds
+        return None
+
+    def measureFeature(self, feature):
+        """
+        Return a list of (width, height, distance)
+        for the feature in every master.
+        """
+        ends = self.getFeatureEnds(feature)
+        if ends is None:
+            return None
+        return _measureEnds(*ends)
+
+    def measureFeatureWithWeights(self, feature, weights):
+        """
+        Return a list of (width, height, distance) for
+        the feature at every location in weights. weights
+        is a list of lists with a multiplier for each
+        master (or None if the location can't be made.)
+        Only the feature's points are interpolated.
+        """
+        ends = self.getFeatureEnds(feature)
+        if ends is None:
+            return None
+        widthEnds, heightEnds = ends
+        widthEnds = _weightColumns(widthEnds, weights)
+        if ends[0] is ends[1]:
+            heightEnds = widthEnds
+        else:
+            heightEnds = _weightColumns(heightEnds, weights)
+        return _measureEnds(widthEnds, heightEnds)
+
+    # Outline
+
+    def _getSegments(self):
+        if self._segments is None:
+            xs = self.reference.xs
+            ys = self.reference.ys
+            self._segments = indexedSegments(self.reference)
+            self._segmentPoints = [
+                (segmentType, [_averagePoint(xs, ys, group) for group in controls])
+                for (segmentType, controls) in self._segments
+            ]
+        return self._segments
+
+    def _findHit(self, value, axis, position):
+        self._getSegments()
+        for (hitPosition, segmentIndex, t) in axisIntersectionHits(self._segmentPoints, value, axis):
+            if abs(hitPosition - position) < 0.01:
+                return (segmentIndex, t)
+        return None
+
+    def _evaluateHit(self, hit):
+        segmentIndex, t = hit
+        segmentType, controls = self._segments[segmentIndex]
+        xColumns = [_averageColumn(self.xColumns, group) for group in controls]
+        yColumns = [_averageColumn(self.yColumns, group) for group in controls]
+        xs = array("d", [evaluateSegment(segmentType, values, t) for values in zip(*xColumns)])
+        ys = array("d", [evaluateSegment(segmentType, values, t) for values in zip(*yColumns)])
+        return xs, ys
+
+    def _getOutlineEnds(self, value, axis, position1, position2):
+        # the ends may be fallbacks (metrics or bounds)
+        # that aren't on the outline. those can't be
+        # found in the other masters.
+        if position1 is None or position2 is None:
+            return None
+        hit1 = self._findHit(value, axis, position1)
+        hit2 = self._findHit(value, axis, position2)
+        if hit1 is None or hit2 is None:
+            return None
+        return self._evaluateHit(hit1) + self._evaluateHit(hit2)
+
+
+class CrossMasterGeometryCache:
+
+    """
+    Hold a CrossMasterGeometry until any of the point
+    arrays it was built from are replaced. The point
+    arrays are glyph representations, so they are
+    replaced whenever their glyph changes.
+    """
+
+    def __init__(self):
+        self.pointArrays = None
+        self.geometry = None
+
+    def get(self, pointArrays):
+        cached = self.pointArrays
+        if cached is None or len(cached) != len(pointArrays) or any(a is not b for a, b in zip(cached, pointArrays)):
+            self.pointArrays = pointArrays
+            self.geometry = CrossMasterGeometry(pointArrays)
+        return self.geometry
+
+    def clear(self):
+        self.pointArrays = None
+        self.geometry = None
+
+
+def _makeIndexMap(reference, other):
+    if other is reference:
+        return list(range(len(reference)))
+    sameStructure = (
+        reference.typeCodes == other.typeCodes
+        and reference.contourStarts == other.contourStarts
+    )
+    indexMap = []
+    found = False
+    for index, identifier in enumerate(reference.identifiers):
+        otherIndex = None
+        if identifier is not None:
+            otherIndex = other.identifierToIndex.get(identifier)
+        if otherIndex is None:
+            if sameStructure:
+                otherIndex = index
+            else:
+                otherIndex = -1
+        if otherIndex >= 0:
+            found = True
+        indexMap.append(otherIndex)
+    if not found:
+        return None
+    return indexMap
+
+def _measureEnds(widthEnds, heightEnds):
+    # the width comes from the x values of the width
+    # ends and the height from the y values of the
+    # height ends. NaN means the point is missing.
+    count = len((widthEnds or heightEnds)[0])
+    widths = [None] * count
+    heights = [None] * count
+    if widthEnds is not None:
+        x1s, y1s, x2s, y2s = widthEnds
+        widths = [
+            None if math.isnan(x1 + x2) else abs(x2 - x1)
+            for (x1, x2) in zip(x1s, x2s)
+        ]
+    if heightEnds is not None:
+        x1s, y1s, x2s, y2s = heightEnds
+        heights = [
+            None if math.isnan(y1 + y2) else abs(y2 - y1)
+            for (y1, y2) in zip(y1s, y2s)
+        ]
+    results = []
+    for width, height in zip(widths, heights):
+        if width is None and height is None:
+            results.append(None)
+            continue
+        distance = None
+        if width is not None and height is not None:
+            distance = math.hypot(width, height)
+        results.append((width, height, distance))
+    return results
+
+def _weightColumns(ends, weights):
+    if ends is None:
+        return None
+    weighted = []
+    for column in ends:
+        values = array("d")
+        for row in weights:
+            if row is None:
+                values.append(math.nan)
+                continue
+            value = 0
+            for weight, masterValue in zip(row, column):
+                # masters that don't contribute may be missing
+                if weight:
+                    value += weight * masterValue
+            values.append(value)
+        weighted.append(values)
+    return tuple(weighted)
+
+def _averagePoint(xs, ys, group):
+    count = len(group)
+    x = sum(xs[i] for i in group) / count
+    y = sum(ys[i] for i in group) / count
+    return (x, y)
+
+def _averageColumn(columns, group):
+    if len(group) == 1:
+        return columns[group[0]]
+    count = len(group)
+    return [sum(values) / count for values in zip(*[columns[i] for i in group])]
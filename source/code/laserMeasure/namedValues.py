@@ -0,0 +1,53 @@
+libKey = "com.typesupply.LaserMeasure.measurements"
+
+
+def loadNamedMeasurements(font):
+    namedWidthMeasurements = {}
+    namedHeightMeasurements = {}
+    namedWidthHeightMeasurements = {}
+    if font is not None:
+        stored = font.lib.get(libKey, {})
+        for name, data in stored.items():
+            width = data.get("width")
+            height = data.get("height")
+            key = None
+            location = None
+            if width is not None and height is not None:
+                location = namedWidthHeightMeasurements
+                key = (width, height)
+            elif width is not None:
+                location = namedWidthMeasurements
+                key = width
+                name = f"W: {name}"
+            elif height is not None:
+                location = namedHeightMeasurements
+                key = height
+                name = f"H: {name}"
+            if location is None:
+                continue
+            if key not in location:
+                location[key] = []
+            location[key].append(name)
+        dicts = [
+            namedWidthMeasurements,
+            namedHeightMeasurements,
+            namedWidthHeightMeasurements
+        ]
+        for d in dicts:
+            for d, v in d.items():
+                v.sort()
+    return namedWidthHeightMeasurements, namedWidthMeasurements, namedHeightMeasurements
+
+
+def findMatchingNamedMeasurements(
+        measurements,
+        namedWidthHeightMeasurements,
+        namedWidthMeasurements,
+        namedHeightMeasurements
+    ):
+    w, h = measurements
+    names = []
+    names += namedWidthHeightMeasurements.get((w, h), [])
+    names += namedWidthMeasurements.get(w, [])
+    names += namedHeightMeasurements.get(h, [])
+    return names
@@ -2,10 +2,10 @@ import ezui
 from mojo import events
 
 if __name__ == "__main__":
-    from subscriber import extensionID
+    from defaults import extensionID
     import legacy
 else:
-    from .subscriber import extensionID
+    from .defaults import extensionID
     from . import legacy
 
 
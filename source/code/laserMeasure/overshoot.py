@@ -0,0 +1,288 @@
+from fontTools.misc.bezierTools import solveQuadratic
+from fontTools.pens.pointPen import PointToSegmentPen
+from .audit import (
+    makeGlyphSnapshot,
+    drawSnapshot
+)
+from .geometry import (
+    RelativeSegmentsPen,
+    getVerticalMetrics
+)
+from .intersection import (
+    segmentPieces,
+    evaluateSegment
+)
+
+# ---------
+# Overshoot
+# ---------
+#
+# The top and bottom of every contour are compared to
+# the nearest vertical metric (the same ones used for
+# the measurement fallbacks plus the OS/2 typo ascender
+# and descender when they are different.) The OS/2 win
+# ascent and descent are clipping bounds rather than
+# heights that outlines align to, so they aren't used.
+# Round extremes are expected
+# to overshoot the metric by the size of the metric's
+# blue zone and flat extremes are expected to sit on the
+# metric. Vertical extremes are not affected by the
+# italic angle, so no slant correction is needed.
+#
+# Nothing in here may import from subscriber.py.
+
+flatTolerance = 0.01
+
+os2Metrics = (
+    ("typoAscender", "openTypeOS2TypoAscender"),
+    ("typoDescender", "openTypeOS2TypoDescender")
+)
+
+def auditOvershoots(
+        font,
+        glyphNames=None,
+        tolerance=1,
+        searchDistance=None
+    ):
+    """
+    Audit the top and bottom of every contour in the
+    glyphs in font. The result is a dictionary of
+    glyph names and lists of dictionaries of this form:
+
+        {
+            contour : contour index,
+            edge : "top" or "bottom",
+            metric : metric name,
+            metricValue : metric value,
+            extreme : y value of the extreme,
+            overshoot : distance beyond the metric,
+            expected : expected overshoot or None,
+            round : True if the extreme is on a curve,
+            flag : None, "missing", "excess" or "misaligned"
+        }
+
+    The expected overshoot comes from the blue zones
+    (postscriptBlueValues and postscriptOtherBlues) that
+    contain the metric. Extremes farther than searchDistance
+    from every metric are skipped. By default, this is the
+    largest blue zone plus tolerance, or 20 units if there
+    are no blue zones. Flat extremes are only reported
+    if they are in the metric's blue zone, or within
+    tolerance of the metric if it has no zone.
+    """
+    expectations = makeOvershootExpectations(font.info)
+    if searchDistance is None:
+        searchDistance = getDefaultSearchDistance(font.info, tolerance)
+    if glyphNames is None:
+        glyphNames = sorted(font.keys())
+    report = {}
+    for glyphName in glyphNames:
+        snapshot = makeGlyphSnapshot(font[glyphName], font)
+        report[glyphName] = auditSnapshotOvershoots(
+            snapshot,
+            expectations,
+            tolerance,
+            searchDistance
+        )
+    return report
+
+def auditSnapshotOvershoots(snapshot, expectations, tolerance, searchDistance):
+    """
+    expectations is made by makeOvershootExpectations.
+    """
+    results = []
+    for contourIndex, contour in enumerate(snapshot):
+        pen = RelativeSegmentsPen()
+        drawSnapshot((contour,), PointToSegmentPen(pen))
+        segments = pen.segments
+        if not segments:
+            continue
+        extremes = contourVerticalExtremes(segments)
+        for edge, (y, isRound) in zip(("bottom", "top"), extremes):
+            record = _classifyExtreme(
+                contourIndex,
+                edge,
+                y,
+                isRound,
+                expectations,
+                tolerance,
+                searchDistance
+            )
+            if record is not None:
+                results.append(record)
+    return results
+
+def _classifyExtreme(contourIndex, edge, y, isRound, expectations, tolerance, searchDistance):
+    nearest = None
+    for name, value, expected in expectations:
+        distance = abs(y - value)
+        if distance > searchDistance:
+            continue
+        if nearest is None or distance < nearest[0]:
+            nearest = (distance, name, value, expected)
+    if nearest is None:
+        return None
+    distance, name, value, expected = nearest
+    if edge == "top":
+        overshoot = y - value
+    else:
+        overshoot = value - y
+    expectedOvershoot = None
+    if expected is not None:
+        if edge == "top":
+            expectedOvershoot = expected[1]
+        else:
+            expectedOvershoot = expected[0]
+    flag = None
+    if not isRound:
+        # a flat is only meant to sit on the metric if it
+        # is in the metric's zone (or within tolerance of
+        # the metric if it has no zone.) flats outside of
+        # that, such as serifs near the baseline, are
+        # skipped.
+        if expected is None:
+            if distance > tolerance:
+                return None
+        elif not value - expected[0] <= y <= value + expected[1]:
+            return None
+        if abs(overshoot) > flatTolerance:
+            flag = "misaligned"
+    elif expectedOvershoot is None:
+        if overshoot <= 0:
+            flag = "missing"
+    elif overshoot < expectedOvershoot - tolerance:
+        flag = "missing"
+    elif overshoot > expectedOvershoot + tolerance:
+        flag = "excess"
+    return dict(
+        contour=contourIndex,
+        edge=edge,
+        metric=name,
+        metricValue=value,
+        extreme=y,
+        overshoot=overshoot,
+        expected=expectedOvershoot,
+        round=isRound,
+        flag=flag
+    )
+
+# Zones
+# -----
+
+def makeOvershootExpectations(info):
+    """
+    Return a list of (name, value, expected) for the
+    vertical metrics in info. expected is a (bottom, top)
+    tuple of overshoots or None.
+    """
+    zones = getBlueZones(info)
+    return [
+        (name, value, getExpectedOvershoot(value, zones))
+        for (name, value) in getOvershootMetrics(info)
+    ]
+
+def getOvershootMetrics(info):
+    """
+    Return a list of (name, value) for the vertical
+    metrics and the OS/2 typo metrics in info that
+    are defined and have different values.
+    """
+    metrics = getVerticalMetrics(info)
+    values = set(value for (name, value) in metrics)
+    for name, attribute in os2Metrics:
+        value = getattr(info, attribute, None)
+        if value is None or value in values:
+            continue
+        metrics.append((name, value))
+        values.add(value)
+    return metrics
+
+def getDefaultSearchDistance(info, tolerance):
+    sizes = [top - bottom for (bottom, top) in getBlueZones(info)]
+    if not sizes:
+        return 20
+    return max(sizes) + tolerance
+
+def getBlueZones(info):
+    """
+    Return a list of (bottom, top) tuples from the
+    font's postscriptBlueValues and postscriptOtherBlues.
+    """
+    zones = []
+    for values in (info.postscriptBlueValues, info.postscriptOtherBlues):
+        if not values:
+            continue
+        for i in range(0, len(values) - 1, 2):
+            zones.append((values[i], values[i + 1]))
+    return zones
+
+def getExpectedOvershoot(value, zones):
+    """
+    Return (bottom, top) overshoots for the metric
+    from the zones that contain it or None if no
+    zone contains it.
+    """
+    for bottom, top in zones:
+        if bottom <= value <= top:
+            return (value - bottom, top - value)
+    return None
+
+# Extremes
+# --------
+#
+# The derivative of every curve segment is a quadratic
+# (or linear) polynomial in t, so the extremes inside
+# a segment are solved in closed form. The on curve
+# points are always candidates. numpy isn't available
+# to extensions, so the roots aren't solved in one
+# vectorized batch. Copying the coefficients into
+# arrays first made this no faster, so each segment is
+# solved as it is visited. A font of about 1500 glyphs
+# is audited in a fraction of a second.
+
+def contourVerticalExtremes(segments):
+    """
+    Return ((yMin, isRound), (yMax, isRound)) for the
+    segments of one contour. isRound is False when
+    the extreme is on a horizontal line segment.
+    """
+    pieces = segmentPieces(segments)
+    candidates = []
+    for segmentType, points in pieces:
+        ys = [y for (x, y) in points]
+        candidates.append(ys[0])
+        candidates.append(ys[-1])
+        if segmentType == "curve":
+            y0, y1, y2, y3 = ys
+            roots = solveQuadratic(
+                3 * (-y0 + 3 * y1 - 3 * y2 + y3),
+                6 * (y0 - 2 * y1 + y2),
+                3 * (y1 - y0)
+            )
+        elif segmentType == "qcurve":
+            y0, y1, y2 = ys
+            roots = solveQuadratic(
+                0,
+                2 * (y0 - 2 * y1 + y2),
+                2 * (y1 - y0)
+            )
+        else:
+            continue
+        for t in roots:
+            if 0 < t < 1:
+                candidates.append(evaluateSegment(segmentType, ys, t))
+    yMin = min(candidates)
+    yMax = max(candidates)
+    return (
+        (yMin, not _isFlatExtreme(pieces, yMin)),
+        (yMax, not _isFlatExtreme(pieces, yMax))
+    )
+
+def _isFlatExtreme(pieces, y):
+    for segmentType, points in pieces:
+        if segmentType != "line":
+            continue
+        (x1, y1), (x2, y2) = points
+        if abs(y1 - y) <= flatTolerance and abs(y2 - y) <= flatTolerance:
+            return True
+    return False
@@ -0,0 +1,233 @@
+import bisect
+from array import array
+from fontTools.misc.bezierTools import solveQuadratic
+from .geometry import angledPoint
+from .intersection import (
+    segmentPieces,
+    evaluateSegment
+)
+
+# --------
+# Profiles
+# --------
+#
+# An outline extent profile is the leftmost and rightmost
+# outline position at a series of heights. Compared to the
+# glyph's origin and width, these are the sidebearings at
+# each height.
+#
+# The segments are split into pieces that only go up or
+# down. Each piece can cross a height at most once, so a
+# whole profile is made in one sweep: every piece looks
+# up the levels within its vertical range and solves for
+# each of them. An OutlineProfile is made once per glyph
+# change and the profiles for each set of levels are kept
+# on it.
+#
+# Nothing in here may import from subscriber.py.
+
+solveTolerance = 1e-6
+solveIterations = 32
+
+
+class OutlineProfile:
+
+    """
+    segments is a list of objects with .type and .original
+    (for example, the ones made by RelativeSegmentsPen.)
+    """
+
+    def __init__(self, segments):
+        pieces = []
+        for segmentType, points in segmentPieces(segments):
+            xs = tuple(x for (x, y) in points)
+            ys = tuple(y for (x, y) in points)
+            ts = [0] + _turningParameters(segmentType, ys) + [1]
+            for t1, t2 in zip(ts, ts[1:]):
+                y1 = evaluateSegment(segmentType, ys, t1)
+                y2 = evaluateSegment(segmentType, ys, t2)
+                pieces.append((min(y1, y2), max(y1, y2), t1, t2, segmentType, xs, ys))
+        pieces.sort(key=lambda piece: piece[0])
+        self.pieces = pieces
+        self.pieceBottoms = [piece[0] for piece in pieces]
+        self._extents = {}
+
+    def extentAt(self, y):
+        """
+        Return (left, right) at y or None if the
+        outline doesn't cross y.
+        """
+        left = right = None
+        end = bisect.bisect_right(self.pieceBottoms, y)
+        for i in range(end):
+            yMin, yMax, t1, t2, segmentType, xs, ys = self.pieces[i]
+            if y > yMax:
+                continue
+            for x in _pieceCrossings(self.pieces[i], y):
+                if left is None or x < left:
+                    left = x
+                if right is None or x > right:
+                    right = x
+        if left is None:
+            return None
+        return left, right
+
+    def extents(self, levels):
+        """
+        Return a list of (y, left, right) for each level.
+        left and right are None when the outline doesn't
+        cross the level.
+        """
+        key = tuple(levels)
+        if key not in self._extents:
+            self._extents[key] = self._sweep(key)
+        return self._extents[key]
+
+    def _sweep(self, levels):
+        order = sorted(range(len(levels)), key=lambda i: levels[i])
+        sortedLevels = [levels[i] for i in order]
+        nan = float("nan")
+        lefts = array("d", [nan] * len(levels))
+        rights = array("d", [nan] * len(levels))
+        for piece in self.pieces:
+            yMin, yMax = piece[:2]
+            start = bisect.bisect_left(sortedLevels, yMin)
+            end = bisect.bisect_right(sortedLevels, yMax)
+            for j in range(start, end):
+                i = order[j]
+                for x in _pieceCrossings(piece, sortedLevels[j]):
+                    # nan comparisons are always False
+                    if not x >= lefts[i]:
+                        lefts[i] = x
+                    if not x <= rights[i]:
+                        rights[i] = x
+        profile = []
+        for i, y in enumerate(levels):
+            left = lefts[i]
+            if left != left:
+                profile.append((y, None, None))
+            else:
+                profile.append((y, left, rights[i]))
+        return profile
+
+    def sidebearingsAt(self, y, width, italicAngle=0, italicSlantOffset=0):
+        """
+        Return (left, right) sidebearings at y or None.
+        The sidebearings are measured from the origin and
+        width lines slanted by italicAngle.
+        """
+        extent = self.extentAt(y)
+        if extent is None:
+            return None
+        return _extentToSidebearings(y, extent, width, italicAngle, italicSlantOffset)
+
+    def sidebearings(self, levels, width, italicAngle=0, italicSlantOffset=0):
+        """
+        Return a list of (y, left, right) sidebearings for
+        each level. left and right are None when the outline
+        doesn't cross the level.
+        """
+        profile = []
+        for y, left, right in self.extents(levels):
+            if left is None:
+                profile.append((y, None, None))
+                continue
+            left, right = _extentToSidebearings(y, (left, right), width, italicAngle, italicSlantOffset)
+            profile.append((y, left, right))
+        return profile
+
+
+def _extentToSidebearings(y, extent, width, italicAngle, italicSlantOffset):
+    left, right = extent
+    origin = angledPoint((0, y), italicAngle, italicSlantOffset)[0]
+    advance = angledPoint((width, y), italicAngle, italicSlantOffset)[0]
+    return left - origin, advance - right
+
+def _turningParameters(segmentType, values):
+    # the t values within (0, 1) where the
+    # derivative of the segment is zero.
+    if segmentType == "curve":
+        v0, v1, v2, v3 = values
+        a = 3 * (-v0 + 3 * v1 - 3 * v2 + v3)
+        b = 6 * (v0 - 2 * v1 + v2)
+        c = 3 * (v1 - v0)
+    elif segmentType == "qcurve":
+        v0, v1, v2 = values
+        a = 0
+        b = 2 * (v0 - 2 * v1 + v2)
+        c = 2 * (v1 - v0)
+    else:
+        return []
+    return sorted(t for t in solveQuadratic(a, b, c) if 0 < t < 1)
+
+def _pieceCrossings(piece, y):
+    yMin, yMax, t1, t2, segmentType, xs, ys = piece
+    if yMin == yMax:
+        # flat pieces touch the level along their length
+        return (
+            evaluateSegment(segmentType, xs, t1),
+            evaluateSegment(segmentType, xs, t2)
+        )
+    t = _solveMonotonic(segmentType, ys, t1, t2, y)
+    return (evaluateSegment(segmentType, xs, t),)
+
+def _solveMonotonic(segmentType, values, t1, t2, value):
+    # lines and quadratics are solved in closed form.
+    # cubics use regula falsi (Illinois variant) within
+    # a range where the segment only goes up or down,
+    # so there is exactly one root.
+    if segmentType == "qcurve":
+        v0, v1, v2 = values
+        roots = solveQuadratic(v0 - 2 * v1 + v2, 2 * (v1 - v0), v0 - value)
+        for t in roots:
+            if t1 - solveTolerance <= t <= t2 + solveTolerance:
+                return min(t2, max(t1, t))
+    f1 = evaluateSegment(segmentType, values, t1) - value
+    f2 = evaluateSegment(segmentType, values, t2) - value
+    if segmentType == "line" or abs(f1) <= solveTolerance:
+        if segmentType == "line" and f1 != f2:
+            return t1 - f1 * (t2 - t1) / (f2 - f1)
+        return t1
+    if abs(f2) <= solveTolerance:
+        return t2
+    side = 0
+    t = t1
+    for i in range(solveIterations):
+        t = (t1 * f2 - t2 * f1) / (f2 - f1)
+        f = evaluateSegment(segmentType, values, t) - value
+        if abs(f) <= solveTolerance:
+            break
+        if (f > 0) == (f2 > 0):
+            t2 = t
+            f2 = f
+            if side == -1:
+                f1 /= 2
+            side = -1
+        else:
+            t1 = t
+            f1 = f
+            if side == 1:
+                f2 /= 2
+            side = 1
+    return t
+
+
+def makeProfileLevels(bottom, top, count):
+    """
+    Return count evenly spaced y values from
+    bottom to top (inclusive.)
+    """
+    if count < 2:
+        return [(bottom + top) / 2]
+    step = (top - bottom) / (count - 1)
+    return [bottom + step * i for i in range(count)]
+
+def outlineExtentProfile(segments, levels):
+    """
+    Return a list of (y, left, right) for each level.
+    left and right are None when the outline doesn't
+    cross the level. segments are objects with .type
+    and .original (for example, the ones made by
+    RelativeSegmentsPen.)
+    """
+    return OutlineProfile(segments).extents(levels)
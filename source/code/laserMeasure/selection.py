@@ -0,0 +1,441 @@
+import bisect
+import math
+import operator
+from collections import Counter, deque
+from itertools import groupby
+
+# ---------
+# Selection
+# ---------
+#
+# Statistics for large point selections. The selected
+# coordinates are kept as multisets (point, x value and
+# y value counts.) When the selection changes by a few
+# points, only the difference is applied to the sorted
+# points, the convex hull and the nearest pair. The rest
+# of the statistics are computed again the first time
+# that they are asked for. A larger change rebuilds
+# everything. A selection that hasn't changed costs one
+# comparison.
+#
+# - the nearest pair is found with a sweep over the points
+#   sorted by x that only looks at the points within the
+#   best distance so far, sorted by y. The sweep stops
+#   early when integer points 1 unit apart are found.
+# - the farthest pair is on the convex hull and is found
+#   by rotating calipers. Only the lowest and highest
+#   point at each x can be on the hull.
+# - the x and y clusters are the distinct values with
+#   nearby values merged. These are the stem positions.
+# - the dx and dy histograms count the distances between
+#   every pair of points. These are found from the pairs
+#   of clusters, weighted by the cluster sizes, so the
+#   cost depends on the number of clusters, not points.
+#   When the clusters are dense, the counts are correlated
+#   with themselves at every offset instead. Only the
+#   maximumHistogramPositions most populated positions
+#   are compared, so the histograms of large selections
+#   with scattered points are estimates.
+#
+# A selection of 5000 points, from scratch or after a
+# small change, is measured within a 60 fps frame. See
+# experiments/selectionBenchmark.py.
+#
+# Nothing in here may import from subscriber.py.
+
+defaultClusterTolerance = 1
+defaultHistogramSize = 5
+maximumIncrementalChanges = 64
+maximumHistogramPositions = 64
+
+
+class SelectionStatistics:
+
+    def __init__(self, clusterTolerance=defaultClusterTolerance, histogramSize=defaultHistogramSize):
+        self.clusterTolerance = clusterTolerance
+        self.histogramSize = histogramSize
+        self.points = Counter()
+        self.xValues = Counter()
+        self.yValues = Counter()
+        self._count = 0
+        # rebuilt after every change
+        self._cache = {}
+        # updated after small changes
+        self._incremental = {}
+
+    def __len__(self):
+        return self._count
+
+    def update(self, points):
+        """
+        Set the selection to points, a list of (x, y)
+        tuples. Return True if the selection changed.
+        """
+        points = Counter(points)
+        # the items are compared because Counter's
+        # own comparison is much slower.
+        if points.items() == self.points.items():
+            return False
+        self.xValues = Counter(map(operator.itemgetter(0), points.elements()))
+        self.yValues = Counter(map(operator.itemgetter(1), points.elements()))
+        if abs(len(points) - len(self.points)) > maximumIncrementalChanges:
+            self._incremental.clear()
+        else:
+            newPoints = points.keys() - self.points.keys()
+            oldPoints = self.points.keys() - points.keys()
+            if len(newPoints) + len(oldPoints) > maximumIncrementalChanges:
+                self._incremental.clear()
+            else:
+                self._updateIncremental(list(newPoints), oldPoints)
+        self.points = points
+        self._count = sum(points.values())
+        self._cache.clear()
+        return True
+
+    def _updateIncremental(self, newPoints, oldPoints):
+        # newPoints are the distinct points that weren't
+        # selected before and oldPoints are the ones
+        # that aren't selected anymore.
+        incremental = self._incremental
+        if "sorted" not in incremental:
+            incremental.clear()
+            return
+        sortedPoints = incremental["sorted"]
+        for point in oldPoints:
+            del sortedPoints[bisect.bisect_left(sortedPoints, point)]
+        for point in newPoints:
+            bisect.insort(sortedPoints, point)
+        # the hull only changes if one of its points
+        # was removed or a point was added outside of it.
+        hull = incremental.get("hull")
+        if hull is not None:
+            if any(point in oldPoints for point in hull):
+                del incremental["hull"]
+            elif newPoints:
+                incremental["hull"] = convexHull(hull + newPoints)
+        # removing points can't make the nearest pair
+        # nearer, so only the new points are checked
+        # unless one of the pair was removed.
+        if "nearest" in incremental:
+            nearest = incremental["nearest"]
+            if nearest is None or nearest[1] in oldPoints or nearest[2] in oldPoints:
+                del incremental["nearest"]
+            else:
+                for point in newPoints:
+                    nearest = _nearerPair(sortedPoints, point, nearest)
+                incremental["nearest"] = nearest
+
+    def _cached(self, key, function):
+        if key not in self._cache:
+            self._cache[key] = function()
+        return self._cache[key]
+
+    def bounds(self):
+        """
+        Return (xMin, yMin, xMax, yMax) or None.
+        """
+        if not self.points:
+            return None
+        return (
+            min(self.xValues),
+            min(self.yValues),
+            max(self.xValues),
+            max(self.yValues)
+        )
+
+    def measurements(self):
+        """
+        Return (width, height, distance) or None if there
+        aren't at least two distinct x or y values.
+        distance is only given when exactly two points
+        are selected.
+        """
+        if len(self.xValues) < 2 and len(self.yValues) < 2:
+            return None
+        xMin, yMin, xMax, yMax = self.bounds()
+        distance = None
+        if len(self) == 2:
+            (x1, y1), (x2, y2) = self.points.elements()
+            distance = math.hypot(x2 - x1, y2 - y1)
+        return (xMax - xMin, yMax - yMin, distance)
+
+    def _incrementalCached(self, key, function):
+        if key not in self._incremental:
+            self._incremental[key] = function()
+        return self._incremental[key]
+
+    def sortedPoints(self):
+        """
+        Return the distinct points sorted by (x, y).
+        """
+        return self._incrementalCached("sorted", lambda: sorted(self.points))
+
+    def hull(self):
+        """
+        Return the convex hull of the points.
+        """
+        return self._incrementalCached("hull", lambda: convexHull(self.sortedPoints(), isSorted=True))
+
+    def nearestPair(self):
+        """
+        Return (distance, point1, point2) for the closest
+        distinct points or None.
+        """
+        return self._incrementalCached("nearest", lambda: findNearestPair(self.sortedPoints(), isSorted=True))
+
+    def farthestPair(self):
+        """
+        Return (distance, point1, point2) for the most
+        distant points or None.
+        """
+        return self._cached("farthest", lambda: findHullFarthestPair(self.hull()))
+
+    def xClusters(self):
+        """
+        Return a list of (x, count) tuples sorted by x.
+        """
+        return self._cached("xClusters", lambda: clusterValues(self.xValues, self.clusterTolerance))
+
+    def yClusters(self):
+        """
+        Return a list of (y, count) tuples sorted by y.
+        """
+        return self._cached("yClusters", lambda: clusterValues(self.yValues, self.clusterTolerance))
+
+    def dxHistogram(self):
+        """
+        Return the most common distances between x values
+        as a list of (distance, pairCount) tuples.
+        """
+        return self._cached("dx", lambda: pairDistanceHistogram(self.xClusters(), self.histogramSize))
+
+    def dyHistogram(self):
+        """
+        Return the most common distances between y values
+        as a list of (distance, pairCount) tuples.
+        """
+        return self._cached("dy", lambda: pairDistanceHistogram(self.yClusters(), self.histogramSize))
+
+
+# Pairs
+# -----
+
+def findNearestPair(points, isSorted=False):
+    """
+    Return (distance, point1, point2) for the closest
+    distinct points or None. If isSorted is True, points
+    must be distinct and sorted by (x, y).
+    """
+    if not isSorted:
+        points = sorted(set(points))
+    if len(points) < 2:
+        return None
+    best = math.inf
+    bestSquared = math.inf
+    bestPair = None
+    # the points within best of the sweep line,
+    # sorted by (y, x).
+    active = []
+    left = 0
+    # distinct points with integer coordinates can't
+    # be nearer than 1, so the sweep can stop there.
+    minimum = None
+    bisectLeft = bisect.bisect_left
+    insort = bisect.insort
+    for point in points:
+        x, y = point
+        while points[left][0] < x - best:
+            oldX, oldY = points[left]
+            del active[bisectLeft(active, (oldY, oldX))]
+            left += 1
+        start = bisectLeft(active, (y - best,))
+        for i in range(start, len(active)):
+            otherY, otherX = active[i]
+            dy = otherY - y
+            if dy > best:
+                break
+            dx = x - otherX
+            squared = dx * dx + dy * dy
+            if squared < bestSquared:
+                bestSquared = squared
+                best = math.sqrt(squared)
+                bestPair = ((otherX, otherY), point)
+        if best <= 1:
+            if minimum is None:
+                minimum = 1 if all(x % 1 == 0 and y % 1 == 0 for x, y in points) else 0
+            if best <= minimum:
+                break
+        insort(active, (y, x))
+    return (best, bestPair[0], bestPair[1])
+
+def _nearerPair(sortedPoints, point, nearest):
+    # compare point to the points in sortedPoints
+    # that are within the nearest distance in x.
+    best, point1, point2 = nearest
+    x, y = point
+    index = bisect.bisect_left(sortedPoints, (x - best,))
+    for otherX, otherY in sortedPoints[index:]:
+        if otherX > x + best:
+            break
+        if (otherX, otherY) == point:
+            continue
+        distance = math.hypot(otherX - x, otherY - y)
+        if distance < best:
+            best = distance
+            point1 = (otherX, otherY)
+            point2 = point
+    return (best, point1, point2)
+
+def findFarthestPair(points, isSorted=False):
+    """
+    Return (distance, point1, point2) for the most
+    distant points or None. If isSorted is True, points
+    must be distinct and sorted by (x, y).
+    """
+    return findHullFarthestPair(convexHull(points, isSorted))
+
+def findHullFarthestPair(hull):
+    """
+    Return (distance, point1, point2) for the most
+    distant points on a convex hull made by convexHull.
+    """
+    if len(hull) < 2:
+        return None
+    if len(hull) == 2:
+        (x1, y1), (x2, y2) = hull
+        return (math.hypot(x2 - x1, y2 - y1), hull[0], hull[1])
+    count = len(hull)
+    best = -1
+    bestPair = None
+    j = 1
+    for i in range(count):
+        ax, ay = hull[i]
+        bx, by = hull[(i + 1) % count]
+        # advance j while the area of (a, b, hull[j + 1])
+        # is larger than the area of (a, b, hull[j]).
+        while True:
+            cx, cy = hull[j]
+            nx, ny = hull[(j + 1) % count]
+            area = (bx - ax) * (cy - ay) - (by - ay) * (cx - ax)
+            nextArea = (bx - ax) * (ny - ay) - (by - ay) * (nx - ax)
+            if nextArea <= area:
+                break
+            j = (j + 1) % count
+        for point in (hull[i], hull[(i + 1) % count]):
+            cx, cy = hull[j]
+            distance = math.hypot(point[0] - cx, point[1] - cy)
+            if distance > best:
+                best = distance
+                bestPair = (point, hull[j])
+    return (best, bestPair[0], bestPair[1])
+
+def convexHull(points, isSorted=False):
+    """
+    Return the convex hull of points in
+    counterclockwise order (monotone chain.)
+    """
+    if not isSorted:
+        points = sorted(set(points))
+    if len(points) < 3:
+        return points
+    # the points between the lowest and the highest
+    # at each x are inside the hull.
+    extremes = []
+    for x, run in groupby(points, operator.itemgetter(0)):
+        first = next(run)
+        extremes.append(first)
+        last = deque(run, maxlen=1)
+        if last:
+            extremes.append(last[0])
+    points = extremes
+    if len(points) < 3:
+        return points
+
+    def cross(o, a, b):
+        return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+    lower = []
+    for point in points:
+        while len(lower) >= 2 and cross(lower[-2], lower[-1], point) <= 0:
+            lower.pop()
+        lower.append(point)
+    upper = []
+    for point in reversed(points):
+        while len(upper) >= 2 and cross(upper[-2], upper[-1], point) <= 0:
+            upper.pop()
+        upper.append(point)
+    hull = lower[:-1] + upper[:-1]
+    if not hull:
+        # all of the points are the same
+        return points[:1]
+    return hull
+
+# Clusters
+# --------
+
+def clusterValues(values, tolerance):
+    """
+    values is a dict of values and counts. Values that
+    are within tolerance of the smallest value in their
+    cluster are merged, so dense runs of values don't
+    chain into one cluster. Return a list of (value, count)
+    tuples where value is the weighted average of the
+    merged values.
+    """
+    clusters = []
+    total = 0
+    count = 0
+    start = None
+    for value in sorted(values):
+        valueCount = values[value]
+        if start is not None and value - start > tolerance:
+            clusters.append((total / count, count))
+            total = 0
+            count = 0
+            start = None
+        if start is None:
+            start = value
+        total += value * valueCount
+        count += valueCount
+    if count:
+        clusters.append((total / count, count))
+    return clusters
+
+def pairDistanceHistogram(clusters, size):
+    """
+    Return the size most common rounded distances between
+    the clusters as a list of (distance, pairCount) tuples.
+    Each pair of clusters counts as the product of their
+    counts, so this is the histogram of every pair of points.
+    Only the maximumHistogramPositions most populated
+    positions are compared.
+    """
+    positions = Counter()
+    for value, count in clusters:
+        positions[round(value)] += count
+    histogram = Counter()
+    if len(positions) < 2:
+        return []
+    if len(positions) > maximumHistogramPositions:
+        positions = Counter(dict(positions.most_common(maximumHistogramPositions)))
+    start = min(positions)
+    span = max(positions) - start
+    pairCount = len(positions) * (len(positions) - 1) / 2
+    if pairCount < span * span / 8:
+        # sparse positions: compare the pairs.
+        positions = sorted(positions.items())
+        for i, (value1, count1) in enumerate(positions):
+            for value2, count2 in positions[i + 1:]:
+                histogram[value2 - value1] += count1 * count2
+    else:
+        # dense positions: correlate the counts with
+        # themselves at every offset.
+        counts = [0] * (span + 1)
+        for value, count in positions.items():
+            counts[value - start] = count
+        multiply = operator.mul
+        for distance in range(1, span + 1):
+            total = sum(map(multiply, counts, counts[distance:]))
+            if total:
+                histogram[distance] = total
+    return sorted(histogram.items(), key=lambda item: (-item[1], item[0]))[:size]
@@ -2,14 +2,14 @@ import ezui
 from mojo.events import postEvent
 
 if __name__ == "__main__":
-    from subscriber import (
+    from defaults import (
         internalGetDefault,
         internalSetDefault,
         extensionID
     )
     import legacy
 else:
-    from .subscriber import (
+    from .defaults import (
         internalGetDefault,
         internalSetDefault,
         extensionID
@@ -36,8 +36,14 @@ class _LaserMeasureSettingsWindowController(ezui.WindowController):
         [ ] Segments                                @testSegments
         [ ] Off Curve Handles                       @testOffCurves
         [ ] Points                                  @testPoints
+        [ ] Stroke Thickness                        @testThickness
+        [ ] Stroke Thickness Map                    @showThicknessField
         [ ] Anchors                                 @testAnchors
         [ ] Show Distance                           @showDistance
+        [ ] Show Other Masters                      @showMasterMeasurements
+        [ ] Show Sidebearings                       @showSidebearings
+        [ ] Show Selection Statistics               @showSelectionStatistics
+        [ ] Measure Along Italic Angle              @measureItalicAngle
 
         : Color:
         * ColorWell                                 @baseColor
@@ -80,6 +86,11 @@ class _LaserMeasureSettingsWindowController(ezui.WindowController):
 
         : Show:
         [ ]                                         @showMeasurementsHUD
+
+        !§ Designspace
+
+        : Path:
+        [_ _]                                       @designspacePath
         """
         colorWellWidth = 100
         colorWellHeight = 20
@@ -106,12 +117,30 @@ class _LaserMeasureSettingsWindowController(ezui.WindowController):
             testPoints=dict(
                 value=internalGetDefault("testPoints")
             ),
+            testThickness=dict(
+                value=internalGetDefault("testThickness")
+            ),
+            showThicknessField=dict(
+                value=internalGetDefault("showThicknessField")
+            ),
             testAnchors=dict(
                 value=internalGetDefault("testAnchors")
             ),
             showDistance=dict(
                 value=internalGetDefault("showDistance")
             ),
+            showMasterMeasurements=dict(
+                value=internalGetDefault("showMasterMeasurements")
+            ),
+            showSidebearings=dict(
+                value=internalGetDefault("showSidebearings")
+            ),
+            showSelectionStatistics=dict(
+                value=internalGetDefault("showSelectionStatistics")
+            ),
+            measureItalicAngle=dict(
+                value=internalGetDefault("measureItalicAngle")
+            ),
             testSegmentMatches=dict(
                 value=internalGetDefault("testSegmentMatches")
             ),
@@ -177,6 +206,10 @@ class _LaserMeasureSettingsWindowController(ezui.WindowController):
             ),
             showMeasurementsHUD=dict(
                 value=internalGetDefault("showMeasurementsHUD")
+            ),
+            designspacePath=dict(
+                placeholder="Measure at instances in a .designspace",
+                value=internalGetDefault("designspacePath")
             )
         )
         self.w = ezui.EZWindow(
@@ -1,87 +1,143 @@
-import math
+import time
+_moduleImportStart = time.perf_counter()
+import sys
+_modulesBeforeLaunch = frozenset(sys.modules)
+import os
+import tempfile
+import importlib
+import functools
 import statistics
-from fontTools.misc import transform
-from fontTools.pens.basePen import BasePen
+import weakref
 from fontTools.pens.pointPen import AbstractPointPen
+from fontTools.pens.transformPen import TransformPointPen
 from fontTools.misc import arrayTools
 from fontTools.misc.fixedTools import otRound
-import defcon
-import AppKit
-import Quartz
-import vanilla
-from lib.tools import bezierTools
-from fontParts.world import RGlyph
-import merz
-from mojo.roboFont import CreateCursor
 from mojo import events
-from mojo import tools
 from mojo import subscriber
 from mojo.extensions import (
     registerExtensionDefaults,
     getExtensionDefault,
-    setExtensionDefault,
     removeExtensionDefault
 )
-from mojo import UI
-
-calculateDistance = bezierTools.distanceFromPointToPoint
-
-extensionID = "com.typesupply.LaserMeasure"
-extensionKeyStub = extensionID + "."
-
-# --------
-# Defaults
-# --------
-
-defaults = {
-    extensionKeyStub + "showMeasurementsHUD" : True,
-    extensionKeyStub + "triggerCharacter" : "d",
-    extensionKeyStub + "baseColor" : (0, 0.3, 1, 0.8),
-    extensionKeyStub + "highlightStrokeWidth" : 7,
-    extensionKeyStub + "highlightOpacity" : 0.3,
-    extensionKeyStub + "highlightAnimate" : False,
-    extensionKeyStub + "highlightAnimationDuration" : 1,
-    extensionKeyStub + "persistentMeasurementsColor" : (0.75, 0.75, 0.75, 1),
-    extensionKeyStub + "persistentMeasurementsStrokeWidth" : 15,
-    extensionKeyStub + "persistentMeasurementsOpacity" : 1.0,
-    extensionKeyStub + "measurementTextSize" : 12,
-    extensionKeyStub + "testSelection" : True,
-    extensionKeyStub + "testSegments" : True,
-    extensionKeyStub + "testSegmentMatches" : True,
-    extensionKeyStub + "testOffCurves" : True,
-    extensionKeyStub + "testOffCurveMatches" : True,
-    extensionKeyStub + "testPoints" : True,
-    extensionKeyStub + "testGeneral" : True,
-    extensionKeyStub + "testAnchors" : True,
-    extensionKeyStub + "autoTestSegmentMatches" : True,
-    extensionKeyStub + "showPersistentMeasurements" : True,
-    extensionKeyStub + "showDistance" : False,
-    extensionKeyStub + "matchColors" : [
-        (1, 0.6, 0, 0.9),
-        (0.3, 1, 0, 0.9),
-        (0, 1, 0.8, 0.9),
-        (0.6, 0.5, 1, 0.9),
-        (1, 0.5, 0.5, 0.9),
-        (0.9, 0.9, 0, 0.9),
-        (0.5, 0.5, 0.5, 0.9)
-    ],
-}
+
+if __name__ == "__main__":
+    from defaults import (
+        extensionID,
+        extensionKeyStub,
+        defaults,
+        internalGetDefault,
+        internalSetDefault
+    )
+    geometryModuleName = "geometry"
+    namedValuesModuleName = "namedValues"
+    mastersModuleName = "masters"
+    interpolationModuleName = "interpolation"
+    thicknessModuleName = "thickness"
+    profilesModuleName = "profiles"
+    intersectionModuleName = "intersection"
+    workerModuleName = "worker"
+    selectionModuleName = "selection"
+    traceModuleName = "trace"
+else:
+    from .defaults import (
+        extensionID,
+        extensionKeyStub,
+        defaults,
+        internalGetDefault,
+        internalSetDefault
+    )
+    geometryModuleName = __package__ + ".geometry"
+    namedValuesModuleName = __package__ + ".namedValues"
+    mastersModuleName = __package__ + ".masters"
+    interpolationModuleName = __package__ + ".interpolation"
+    thicknessModuleName = __package__ + ".thickness"
+    profilesModuleName = __package__ + ".profiles"
+    intersectionModuleName = __package__ + ".intersection"
+    workerModuleName = __package__ + ".worker"
+    selectionModuleName = __package__ + ".selection"
+    traceModuleName = __package__ + ".trace"
+
+# ---------------
+# Deferred Import
+# ---------------
+#
+# This module is imported when RoboFont launches, but
+# nothing in it is needed until a glyph editor is
+# measuring. The modules below are imported the first
+# time one of their attributes is requested.
+
+class DeferredModule:
+
+    def __init__(self, name):
+        self._deferredName = name
+        self._deferredModule = None
+
+    def __repr__(self):
+        return f"<DeferredModule {self._deferredName}>"
+
+    def load(self):
+        if self._deferredModule is None:
+            self._deferredModule = importlib.import_module(self._deferredName)
+        return self._deferredModule
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+
+defcon = DeferredModule("defcon")
+AppKit = DeferredModule("AppKit")
+Quartz = DeferredModule("Quartz")
+vanilla = DeferredModule("vanilla")
+merz = DeferredModule("merz")
+bezierTools = DeferredModule("lib.tools.bezierTools")
+UI = DeferredModule("mojo.UI")
+AppHelper = DeferredModule("PyObjCTools.AppHelper")
+geometry = DeferredModule(geometryModuleName)
+namedValues = DeferredModule(namedValuesModuleName)
+masters = DeferredModule(mastersModuleName)
+interpolation = DeferredModule(interpolationModuleName)
+thickness = DeferredModule(thicknessModuleName)
+profiles = DeferredModule(profilesModuleName)
+intersection = DeferredModule(intersectionModuleName)
+worker = DeferredModule(workerModuleName)
+selection = DeferredModule(selectionModuleName)
+trace = DeferredModule(traceModuleName)
+
+deferredModules = (
+    defcon,
+    AppKit,
+    Quartz,
+    vanilla,
+    merz,
+    bezierTools,
+    UI,
+    AppHelper,
+    geometry,
+    namedValues,
+    masters,
+    interpolation,
+    thickness,
+    profiles,
+    intersection,
+    worker,
+    selection,
+    trace
+)
+
+def calculateDistance(pt1, pt2):
+    return bezierTools.distanceFromPointToPoint(pt1, pt2)
 
 persistentMakeTrigger = "\r" # return
 persistentBreakTrigger = "\u001b" # escape
 
 cursorOffset = 7
-textBlockOffset = 5
-
-registerExtensionDefaults(defaults)
-
-def internalGetDefault(key):
-    key = extensionKeyStub + key
-    return getExtensionDefault(key)
+thicknessHitRadius = 25
 
-def internalSetDefault(key, value):
-    key = extensionKeyStub + key
-    setExtensionDefault(key, value)
+# thin to thick
+thicknessFieldColorCount = 8
+thicknessFieldThinColor = (1, 0.15, 0, 0.9)
+thicknessFieldThickColor = (0, 0.55, 1, 0.9)
+textBlockOffset = 5
 
 # ------------------
 # Persistent Storage
@@ -180,7 +236,7 @@ def getPersistentPointMeasurements(
         return []
     if namedWidthHeightMeasurements is None:
         font = glyph.font
-        namedWidthHeightMeasurements, namedWidthMeasurements, namedHeightMeasurements = loadNamedMeasurements(font)
+        namedWidthHeightMeasurements, namedWidthMeasurements, namedHeightMeasurements = namedValues.loadNamedMeasurements(font)
     links = getPersistentPointMeasurementReferences(glyph)
     if not links:
         return []
@@ -203,7 +259,7 @@ def getPersistentPointMeasurements(
                 points=linkedPoints,
                 positions=[point.position for point in linkedPoints],
                 measurements=linkedPointMeasurements,
-                names=findMatchingNamedMeasurements(
+                names=namedValues.findMatchingNamedMeasurements(
                     linkedPointMeasurements[:2],
                     namedWidthHeightMeasurements=namedWidthHeightMeasurements,
                     namedWidthMeasurements=namedWidthMeasurements,
@@ -217,7 +273,9 @@ def getPersistentPointMeasurements(
 # Subscriber
 # ----------
 
-emptyPath = Quartz.CGPathCreateMutable()
+@functools.lru_cache(maxsize=None)
+def getEmptyPath():
+    return Quartz.CGPathCreateMutable()
 
 class LaserMeasureSubscriber(subscriber.Subscriber):
 
@@ -237,22 +295,51 @@ class LaserMeasureSubscriber(subscriber.Subscriber):
     # positioned relative to each other and
     # the super.
 
+    # Lazy Building
+    # -------------
+    #
+    # Many glyph editors may be open while the extension
+    # is idle, so build does almost nothing. The containers
+    # are built the first time they are needed: when the
+    # trigger is pressed or when the glyph has persistent
+    # measurements. The HUD and the measurement layers are
+    # built the first time the trigger is pressed.
+
     def build(self):
+        registerRepresentationFactories()
         self.namedMeaurementsLoadedFromFont = None
-        window = self.getGlyphEditor()
-
-        # Glyph Editor Overlay
-        # --------------------
-
-        self.hud = LaserMeasureNamedValuesHUD(
-            window,
-            self.hudAddNamedValueCallback,
-            self.hudShowNamedValuesCallback
+        self.hud = None
+        self.containersBuilt = False
+        self.measurementLayersBuilt = False
+        self.autoSegmentMatchLayers = []
+        self.textLayerStates = {}
+        self.masterGlyphs = []
+        self.crossMasterGeometryCache = None
+        self.instanceGlyphs = []
+        self.instanceGeometryCache = None
+        self.selectionStatistics = None
+        self.thicknessFieldOutlineIndex = None
+        self.measurementWorker = None
+        self.thicknessFieldWorker = None
+        self.pendingMeasurement = None
+        self.sessionTrace = None
+        # register for defaults change
+        events.addObserver(
+            self,
+            "extensionDefaultsChanged",
+            extensionID + ".defaultsChanged"
         )
 
-        # Glyph Editor Contents
-        # ---------------------
+        self.point = (0,0)
+        # go
+        self.clearText()
+        self.loadDefaults()
 
+    def buildContainers(self):
+        if self.containersBuilt:
+            return
+        self.containersBuilt = True
+        window = self.getGlyphEditor()
         self.activeContainer = window.extensionContainer(
             identifier=extensionKeyStub + "background",
             location="background",
@@ -283,6 +370,47 @@ class LaserMeasureSubscriber(subscriber.Subscriber):
         self.textBaseLayer = self.textContainer.appendBaseSublayer(
             visible=True
         )
+        self.styleLayers()
+
+    def buildMeasurementLayers(self):
+        if self.measurementLayersBuilt:
+            return
+        self.buildContainers()
+        self.measurementLayersBuilt = True
+        window = self.getGlyphEditor()
+
+        # Glyph Editor Overlay
+        # --------------------
+
+        self.hud = LaserMeasureNamedValuesHUD(
+            window,
+            self.hudAddNamedValueCallback,
+            self.hudShowNamedValuesCallback
+        )
+
+        # Glyph Editor Contents
+        # ---------------------
+
+        # thickness field
+        self.thicknessFieldBaseLayer = self.passiveContainer.appendBaseSublayer(
+            visible=False
+        )
+        self.thicknessFieldLayers = []
+        for i in range(thicknessFieldColorCount):
+            f = i / (thicknessFieldColorCount - 1)
+            color = tuple(
+                thin + (thick - thin) * f
+                for (thin, thick) in zip(thicknessFieldThinColor, thicknessFieldThickColor)
+            )
+            layer = self.thicknessFieldBaseLayer.appendPathSublayer(
+                fillColor=None,
+                strokeColor=color,
+                strokeCap="round",
+                path=getEmptyPath()
+            )
+            self.thicknessFieldLayers.append(layer)
+
+        # text
         self.measurementsTextContainer = self.textBaseLayer.appendBaseSublayer(
             visible=False
         )
@@ -294,6 +422,18 @@ class LaserMeasureSubscriber(subscriber.Subscriber):
             visible=False,
             name="names"
         )
+        self.sidebearingsTextLayer = self.measurementsTextContainer.appendTextLineSublayer(
+            visible=False,
+            name="sidebearings"
+        )
+        self.mastersTextLayer = self.measurementsTextContainer.appendTextLineSublayer(
+            visible=False,
+            name="masters"
+        )
+        self.instancesTextLayer = self.measurementsTextContainer.appendTextLineSublayer(
+            visible=False,
+            name="instances"
+        )
         self.selectionMeasurementsTextLayer = self.measurementsTextContainer.appendTextLineSublayer(
             visible=False,
             name="selection"
@@ -302,14 +442,24 @@ class LaserMeasureSubscriber(subscriber.Subscriber):
             visible=False,
             name="selectionNames"
         )
+        self.selectionStatisticsTextLayer = self.measurementsTextContainer.appendTextLineSublayer(
+            visible=False,
+            name="selectionStatistics"
+        )
+        # measurements are drawn in this layer so
+        # that the italic measuring transformation
+        # can be applied to all of them at once.
+        self.measurementBaseLayer = self.activeContainer.appendBaseSublayer(
+            visible=True
+        )
         # outline
-        self.outlineBaseLayer = self.activeContainer.appendBaseSublayer(
+        self.outlineBaseLayer = self.measurementBaseLayer.appendBaseSublayer(
             visible=False
         )
         self.outlineWidthLayer = self.outlineBaseLayer.appendLineSublayer()
         self.outlineHeightLayer = self.outlineBaseLayer.appendLineSublayer()
         # segment
-        self.segmentBaseLayer = self.activeContainer.appendBaseSublayer(
+        self.segmentBaseLayer = self.measurementBaseLayer.appendBaseSublayer(
             visible=False
         )
         self.segmentMatchHighlightLayer = self.segmentBaseLayer.appendPathSublayer(
@@ -317,7 +467,7 @@ class LaserMeasureSubscriber(subscriber.Subscriber):
         )
         self.segmentHighlightLayer = self.segmentBaseLayer.appendPathSublayer()
         # handle
-        self.handleBaseLayer = self.activeContainer.appendBaseSublayer(
+        self.handleBaseLayer = self.measurementBaseLayer.appendBaseSublayer(
             visible=False
         )
         self.handleMatchHighlightLayer = self.handleBaseLayer.appendPathSublayer(
@@ -325,28 +475,24 @@ class LaserMeasureSubscriber(subscriber.Subscriber):
         )
         self.handleHighlightLayer = self.handleBaseLayer.appendPathSublayer()
         # points
-        self.pointBaseLayer = self.activeContainer.appendBaseSublayer(
+        self.pointBaseLayer = self.measurementBaseLayer.appendBaseSublayer(
             visible=False
         )
         self.pointHighlightLayer = self.pointBaseLayer.appendLineSublayer()
+        # thickness
+        self.thicknessBaseLayer = self.measurementBaseLayer.appendBaseSublayer(
+            visible=False
+        )
+        self.thicknessLineLayer = self.thicknessBaseLayer.appendLineSublayer()
         # anchor
-        self.anchorBaseLayer = self.activeContainer.appendBaseSublayer(
+        self.anchorBaseLayer = self.measurementBaseLayer.appendBaseSublayer(
             visible=False
         )
         self.anchorWidthLayer = self.anchorBaseLayer.appendLineSublayer()
         self.anchorHeightLayer = self.anchorBaseLayer.appendLineSublayer()
-        # register for defaults change
-        events.addObserver(
-            self,
-            "extensionDefaultsChanged",
-            extensionID + ".defaultsChanged"
-        )
-
-        self.point = (0,0)
         # go
-        self.clearText()
+        self.styleLayers()
         self.loadNamedMeasurements()
-        self.loadDefaults()
 
     def loadDefaults(self):
         # load
@@ -358,6 +504,7 @@ class LaserMeasureSubscriber(subscriber.Subscriber):
         self.doTestOffCurves = internalGetDefault("testOffCurves")
         self.doTestOffCurveMatches = internalGetDefault("testOffCurveMatches")
         self.doTestPoints = internalGetDefault("testPoints")
+        self.doTestThickness = internalGetDefault("testThickness")
         self.doTestGeneral = internalGetDefault("testGeneral")
         self.doTestAnchors = internalGetDefault("testAnchors")
         self.doAutoTestSegmentMatches = internalGetDefault("autoTestSegmentMatches")
@@ -379,18 +526,30 @@ class LaserMeasureSubscriber(subscriber.Subscriber):
         self.highlightAnimate = internalGetDefault("highlightAnimate")
         self.highlightAnimationDuration = internalGetDefault("highlightAnimationDuration")
         self.showDistance = internalGetDefault("showDistance")
+        self.showMasterMeasurements = internalGetDefault("showMasterMeasurements")
+        self.showSidebearings = internalGetDefault("showSidebearings")
+        self.showSelectionStatistics = internalGetDefault("showSelectionStatistics")
+        self.doMeasureItalicAngle = internalGetDefault("measureItalicAngle")
+        self.showThicknessField = internalGetDefault("showThicknessField")
+        self.designspacePath = internalGetDefault("designspacePath")
+        self.designspaceLocations = internalGetDefault("designspaceLocations")
         self.matchColors = matchColors
         self.matchStrokeWidth = highlightWidth
+        if len(matchColors) != len(self.autoSegmentMatchLayers):
+            # the groups are distributed over
+            # the colors so they must be redone.
+            self.currentAutoSegmentMatches = None
+            self.needAutoSegmentHighlightRebuild = True
         self.matchStrokeOpacity = highlightOpacity
         self.persistentMeasurementsColor = persistentMeasurementsColor
         self.persistentMeasurementsStrokeWidth = persistentMeasurementsStrokeWidth
         self.persistentMeasurementsOpacity = persistentMeasurementsOpacity
         # build
-        lineAttributes = dict(
+        self.lineAttributes = dict(
             strokeColor=mainColor,
             strokeWidth=1
         )
-        highlightAttributes = dict(
+        self.highlightAttributes = dict(
             fillColor=None,
             strokeColor=mainColor,
             strokeWidth=highlightWidth,
@@ -408,26 +567,59 @@ class LaserMeasureSubscriber(subscriber.Subscriber):
             weight="bold",
             figureStyle="tabular"
         )
-        measurementTextAttributes = dict(textAttributes)
-        measurementTextAttributes.update(dict(
-        ))
-        namesTextAttributes = dict(textAttributes)
-        selectionMeasurementsTextAttributes = dict(textAttributes)
+        self.namesTextAttributes = dict(textAttributes)
+        self.selectionMeasurementsTextAttributes = selectionMeasurementsTextAttributes = dict(textAttributes)
         selectionMeasurementsTextAttributes.update(dict(
             borderColor=mainColor,
             backgroundColor=backgroundColor,
             fillColor=mainColor,
             borderWidth=1
         ))
-        selectionNamesTextAttributes = dict(selectionMeasurementsTextAttributes)
-        # populate
-        self.autoSegmentMatchBaseLayer.setOpacity(highlightOpacity)
-        self.persistentMeasurementsBaseLayer.setOpacity(persistentMeasurementsOpacity)
-        self.persistentMeasurementsTextBaseLayer.setOpacity(persistentMeasurementsOpacity)
-        self.measurementsTextLayer.setPropertiesByName(textAttributes)
-        self.namesTextLayer.setPropertiesByName(namesTextAttributes)
-        self.selectionMeasurementsTextLayer.setPropertiesByName(selectionMeasurementsTextAttributes)
-        self.selectionNamesTextLayer.setPropertiesByName(selectionNamesTextAttributes)
+        self.selectionNamesTextAttributes = dict(selectionMeasurementsTextAttributes)
+        self.mainColor = mainColor
+        self.styleLayers()
+        if self.sessionTrace is not None:
+            self.traceSettings()
+
+    def styleLayers(self):
+        if self.containersBuilt:
+            self._styleContainers()
+        if self.measurementLayersBuilt:
+            self._styleMeasurementLayers()
+
+    def _styleContainers(self):
+        matchColors = self.matchColors
+        self.autoSegmentMatchBaseLayer.setOpacity(self.matchStrokeOpacity)
+        # auto segment matches have one layer per color. the
+        # paths are set in autoMeasureSegments.
+        while len(self.autoSegmentMatchLayers) > len(matchColors):
+            layer = self.autoSegmentMatchLayers.pop()
+            self.autoSegmentMatchBaseLayer.removeSublayer(layer)
+        while len(self.autoSegmentMatchLayers) < len(matchColors):
+            layer = self.autoSegmentMatchBaseLayer.appendPathSublayer(
+                fillColor=None,
+                path=getEmptyPath()
+            )
+            self.autoSegmentMatchLayers.append(layer)
+        for layer, color in zip(self.autoSegmentMatchLayers, matchColors):
+            with layer.propertyGroup():
+                layer.setStrokeColor(color)
+                layer.setStrokeWidth(self.matchStrokeWidth)
+        self.persistentMeasurementsBaseLayer.setOpacity(self.persistentMeasurementsOpacity)
+        self.persistentMeasurementsTextBaseLayer.setOpacity(self.persistentMeasurementsOpacity)
+
+    def _styleMeasurementLayers(self):
+        lineAttributes = self.lineAttributes
+        highlightAttributes = self.highlightAttributes
+        mainColor = self.mainColor
+        self.measurementsTextLayer.setPropertiesByName(self.genericTextAttributes)
+        self.namesTextLayer.setPropertiesByName(self.namesTextAttributes)
+        self.sidebearingsTextLayer.setPropertiesByName(self.namesTextAttributes)
+        self.mastersTextLayer.setPropertiesByName(self.namesTextAttributes)
+        self.instancesTextLayer.setPropertiesByName(self.namesTextAttributes)
+        self.selectionMeasurementsTextLayer.setPropertiesByName(self.selectionMeasurementsTextAttributes)
+        self.selectionNamesTextLayer.setPropertiesByName(self.selectionNamesTextAttributes)
+        self.selectionStatisticsTextLayer.setPropertiesByName(self.selectionNamesTextAttributes)
         self.outlineWidthLayer.setPropertiesByName(lineAttributes)
         self.outlineHeightLayer.setPropertiesByName(lineAttributes)
         self.segmentMatchHighlightLayer.setPropertiesByName(highlightAttributes)
@@ -437,6 +629,10 @@ class LaserMeasureSubscriber(subscriber.Subscriber):
         self.handleMatchHighlightLayer.setStrokeColor(mainColor)
         self.handleHighlightLayer.setPropertiesByName(highlightAttributes)
         self.pointHighlightLayer.setPropertiesByName(highlightAttributes)
+        self.thicknessLineLayer.setPropertiesByName(lineAttributes)
+        self.thicknessFieldBaseLayer.setOpacity(self.matchStrokeOpacity)
+        for layer in self.thicknessFieldLayers:
+            layer.setStrokeWidth(self.matchStrokeWidth)
         self.anchorWidthLayer.setPropertiesByName(lineAttributes)
         self.anchorHeightLayer.setPropertiesByName(lineAttributes)
         self.hud.update()
@@ -445,20 +641,36 @@ class LaserMeasureSubscriber(subscriber.Subscriber):
         libKey = extensionID + ".measurements"
         font = self.getFont()
         stored = font.lib.get(libKey, {})
-        self.hud.setItems(stored)
-        self.namedWidthHeightMeasurements, self.namedWidthMeasurements, self.namedHeightMeasurements = loadNamedMeasurements(font)
+        if self.hud is not None:
+            self.hud.setItems(stored)
+        self.namedWidthHeightMeasurements, self.namedWidthMeasurements, self.namedHeightMeasurements = namedValues.loadNamedMeasurements(font)
         self.namedMeaurementsLoadedFromFont = font
 
+    def loadNamedMeasurementsIfNeeded(self, font):
+        if font != self.namedMeaurementsLoadedFromFont:
+            self.loadNamedMeasurements()
+
     def destroy(self):
-        self.activeContainer.clearSublayers()
-        self.textContainer.clearSublayers()
+        self.thicknessFieldOutlineIndex = None
+        if self.measurementWorker is not None:
+            self.measurementWorker.stop()
+            self.measurementWorker = None
+        if self.thicknessFieldWorker is not None:
+            self.thicknessFieldWorker.stop()
+            self.thicknessFieldWorker = None
+        if self.containersBuilt:
+            self.activeContainer.clearSublayers()
+            self.textContainer.clearSublayers()
         events.removeObserver(
             self,
             extensionID + ".defaultsChanged"
         )
 
     def hideLayers(self):
+        if not self.measurementLayersBuilt:
+            return
         self.autoSegmentMatchBaseLayer.setVisible(False)
+        self.thicknessFieldBaseLayer.setVisible(False)
         self.measurementsTextContainer.setVisible(False)
         self.activeContainer.setVisible(False)
 
@@ -469,8 +681,8 @@ class LaserMeasureSubscriber(subscriber.Subscriber):
         # match won't reflect the pref change.
         self.segmentMatchHighlightLayer.clearAnimation()
         self.handleMatchHighlightLayer.clearAnimation()
-        self.segmentMatchHighlightLayer.setPath(emptyPath)
-        self.handleMatchHighlightLayer.setPath(emptyPath)
+        self.segmentMatchHighlightLayer.setPath(getEmptyPath())
+        self.handleMatchHighlightLayer.setPath(getEmptyPath())
 
     # Objects
     # -------
@@ -496,7 +708,9 @@ class LaserMeasureSubscriber(subscriber.Subscriber):
         self.loadDefaults()
 
     def fontMeasurementsChanged(self, info):
-        self.loadNamedMeasurements()
+        # nothing to refresh if they haven't been used yet
+        if self.namedMeaurementsLoadedFromFont is not None:
+            self.loadNamedMeasurements()
 
     needAutoSegmentHighlightRebuild = True
     needPersistentMeasurementsRebuild = True
@@ -508,37 +722,63 @@ class LaserMeasureSubscriber(subscriber.Subscriber):
         # from a different font. if the font is
         # different from the font the measurements
         # were loaded from, they need to be reloaded.
-        if glyph is not None:
-            font = glyph.font
-            if font != self.namedMeaurementsLoadedFromFont:
-                self.loadNamedMeasurements()
+        # (if they haven't been loaded yet, that will
+        # happen when they are first needed.)
+        if glyph is not None and self.namedMeaurementsLoadedFromFont is not None:
+            self.loadNamedMeasurementsIfNeeded(glyph.font)
         self.needAutoSegmentHighlightRebuild = True
         self.needPersistentMeasurementsRebuild = True
+        self.sessionTraceGlyphChanged = True
+        self.laserGeneration += 1
 
         if self.showPersistentMeasurements:
             self.updatePersistentMeasurements(info["glyph"])
-            self.persistentMeasurementsBaseLayer.setVisible(True)
 
     glyphEditorGlyphDidChangeContoursDelay = 0
     def glyphEditorGlyphDidChangeContours(self, info):
         self.needAutoSegmentHighlightRebuild = True
         self.needPersistentMeasurementsRebuild = True
+        self.sessionTraceGlyphChanged = True
+        if self.debug and self.wantsMeasurements:
+            self.traceGlyph(info["glyph"])
 
         if self.showPersistentMeasurements:
             self.updatePersistentMeasurements(info["glyph"])
-            self.persistentMeasurementsBaseLayer.setVisible(True)
+
+    glyphEditorGlyphDidChangeSelectionDelay = 0
+    def glyphEditorGlyphDidChangeSelection(self, info):
+        # the selection can be changed while the trigger is
+        # down, so the selection measurements follow it.
+        if not self.wantsMeasurements or not self.doTestSelection:
+            return
+        glyph = info["glyph"]
+        if self.measureSelection(glyph, None):
+            self.findSelectionNames()
+            self.updateText()
+            if self.showMeasurementsHUD:
+                self.hud.show(self.currentSelectionMeasurements is not None)
 
     triggerPressed = False
     wantsMeasurements = False
     currentDisplayFocalPoint = None
     currentMeasurements = None
+    currentMeasurementsKind = None
     currentSelectionMeasurements = None
     currentNames = None
     currentSelectionNames = None
+    currentSelectionStatistics = None
+    selectionStatisticsExpanded = False
     currentAutoSegmentMatches = None
+    currentFeature = None
+    currentMasterMeasurements = None
+    currentInstanceMeasurements = None
+    currentSidebearings = None
 
     def glyphEditorDidKeyDown(self, info):
+        start = time.perf_counter()
         deviceState = info["deviceState"]
+        if self.debug and deviceState["keyDownWithoutModifiers"] == self.triggerCharacter:
+            self.traceGlyph(info["glyph"])
         if deviceState["keyDownWithoutModifiers"] != self.triggerCharacter:
             self.wantsMeasurements = False
         else:
@@ -546,13 +786,22 @@ class LaserMeasureSubscriber(subscriber.Subscriber):
             self.wantsMeasurements = True
             selectionState = False
             glyph = info["glyph"]
+            self.buildMeasurementLayers()
+            self.loadNamedMeasurementsIfNeeded(glyph.font)
+            self.findMasterGlyphs(glyph)
+            self.findInstanceGlyphs(glyph)
             if self.doAutoTestSegmentMatches:
                 self.autoMeasureSegments(
                     glyph,
                     deviceState
                 )
             self.autoSegmentMatchBaseLayer.setVisible(self.doAutoTestSegmentMatches)
+            if self.showThicknessField:
+                self.updateThicknessField(glyph)
+            self.thicknessFieldBaseLayer.setVisible(self.showThicknessField)
             if self.doTestSelection:
+                # option expands the selection statistics
+                self.selectionStatisticsExpanded = deviceState["optionDown"]
                 selectionState = self.measureSelection(
                     glyph,
                     deviceState
@@ -569,7 +818,6 @@ class LaserMeasureSubscriber(subscriber.Subscriber):
                         self.updateText()
             if self.showPersistentMeasurements:
                 self.updatePersistentMeasurements(glyph)
-                self.persistentMeasurementsBaseLayer.setVisible(True)
             self.persistentMeasurementsTextBaseLayer.setVisible(self.showPersistentMeasurements)
             setCursorMode("searching")
             if self.showMeasurementsHUD:
@@ -578,6 +826,8 @@ class LaserMeasureSubscriber(subscriber.Subscriber):
 
             # Start measuring now
             self.initiateLaser(self.point, glyph, deviceState)
+        if self.debug:
+            self.traceKeyEvent("keyDown", deviceState["keyDownWithoutModifiers"], deviceState, start)
 
     def glyphEditorDidKeyUp(self, info):
         if not info:
@@ -585,6 +835,7 @@ class LaserMeasureSubscriber(subscriber.Subscriber):
             # I'm not sure how this is happening,
             # but sometimes the info is empty.
             return
+        start = time.perf_counter()
         if "deviceState" not in info:
             keyDownWithoutModifiers = self.triggerCharacter
         else:
@@ -606,7 +857,12 @@ class LaserMeasureSubscriber(subscriber.Subscriber):
             self.wantsMeasurements = False
             self.hideLayers()
             setCursorMode(None)
-            self.hud.hide()
+            if self.hud is not None:
+                self.hud.hide()
+        if self.debug:
+            self.traceKeyEvent("keyUp", keyDownWithoutModifiers, info.get("deviceState"), start)
+            if keyDownWithoutModifiers == self.triggerCharacter:
+                self.writeSessionTrace()
 
     def glyphEditorDidMouseDown(self, info):
         self.wantsMeasurements = False
@@ -615,24 +871,226 @@ class LaserMeasureSubscriber(subscriber.Subscriber):
 
     # glyphEditorDidMouseMoveDelay = 0.05
     def glyphEditorDidMouseMove(self, info):
+        start = time.perf_counter()
         self.point = tuple(info["locationInGlyph"])
         deviceState = info["deviceState"]
         glyph = info["glyph"]
-        self.initiateLaser(self.point, glyph, deviceState)
+        self.initiateLaser(self.point, glyph, deviceState, provisional=True)
+        self.scheduleRefinement(glyph, deviceState)
+        if self.debug and self.wantsMeasurements:
+            x, y = self.point
+            self.getSessionTrace().record(
+                "mouseMove",
+                [x, y, self.getGlyphEditor().getGlyphView().scale(), trace.makeModifierString(deviceState)],
+                start
+            )
+
+    # Session Trace
+    # -------------
+    #
+    # With the debug flag on, the mouse moves and key events
+    # that drive the measurements are recorded along with a
+    # snapshot of the glyph every time it changes. The events
+    # since the last release are appended to the trace when
+    # the trigger is released, so the cost of a write doesn't
+    # grow with the session. Each glyph editor's subscriber
+    # has its own file in the temporary directory, named with
+    # the time that the trace was started, so traces from
+    # different editors don't mix. It can be replayed
+    # without RoboFont:
+    #
+    #     python -m laserMeasure.trace LaserMeasureTrace-20240101-120000-4392.json.gz
+
+    sessionTraceFileNameFormat = "LaserMeasureTrace-{time}-{identifier}.json.gz"
+    sessionTraceGlyphChanged = True
+    sessionTracePath = None
+
+    def getSessionTrace(self):
+        if self.sessionTrace is None:
+            self.sessionTrace = trace.SessionTrace()
+            fileName = self.sessionTraceFileNameFormat.format(
+                time=time.strftime("%Y%m%d-%H%M%S"),
+                identifier=id(self)
+            )
+            self.sessionTracePath = os.path.join(tempfile.gettempdir(), fileName)
+            self.sessionTraceGlyphChanged = True
+            self.traceSettings()
+        return self.sessionTrace
+
+    def traceSettings(self):
+        self.getSessionTrace().record(
+            "settings",
+            dict(
+                triggerCharacter=self.triggerCharacter,
+                testOffCurves=self.doTestOffCurves,
+                testThickness=self.doTestThickness,
+                testGeneral=self.doTestGeneral,
+                showSidebearings=self.showSidebearings
+            )
+        )
+
+    def traceGlyph(self, glyph):
+        sessionTrace = self.getSessionTrace()
+        if not self.sessionTraceGlyphChanged:
+            return
+        self.sessionTraceGlyphChanged = False
+        glyphSet = glyph.layer
+        if glyphSet is None:
+            glyphSet = {}
+        sessionTrace.recordGlyph(glyph, glyphSet, glyph.font.info)
+
+    def traceKeyEvent(self, kind, character, deviceState, start):
+        scale = self.getGlyphEditor().getGlyphView().scale()
+        self.getSessionTrace().record(
+            kind,
+            [character, scale, trace.makeModifierString(deviceState)],
+            start
+        )
+
+    def writeSessionTrace(self, path=None):
+        if self.sessionTrace is None:
+            return
+        if path is None:
+            path = self.sessionTracePath
+        self.sessionTrace.write(path)
+
+    # Progressive Refinement
+    # ----------------------
+    #
+    # Mouse moves are measured provisionally: the outline
+    # hits aren't refined on the curves, matches aren't
+    # searched for, point pairs aren't checked for outline
+    # crossings and names, masters and instances are left
+    # out. When the cursor rests for refinementDelay, the
+    # exact measurement replaces the provisional one. Every
+    # measurement increments laserGeneration, so a refinement
+    # that was scheduled before the cursor moved again
+    # does nothing.
+
+    refinementDelay = 0.1
+    provisionalTextOpacity = 0.5
+    laserGeneration = 0
+    currentMeasurementsProvisional = False
+    measuringInBackground = False
+
+    def scheduleRefinement(self, glyph, deviceState):
+        if not self.wantsMeasurements:
+            return
+        AppHelper.callLater(
+            self.refinementDelay,
+            self._refineLaser,
+            self.laserGeneration,
+            glyph,
+            dict(deviceState)
+        )
+
+    def _refineLaser(self, generation, glyph, deviceState):
+        if generation != self.laserGeneration:
+            return
+        if not self.currentMeasurementsProvisional:
+            return
+        self.initiateLaser(
+            self.point,
+            glyph,
+            deviceState,
+            background=self.useMeasurementWorker
+        )
+
+    # Background Measuring
+    # --------------------
+    #
+    # The refinement can solve the outline hits in a worker
+    # thread. The representations and everything else that
+    # needs defcon are gathered here on the main thread and
+    # the worker only runs the engine. The provisional
+    # display, including the provisional values that the
+    # text is made from, stays up until the result is
+    # back and is only replaced by the result for the
+    # current laserGeneration. The text,
+    # names, masters and instances are then updated as if
+    # the measurement had been made here. A mouse move
+    # changes laserGeneration, so an outdated result is
+    # dropped in the worker or here.
+
+    useMeasurementWorker = True
+
+    def runMeasurement(self, function, args, apply):
+        if not self.measuringInBackground:
+            apply(function(*args))
+            return
+        if self.measurementWorker is None:
+            self.measurementWorker = worker.MeasurementWorker(AppHelper.callAfter, self.reportWorkerError)
+        self.pendingMeasurement = apply
+        self.measurementWorker.submit(
+            self.laserGeneration,
+            function,
+            args,
+            self._backgroundMeasurementFinished
+        )
+
+    def reportWorkerError(self, message):
+        # exceptions in the workers are only
+        # shown with the debug flag on.
+        if self.debug:
+            sys.stderr.write(message)
 
-    def initiateLaser(self, point, glyph, deviceState):
+    def _backgroundMeasurementFinished(self, generation, result):
+        if generation != self.laserGeneration:
+            return
+        if self.pendingMeasurement is None:
+            return
+        apply, finish, point = self.pendingMeasurement
+        self.pendingMeasurement = None
+        if not self.wantsMeasurements:
+            return
+        if result is None:
+            # the engine failed, so the provisional
+            # measurements are left on display.
+            return
+        self.currentDisplayFocalPoint = point
+        self.currentMeasurements = None
+        self.currentMeasurementsKind = None
+        self.currentFeature = None
+        self.currentMeasurementsProvisional = False
+        apply(result)
+        finish()
+
+    def initiateLaser(self, point, glyph, deviceState, provisional=False, background=False):
+        self.laserGeneration += 1
+        self.pendingMeasurement = None
+        if self.measurementWorker is not None:
+            self.measurementWorker.cancel()
         if not self.wantsMeasurements:
             return
-        self.selectionMeasurementsTextLayer.setVisible(False)
         if not glyph.bounds:
             self.hideLayers()
             return
+        provisionalState = (
+            self.currentDisplayFocalPoint,
+            self.currentMeasurements,
+            self.currentMeasurementsKind,
+            self.currentFeature,
+            self.currentMeasurementsProvisional
+        )
+        self.currentMeasurementsProvisional = provisional
+        self.measuringInBackground = background and not provisional
         self.currentDisplayFocalPoint = point
         self.currentMeasurements = None
+        self.currentMeasurementsKind = None
+        self.currentFeature = None
+        displayGlyph = glyph
+        displayPoint = point
+        glyph = self.getMeasurementGlyph(glyph)
+        measurementTransformation = None
+        if isinstance(glyph, ShearedGlyph):
+            point = glyph.transformation.transformPoint(point)
+            measurementTransformation = glyph.inverseTransformation
+        self.setMeasurementTransformation(measurementTransformation)
         anchorState = False
         handleState = False
         segmentState = False
         pointState = False
+        thicknessState = False
         outlineState = False
         cursorMode = "searching"
         while 1:
@@ -656,43 +1114,134 @@ class LaserMeasureSubscriber(subscriber.Subscriber):
                     pointState = True
                     cursorMode = "hit"
                     break
+            if self.doTestThickness:
+                if self.measureThickness(point, glyph, deviceState):
+                    thicknessState = True
+                    cursorMode = "hit"
+                    break
             if self.doTestGeneral:
                 if self.measureOutline(point, glyph, deviceState):
                     outlineState = True
                     break
             break
-        self.findNames()
+        states = (
+            anchorState,
+            handleState,
+            segmentState,
+            pointState,
+            thicknessState,
+            outlineState
+        )
+        finish = functools.partial(
+            self.finishLaser,
+            displayPoint,
+            displayGlyph,
+            measurementTransformation,
+            states,
+            cursorMode,
+            provisional
+        )
+        if self.pendingMeasurement is not None:
+            # keep the provisional values for anything
+            # that updates the text before the result
+            # is back.
+            (
+                self.currentDisplayFocalPoint,
+                self.currentMeasurements,
+                self.currentMeasurementsKind,
+                self.currentFeature,
+                self.currentMeasurementsProvisional
+            ) = provisionalState
+            self.pendingMeasurement = (self.pendingMeasurement, finish, displayPoint)
+            return
+        finish()
+
+    def finishLaser(self,
+            displayPoint,
+            displayGlyph,
+            measurementTransformation,
+            states,
+            cursorMode,
+            provisional
+        ):
+        anchorState, handleState, segmentState, pointState, thicknessState, outlineState = states
+        if anchorState and measurementTransformation is not None:
+            self.currentDisplayFocalPoint = measurementTransformation.transformPoint(self.currentDisplayFocalPoint)
+        self.measureSidebearings(displayPoint, displayGlyph)
+        if provisional:
+            self.currentNames = None
+            self.currentMasterMeasurements = None
+            self.currentInstanceMeasurements = None
+        else:
+            self.findNames()
+            self.measureMasters()
+            self.measureInstances()
         setCursorMode(cursorMode)
         self.anchorBaseLayer.setVisible(anchorState)
         self.handleBaseLayer.setVisible(handleState)
         self.segmentBaseLayer.setVisible(segmentState)
         self.pointBaseLayer.setVisible(pointState)
+        self.thicknessBaseLayer.setVisible(thicknessState)
         self.outlineBaseLayer.setVisible(outlineState)
         self.activeContainer.setVisible(True)
         self.measurementsTextContainer.setVisible(True)
         self.updateText()
 
+    # Italic
+    # ------
+    #
+    # When measuring along the italic angle, everything is
+    # measured in a de-slanted copy of the glyph that is
+    # made once per glyph change. Only the cursor point is
+    # transformed during a mouse move and the measurement
+    # layers are slanted back for display.
+
+    def getMeasurementGlyph(self, glyph):
+        if not self.doMeasureItalicAngle:
+            return glyph
+        font = glyph.font
+        if font is None or not font.info.italicAngle:
+            return glyph
+        return glyph.getRepresentation(
+            extensionKeyStub + "shearedOutline",
+            italicAngle=font.info.italicAngle,
+            italicSlantOffset=font.lib.get("com.typemytype.robofont.italicSlantOffset", 0)
+        )
+
+    renderedMeasurementTransformation = None
+
+    def setMeasurementTransformation(self, transformation):
+        if transformation == self.renderedMeasurementTransformation:
+            return
+        if self.renderedMeasurementTransformation is not None:
+            self.measurementBaseLayer.removeTransformation("italic")
+        if transformation is not None:
+            self.measurementBaseLayer.addTransformation(tuple(transformation), name="italic")
+        self.renderedMeasurementTransformation = transformation
+
     def _conditionalRectFallbacks(self, point, glyph, deviceState):
         x, y = point
         if deviceState["optionDown"]:
             xBeforeFallback, yBeforeFallback, xAfterFallback, yAfterFallback = glyph.bounds
         else:
             font = glyph.font
-            if all((self.doUseItalicAngle, font.info.italicAngle)):
+            # sheared glyphs already have the slanted
+            # origin and width lines at 0 and width.
+            if isinstance(glyph, ShearedGlyph):
+                xBeforeFallback = min((0, x))
+                xAfterFallback = max((glyph.width, x))
+            elif all((self.doUseItalicAngle, font.info.italicAngle)):
                 offset = font.lib.get("com.typemytype.robofont.italicSlantOffset", 0)
-                origin = angledPoint((0, y), font.info.italicAngle, offset)[0]
-                width = angledPoint((glyph.width, y), font.info.italicAngle, offset)[0]
+                origin = geometry.angledPoint((0, y), font.info.italicAngle, offset)[0]
+                width = geometry.angledPoint((glyph.width, y), font.info.italicAngle, offset)[0]
                 xBeforeFallback = min((origin, x))
                 xAfterFallback = max((width, x))
             else:
                 xBeforeFallback = min((0, x))
                 xAfterFallback = max((glyph.width, x))
             verticalMetrics = [
-                font.info.descender,
-                0,
-                font.info.xHeight,
-                font.info.capHeight,
-                font.info.ascender
+                value
+                for (name, value) in geometry.getVerticalMetrics(font.info)
             ]
             yBeforeFallback = min(verticalMetrics)
             yAfterFallback = max(verticalMetrics)
@@ -750,53 +1299,72 @@ class LaserMeasureSubscriber(subscriber.Subscriber):
         self.currentSelectionMeasurements = None
         self.currentNames = None
         self.currentSelectionNames = None
+        self.currentSelectionStatistics = None
+        self.currentMasterMeasurements = None
+        self.currentInstanceMeasurements = None
+        self.currentSidebearings = None
+
+    # Text layers remember what they are displaying
+    # so that a mouse move that doesn't change the
+    # measurements only moves the text container.
+
+    renderedTextFocalPoint = None
+    renderedTextContents = None
+    renderedTextProvisional = False
 
     def updateText(self):
         if self.currentDisplayFocalPoint is not None:
-            x, y = self.currentDisplayFocalPoint
-            x += cursorOffset
-            y -= cursorOffset
-            self.textBaseLayer.setPosition((x, y))
+            if self.currentDisplayFocalPoint != self.renderedTextFocalPoint:
+                self.renderedTextFocalPoint = self.currentDisplayFocalPoint
+                x, y = self.currentDisplayFocalPoint
+                x += cursorOffset
+                y -= cursorOffset
+                self.textBaseLayer.setPosition((x, y))
+        if self.currentMeasurementsProvisional != self.renderedTextProvisional:
+            self.renderedTextProvisional = self.currentMeasurementsProvisional
+            opacity = 1.0
+            if self.renderedTextProvisional:
+                opacity = self.provisionalTextOpacity
+            self.measurementsTextLayer.setOpacity(opacity)
         valueFormatter = formatWidthHeightString
         if self.showDistance:
             valueFormatter = formatWidthHeightDistanceString
-        displayOrder = [
-            ("measurements", self.currentMeasurements, self.measurementsTextLayer, valueFormatter),
+        measurementsFormatter = valueFormatter
+        if self.currentMeasurementsKind == "thickness":
+            measurementsFormatter = formatThicknessString
+        displayOrder = (
+            ("measurements", self.currentMeasurements, self.measurementsTextLayer, measurementsFormatter),
             ("names", self.currentNames, self.namesTextLayer, formatNames),
+            ("sidebearings", self.currentSidebearings, self.sidebearingsTextLayer, formatSidebearingsString),
+            ("masters", self.currentMasterMeasurements, self.mastersTextLayer, formatMasterMeasurements),
+            ("instances", self.currentInstanceMeasurements, self.instancesTextLayer, formatMasterMeasurements),
             ("selection", self.currentSelectionMeasurements, self.selectionMeasurementsTextLayer, valueFormatter),
-            ("selectionNames", self.currentSelectionNames, self.selectionNamesTextLayer, formatNames)
-        ]
-        position = (
-            dict(
-                point="left",
-                relative="super"
-            ),
-            dict(
-                point="top",
-                relative="super"
-            )
+            ("selectionNames", self.currentSelectionNames, self.selectionNamesTextLayer, formatNames),
+            ("selectionStatistics", self.currentSelectionStatistics, self.selectionStatisticsTextLayer, formatSelectionStatistics)
         )
-        visible = []
-        hidden = []
-        for (name, contents, layer, formatter) in displayOrder:
-            if not contents:
-                hidden.append(layer)
-                continue
-            layer.setText(
-                formatter(*contents)
-            )
-            x = dict(position[0])
-            y = dict(position[1])
-            layer.setPosition((x, y))
-            visible.append(layer)
-            position[0]["relative"] = name
-            position[1]["relative"] = name
-            position[1]["relativePoint"] = "bottom"
-            position[1]["offset"] = -textBlockOffset
-        for layer in hidden:
-            layer.setVisible(False)
-        for layer in visible:
-            layer.setVisible(True)
+        contents = tuple(
+            (formatter, tuple(contents) if contents else None)
+            for (name, contents, layer, formatter) in displayOrder
+        )
+        if contents != self.renderedTextContents:
+            self.renderedTextContents = contents
+            relative = None
+            for (name, contents, layer, formatter) in displayOrder:
+                previousState = self.textLayerStates.get(name)
+                if not contents:
+                    if previousState is None or previousState[2]:
+                        layer.setVisible(False)
+                        self.textLayerStates[name] = (None, None, False)
+                    continue
+                text = formatter(*contents)
+                if previousState is None or previousState[0] != text:
+                    layer.setText(text)
+                if previousState is None or previousState[1] != relative:
+                    layer.setPosition(makeTextLayerPosition(relative))
+                if previousState is None or not previousState[2]:
+                    layer.setVisible(True)
+                self.textLayerStates[name] = (text, relative, True)
+                relative = name
         if not self.textContainer.getVisible():
             self.textContainer.setVisible(True)
 
@@ -807,8 +1375,13 @@ class LaserMeasureSubscriber(subscriber.Subscriber):
         self.currentNames = None
         if not self.currentMeasurements:
             return
-        names = findMatchingNamedMeasurements(
-            self.currentMeasurements[:2],
+        measurements = self.currentMeasurements[:2]
+        if self.currentMeasurementsKind == "thickness":
+            # the thickness is compared to widths and heights
+            value = otRound(self.currentMeasurements[2])
+            measurements = (value, value)
+        names = namedValues.findMatchingNamedMeasurements(
+            measurements,
             namedWidthHeightMeasurements=self.namedWidthHeightMeasurements,
             namedWidthMeasurements=self.namedWidthMeasurements,
             namedHeightMeasurements=self.namedHeightMeasurements
@@ -820,7 +1393,7 @@ class LaserMeasureSubscriber(subscriber.Subscriber):
         self.currentSelectionNames = None
         if not self.currentSelectionMeasurements:
             return
-        names = findMatchingNamedMeasurements(
+        names = namedValues.findMatchingNamedMeasurements(
             self.currentSelectionMeasurements[:2],
             namedWidthHeightMeasurements=self.namedWidthHeightMeasurements,
             namedWidthMeasurements=self.namedWidthMeasurements,
@@ -849,46 +1422,45 @@ class LaserMeasureSubscriber(subscriber.Subscriber):
         ):
         if not self.needAutoSegmentHighlightRebuild:
             return
-        self.autoSegmentMatchBaseLayer.clearSublayers()
+        self.needAutoSegmentHighlightRebuild = False
         groups = glyph.getRepresentation(extensionKeyStub + "segmentGroups")
         if groups == self.currentAutoSegmentMatches:
             return
-        colors = list(self.matchColors)
-        strokeWidth = self.matchStrokeWidth
-        for type, segments in groups:
-            color = colors.pop(0)
-            colors.append(color)
-            pen = merz.MerzPen()
-            for segment in segments:
-                pen.moveTo(segment[0])
-                if type == "line":
-                    pen.lineTo(segment[1])
-                elif type == "curve":
-                    pen.curveTo(*segment[1:])
-                elif type == "qcurve":
-                    pen.qCurveTo(*segment[1:])
-                pen.endPath()
-            layer = self.autoSegmentMatchBaseLayer.appendPathSublayer(
-                strokeColor=color,
-                fillColor=None,
-                strokeWidth=strokeWidth,
-                path=pen.path
-            )
-        self.needAutoSegmentHighlightRebuild = False
+        self.currentAutoSegmentMatches = groups
+        paths = glyph.getRepresentation(
+            extensionKeyStub + "segmentGroupPaths",
+            colorCount=len(self.autoSegmentMatchLayers)
+        )
+        for layer, path in zip(self.autoSegmentMatchLayers, paths):
+            layer.setPath(path)
 
     def measureSelection(self,
             glyph,
             deviceState
         ):
-        points = getSelectedPoints(glyph)
-        measurements = measurePoints(points)
+        # the statistics are kept between key downs
+        # so that only selection changes are processed.
+        if self.selectionStatistics is None:
+            self.selectionStatistics = selection.SelectionStatistics()
+        statistics = self.selectionStatistics
+        statistics.update(getSelectedCoordinates(glyph))
+        measurements = statistics.measurements()
+        statisticsRows = None
+        if measurements and self.showSelectionStatistics:
+            statisticsRows = makeSelectionStatisticsRows(
+                statistics,
+                expanded=self.selectionStatisticsExpanded
+            )
         if not measurements:
-            self.currentSelectionMeasurements = None
-            return
-        if measurements == self.currentSelectionMeasurements:
-            return
-        self.currentSelectionMeasurements = measurements
-        return True
+            measurements = None
+        changed = False
+        if statisticsRows != self.currentSelectionStatistics:
+            self.currentSelectionStatistics = statisticsRows
+            changed = True
+        if measurements != self.currentSelectionMeasurements:
+            self.currentSelectionMeasurements = measurements
+            changed = True
+        return changed
 
     def measureAnchors(self,
             point,
@@ -929,62 +1501,62 @@ class LaserMeasureSubscriber(subscriber.Subscriber):
                     yStart = ay
                     yStop = yMax
                 xBeforeFallback, yBeforeFallback, xAfterFallback, yAfterFallback = self._conditionalRectFallbacks(point, glyph, deviceState)
+                window = self.getGlyphEditor()
+                editor = window.getGlyphView()
+                flattenedOutline = getFlattenedOutline(glyph, editor.scale())
                 xLine = (
                     (xStart, ay),
                     (xStop, ay)
                 )
-                xIntersections = tools.IntersectGlyphWithLine(
-                    glyph,
-                    xLine,
-                    canHaveComponent=True,
-                    addSideBearings=False
-                )
-                xIntersections = [oX for oX, oY in xIntersections]
-                xIntersections.sort()
-                if x <= ax:
-                    if not xIntersections:
-                        hitX = xBeforeFallback
-                    else:
-                        hitX = xIntersections[-1]
-                else:
-                    if not xIntersections:
-                        hitX = xAfterFallback
-                    else:
-                        hitX = xIntersections[0]
                 yLine = (
                     (ax, yStart),
                     (ax, yStop)
                 )
-                yIntersections = tools.IntersectGlyphWithLine(
-                    glyph,
-                    yLine,
-                    canHaveComponent=True,
-                    addSideBearings=False
-                )
-                yIntersections = [oY for oX, oY in yIntersections]
-                yIntersections.sort()
-                if y <= ay:
-                    if not yIntersections:
-                        hitY = yBeforeFallback
+
+                def display(hits):
+                    (xBefore, xAfter), (yBefore, yAfter) = hits
+                    if x <= ax:
+                        if xBefore is None:
+                            hitX = xBeforeFallback
+                        else:
+                            hitX = xBefore[0]
                     else:
-                        hitY = yIntersections[-1]
-                else:
-                    if not yIntersections:
-                        hitY = yAfterFallback
+                        if xAfter is None:
+                            hitX = xAfterFallback
+                        else:
+                            hitX = xAfter[0]
+                    if y <= ay:
+                        if yBefore is None:
+                            hitY = yBeforeFallback
+                        else:
+                            hitY = yBefore[1]
                     else:
-                        hitY = yIntersections[0]
-                width = abs(ax - hitX)
-                height = abs(ay - hitY)
-                distance = calculateDistance((ax, ay), (hitX, hitY))
-                with self.anchorWidthLayer.propertyGroup():
-                    self.anchorWidthLayer.setStartPoint((hitX, ay))
-                    self.anchorWidthLayer.setEndPoint((ax, ay))
-                with self.anchorHeightLayer.propertyGroup():
-                    self.anchorHeightLayer.setStartPoint((ax, ay))
-                    self.anchorHeightLayer.setEndPoint((ax, hitY))
-                with self.measurementsTextLayer.propertyGroup():
-                    self.currentDisplayFocalPoint = (ax, ay)
-                    self.currentMeasurements = (width, height, distance)
+                        if yAfter is None:
+                            hitY = yAfterFallback
+                        else:
+                            hitY = yAfter[1]
+                    width = abs(ax - hitX)
+                    height = abs(ay - hitY)
+                    distance = calculateDistance((ax, ay), (hitX, hitY))
+                    with self.anchorWidthLayer.propertyGroup():
+                        self.anchorWidthLayer.setStartPoint((hitX, ay))
+                        self.anchorWidthLayer.setEndPoint((ax, ay))
+                    with self.anchorHeightLayer.propertyGroup():
+                        self.anchorHeightLayer.setStartPoint((ax, ay))
+                        self.anchorHeightLayer.setEndPoint((ax, hitY))
+                    with self.measurementsTextLayer.propertyGroup():
+                        self.currentDisplayFocalPoint = (ax, ay)
+                        self.currentMeasurements = (width, height, distance)
+
+                self.runMeasurement(
+                    findAdjacentOutlineHits,
+                    (
+                        flattenedOutline,
+                        ((xLine, ax, 0), (yLine, ay, 1)),
+                        self.currentMeasurementsProvisional
+                    ),
+                    display
+                )
                 return True
 
     def measureHandles(self,
@@ -995,7 +1567,7 @@ class LaserMeasureSubscriber(subscriber.Subscriber):
         window = self.getGlyphEditor()
         editor = window.getGlyphView()
         scale = editor.scale()
-        hit = measureSegmentsAndHandles(
+        hit = measureHandleLines(
             point,
             glyph.getRepresentation(extensionKeyStub + "handlesAsLines"),
             scale,
@@ -1004,7 +1576,8 @@ class LaserMeasureSubscriber(subscriber.Subscriber):
         if hit:
             segmentType, points, measurements = hit
             self.currentMeasurements = measurements
-            if self.doTestOffCurveMatches:
+            self.currentFeature = ("points", (points[0], points[-1], None))
+            if self.doTestOffCurveMatches and not self.currentMeasurementsProvisional:
                 self._findMatchingHandles(
                     points,
                     glyph
@@ -1023,7 +1596,7 @@ class LaserMeasureSubscriber(subscriber.Subscriber):
         ):
         layer = self.handleMatchHighlightLayer
         layerPen = merz.MerzPen()
-        target = RelativeHandle(points)
+        target = geometry.RelativeHandle(points)
         handles = glyph.getRepresentation(extensionKeyStub + "relativeHandles")
         haveMatch = False
         for handle in handles:
@@ -1046,12 +1619,16 @@ class LaserMeasureSubscriber(subscriber.Subscriber):
         scale = editor.scale()
         hit = measureSegmentsAndHandles(
             point,
-            glyph,
+            getOutlineGlyph(glyph),
             scale,
             self.segmentHighlightLayer
         )
-        if not self.doTestSegmentMatches:
+        if not self.doTestSegmentMatches or self.currentMeasurementsProvisional:
             self.segmentMatchHighlightLayer.setVisible(False)
+            if hit:
+                segmentType, segmentPoints, measurements = hit
+                self.currentMeasurements = measurements
+                self.currentFeature = ("points", (segmentPoints[0], segmentPoints[-1], True))
             return bool(hit)
         if hit:
             segmentType, segmentPoints, measurements = hit
@@ -1062,6 +1639,7 @@ class LaserMeasureSubscriber(subscriber.Subscriber):
             )
             self.segmentMatchHighlightLayer.setVisible(True)
             self.currentMeasurements = measurements
+            self.currentFeature = ("points", (segmentPoints[0], segmentPoints[-1], True))
             return True
         else:
             self.segmentMatchHighlightLayer.setVisible(False)
@@ -1073,7 +1651,7 @@ class LaserMeasureSubscriber(subscriber.Subscriber):
         ):
         layer = self.segmentMatchHighlightLayer
         layerPen = merz.MerzPen()
-        target = RelativeSegment(segmentType, segmentPoints)
+        target = geometry.RelativeSegment(segmentType, segmentPoints)
         segments = glyph.getRepresentation(extensionKeyStub + "relativeSegments")
         haveMatch = False
         for segment in segments:
@@ -1126,7 +1704,11 @@ class LaserMeasureSubscriber(subscriber.Subscriber):
             deviceState
         ):
         pen = glyph.getRepresentation(extensionKeyStub + "nearestPointSearcher")
-        points = pen.find(glyph, point)
+        points = pen.find(
+            glyph,
+            point,
+            checkCrossings=not self.currentMeasurementsProvisional
+        )
         if not points:
             return
         point1, point2 = points
@@ -1138,6 +1720,7 @@ class LaserMeasureSubscriber(subscriber.Subscriber):
         self.pointHighlightLayer.setStartPoint(point1)
         self.pointHighlightLayer.setEndPoint(point2)
         self.currentMeasurements = (width, height, distance)
+        self.currentFeature = ("points", (point1, point2, True))
         return True
 
     def measureOutline(self,
@@ -1152,54 +1735,288 @@ class LaserMeasureSubscriber(subscriber.Subscriber):
         yMin = font.info.descender - font.info.unitsPerEm
         yMax = font.info.ascender + font.info.unitsPerEm
         xBeforeFallback, yBeforeFallback, xAfterFallback, yAfterFallback = self._conditionalRectFallbacks(point, glyph, deviceState)
-        # width
+        window = self.getGlyphEditor()
+        editor = window.getGlyphView()
+        flattenedOutline = getFlattenedOutline(glyph, editor.scale())
         xLine = (
             (xMin, y),
             (xMax, y)
         )
-        xIntersections = tools.IntersectGlyphWithLine(
-            glyph,
-            xLine,
-            canHaveComponent=True,
-            addSideBearings=False
-        )
-        xIntersections = [oX for oX, oY in xIntersections]
-        x1, x2, width = findAdjacentValues(
-            x,
-            xIntersections,
-            beforeFallback=xBeforeFallback,
-            afterFallback=xAfterFallback
-        )
-        # height
         yLine = (
             (x, yMin),
             (x, yMax)
         )
-        yIntersections = tools.IntersectGlyphWithLine(
-            glyph,
-            yLine,
-            canHaveComponent=True,
-            addSideBearings=False
+
+        def display(hits):
+            (xBefore, xAfter), (yBefore, yAfter) = hits
+            # width
+            x1 = xBeforeFallback if xBefore is None else xBefore[0]
+            x2 = xAfterFallback if xAfter is None else xAfter[0]
+            width = int(round(abs(x1 - x2)))
+            # height
+            y1 = yBeforeFallback if yBefore is None else yBefore[1]
+            y2 = yAfterFallback if yAfter is None else yAfter[1]
+            height = int(round(abs(y1 - y2)))
+            distance = calculateDistance((x1, y1), (x2, y2))
+            # display
+            with self.outlineWidthLayer.propertyGroup():
+                self.outlineWidthLayer.setStartPoint((x1, y))
+                self.outlineWidthLayer.setEndPoint((x1 + width, y))
+            with self.outlineHeightLayer.propertyGroup():
+                self.outlineHeightLayer.setStartPoint((x, y1))
+                self.outlineHeightLayer.setEndPoint((x, y1 + height))
+            with self.measurementsTextLayer.propertyGroup():
+                self.currentMeasurements = (width, height, distance)
+            self.currentFeature = ("outline", (y, x1, x2, x, y1, y2))
+
+        self.runMeasurement(
+            findAdjacentOutlineHits,
+            (
+                flattenedOutline,
+                ((xLine, x, 0), (yLine, y, 1)),
+                self.currentMeasurementsProvisional
+            ),
+            display
         )
-        yIntersections = [oY for oX, oY in yIntersections]
-        y1, y2, height = findAdjacentValues(
-            y,
-            yIntersections,
-            beforeFallback=yBeforeFallback,
-            afterFallback=yAfterFallback
+        return True
+
+    def measureSidebearings(self, point, glyph):
+        self.currentSidebearings = None
+        if not self.showSidebearings:
+            return
+        font = glyph.font
+        italicAngle = 0
+        italicSlantOffset = 0
+        if all((self.doUseItalicAngle, font.info.italicAngle)):
+            italicAngle = font.info.italicAngle
+            italicSlantOffset = font.lib.get("com.typemytype.robofont.italicSlantOffset", 0)
+        outlineProfile = glyph.getRepresentation(extensionKeyStub + "outlineProfile")
+        self.currentSidebearings = outlineProfile.sidebearingsAt(
+            point[1],
+            glyph.width,
+            italicAngle,
+            italicSlantOffset
         )
-        distance = calculateDistance((x1, y1), (x2, y2))
-        # display
-        with self.outlineWidthLayer.propertyGroup():
-            self.outlineWidthLayer.setStartPoint((x1, y))
-            self.outlineWidthLayer.setEndPoint((x1 + width, y))
-        with self.outlineHeightLayer.propertyGroup():
-            self.outlineHeightLayer.setStartPoint((x, y1))
-            self.outlineHeightLayer.setEndPoint((x, y1 + height))
-        with self.measurementsTextLayer.propertyGroup():
-            self.currentMeasurements = (width, height, distance)
+
+    def measureThickness(self,
+            point,
+            glyph,
+            deviceState
+        ):
+        window = self.getGlyphEditor()
+        editor = window.getGlyphView()
+        scale = editor.scale()
+        # the thickness is a true distance, so it is
+        # always measured in the unsheared outline.
+        measurementTransformation = None
+        if isinstance(glyph, ShearedGlyph):
+            measurementTransformation = glyph.transformation
+            point = glyph.inverseTransformation.transformPoint(point)
+            glyph = glyph.sourceGlyph
+        outlineIndex = glyph.getRepresentation(extensionKeyStub + "outlineIndex")
+        found = outlineIndex.measureThickness(point, thicknessHitRadius / scale)
+        if found is None:
+            return
+        start, end, distance = found
+        if measurementTransformation is not None:
+            start = measurementTransformation.transformPoint(start)
+            end = measurementTransformation.transformPoint(end)
+        (x1, y1) = start
+        (x2, y2) = end
+        width = int(round(abs(x1 - x2)))
+        height = int(round(abs(y1 - y2)))
+        with self.thicknessLineLayer.propertyGroup():
+            self.thicknessLineLayer.setStartPoint(start)
+            self.thicknessLineLayer.setEndPoint(end)
+        self.currentMeasurements = (width, height, distance)
+        self.currentMeasurementsKind = "thickness"
         return True
 
+    # Thickness Field
+    # ---------------
+    #
+    # The field is computed in a worker and stored on the
+    # outline index representation, so it is computed once
+    # per version of the glyph. Only the newest outline
+    # index is computed: a newer one replaces the pending
+    # one and stops the running one between segments. The
+    # paths are split into one layer per color.
+
+    thicknessFieldGeneration = 0
+
+    def updateThicknessField(self, glyph):
+        outlineIndex = glyph.getRepresentation(extensionKeyStub + "outlineIndex")
+        if outlineIndex is self.thicknessFieldOutlineIndex:
+            return
+        self.thicknessFieldOutlineIndex = outlineIndex
+        if outlineIndex.thicknessField is not None:
+            self.setThicknessFieldPaths(outlineIndex.thicknessField)
+            return
+        self.setThicknessFieldPaths(None)
+        if self.thicknessFieldWorker is None:
+            self.thicknessFieldWorker = worker.MeasurementWorker(AppHelper.callAfter, self.reportWorkerError)
+        self.thicknessFieldGeneration += 1
+        generation = self.thicknessFieldGeneration
+        self.thicknessFieldWorker.submit(
+            generation,
+            thickness.computeThicknessField,
+            (
+                outlineIndex,
+                thickness.fieldSpacing,
+                functools.partial(self.thicknessFieldWorker.isCurrent, generation)
+            ),
+            self._thicknessFieldComputed
+        )
+
+    def _thicknessFieldComputed(self, generation, field):
+        # the glyph may have changed while computing
+        if generation != self.thicknessFieldGeneration:
+            return
+        if field is None:
+            return
+        self.setThicknessFieldPaths(field)
+
+    def setThicknessFieldPaths(self, field):
+        pens = [merz.MerzPen() for layer in self.thicknessFieldLayers]
+        if field is not None and field.minimum is not None:
+            minimum = field.minimum
+            span = field.maximum - minimum
+            last = len(pens) - 1
+            previousPen = None
+            previousEnd = None
+            for start, end, value in field.pieces:
+                if value is None:
+                    if previousPen is not None:
+                        previousPen.endPath()
+                    previousPen = None
+                    continue
+                index = 0
+                if span:
+                    index = int(round((value - minimum) / span * last))
+                pen = pens[index]
+                # continue the previous line if possible
+                if pen is not previousPen or start != previousEnd:
+                    if previousPen is not None:
+                        previousPen.endPath()
+                    pen.moveTo(start)
+                pen.lineTo(end)
+                previousPen = pen
+                previousEnd = end
+            if previousPen is not None:
+                previousPen.endPath()
+        for layer, pen in zip(self.thicknessFieldLayers, pens):
+            layer.setPath(pen.path)
+
+    # Masters
+    # -------
+    #
+    # The feature found by the measurement methods is
+    # measured again in the same glyph in the other open
+    # fonts. The glyphs are gathered when the trigger is
+    # pressed and the cross master geometry is rebuilt
+    # only when one of the glyphs changes.
+
+    def findMasterGlyphs(self, glyph):
+        self.masterGlyphs = []
+        if not self.showMasterMeasurements:
+            return
+        from mojo.roboFont import AllFonts
+        glyphName = glyph.name
+        currentFont = glyph.font
+        masterGlyphs = [(None, glyph)]
+        for font in AllFonts():
+            if font == currentFont:
+                continue
+            if glyphName not in font:
+                continue
+            masterGlyphs.append((getMasterName(font), font[glyphName]))
+        if len(masterGlyphs) > 1:
+            self.masterGlyphs = masterGlyphs
+        if self.crossMasterGeometryCache is None:
+            self.crossMasterGeometryCache = masters.CrossMasterGeometryCache()
+
+    def measureMasters(self):
+        self.currentMasterMeasurements = None
+        if not self.masterGlyphs or self.currentFeature is None:
+            return
+        pointArrays = [
+            self.getMeasurementGlyph(masterGlyph).getRepresentation(extensionKeyStub + "pointArrays")
+            for (name, masterGlyph) in self.masterGlyphs
+        ]
+        crossMasterGeometry = self.crossMasterGeometryCache.get(pointArrays)
+        results = crossMasterGeometry.measureFeature(self.currentFeature)
+        if results is None:
+            return
+        names = [name for (name, masterGlyph) in self.masterGlyphs[1:]]
+        self.currentMasterMeasurements = self._makeMeasurementRows(names, results[1:])
+
+    def _makeMeasurementRows(self, names, results):
+        rows = []
+        for name, result in zip(names, results):
+            if result is not None and not self.showDistance:
+                result = result[:2] + (None,)
+            rows.append((name, result))
+        return tuple(rows)
+
+    # Designspace
+    # -----------
+    #
+    # The feature is measured at locations in a designspace
+    # by interpolating the feature's points in the source
+    # glyphs. The multipliers for each location are cached
+    # by the designspace and the cross master geometry is
+    # shared by all locations.
+
+    def findInstanceGlyphs(self, glyph):
+        self.instanceGlyphs = []
+        self.instanceWeights = None
+        designspace = getDesignspaceLocations(self.designspacePath, self.designspaceLocations)
+        if designspace is None or not len(designspace):
+            return
+        from mojo.roboFont import AllFonts
+        glyphName = glyph.name
+        openFonts = {
+            os.path.normpath(font.path) : font
+            for font in AllFonts()
+            if font.path
+        }
+        instanceGlyphs = [glyph]
+        available = []
+        for index, (path, layerName) in enumerate(designspace.sources):
+            sourceGlyph = getDesignspaceSourceGlyph(path, layerName, glyphName, openFonts)
+            if sourceGlyph is None:
+                continue
+            available.append(index)
+            instanceGlyphs.append(sourceGlyph)
+        if not available:
+            return
+        self.instanceGlyphs = instanceGlyphs
+        self.instanceNames = designspace.locationNames
+        # the current glyph is the reference and doesn't contribute
+        self.instanceWeights = [
+            None if row is None else [0] + row
+            for row in designspace.getWeights(available)
+        ]
+        if self.instanceGeometryCache is None:
+            self.instanceGeometryCache = masters.CrossMasterGeometryCache()
+
+    def measureInstances(self):
+        self.currentInstanceMeasurements = None
+        if not self.instanceGlyphs or self.currentFeature is None:
+            return
+        pointArrays = [
+            self.getMeasurementGlyph(instanceGlyph).getRepresentation(extensionKeyStub + "pointArrays")
+            for instanceGlyph in self.instanceGlyphs
+        ]
+        crossMasterGeometry = self.instanceGeometryCache.get(pointArrays)
+        results = crossMasterGeometry.measureFeatureWithWeights(
+            self.currentFeature,
+            self.instanceWeights
+        )
+        if results is None:
+            return
+        self.currentInstanceMeasurements = self._makeMeasurementRows(self.instanceNames, results)
+
     # Persistent
     # ----------
 
@@ -1225,6 +2042,15 @@ class LaserMeasureSubscriber(subscriber.Subscriber):
     def updatePersistentMeasurements(self, glyph):
         if not self.needPersistentMeasurementsRebuild:
             return
+        if not self.containersBuilt:
+            # there is nothing to clear, so the
+            # layers are only needed for links.
+            if not getPersistentPointMeasurementReferences(glyph):
+                self.needPersistentMeasurementsRebuild = False
+                return
+            self.buildContainers()
+        if glyph is not None:
+            self.loadNamedMeasurementsIfNeeded(glyph.font)
         persistentMeasurements = getPersistentPointMeasurements(
             glyph,
             namedWidthHeightMeasurements=self.namedWidthHeightMeasurements,
@@ -1282,17 +2108,6 @@ class LaserMeasureSubscriber(subscriber.Subscriber):
         self.needPersistentMeasurementsRebuild = False
 
 
-try:
-    subscriber.registerSubscriberEvent(
-        subscriberEventName=extensionID + ".measurementsChanged",
-        methodName="fontMeasurementsChanged",
-        lowLevelEventNames=[extensionID + ".measurementsChanged"],
-        dispatcher="roboFont",
-        delay=0.1
-    )
-except AssertionError:
-    pass
-
 # -------
 # Cursors
 # -------
@@ -1300,38 +2115,42 @@ except AssertionError:
 def setCursorMode(mode):
     tool = events.getActiveEventTool()
     if mode == "searching":
-        cursor = mainCursor
+        cursor = getMainCursor()
     elif mode == "hit":
-        cursor = mainCursor
+        cursor = getMainCursor()
     else:
         cursor = tool.getDefaultCursor()
     tool.setCursor(cursor)
 
-size = 15
-black = AppKit.NSColor.colorWithCalibratedWhite_alpha_(0, 1)
-white = AppKit.NSColor.whiteColor()
-oval = AppKit.NSBezierPath.bezierPathWithOvalInRect_(
-    ((5, 5), (size - 10, size - 10))
-)
-
-cursorImage = AppKit.NSImage.alloc().initWithSize_((size, size))
-cursorImage.lockFocus()
-white.set()
-oval.setLineWidth_(2)
-oval.stroke()
-black.set()
-oval.setLineWidth_(1)
-oval.fill()
-cursorImage.unlockFocus()
-mainCursor = CreateCursor(
-    cursorImage,
-    hotSpot=(size/2, size/2)
-)
+@functools.lru_cache(maxsize=None)
+def getMainCursor():
+    from mojo.roboFont import CreateCursor
+    size = 15
+    black = AppKit.NSColor.colorWithCalibratedWhite_alpha_(0, 1)
+    white = AppKit.NSColor.whiteColor()
+    oval = AppKit.NSBezierPath.bezierPathWithOvalInRect_(
+        ((5, 5), (size - 10, size - 10))
+    )
+    cursorImage = AppKit.NSImage.alloc().initWithSize_((size, size))
+    cursorImage.lockFocus()
+    white.set()
+    oval.setLineWidth_(2)
+    oval.stroke()
+    black.set()
+    oval.setLineWidth_(1)
+    oval.fill()
+    cursorImage.unlockFocus()
+    mainCursor = CreateCursor(
+        cursorImage,
+        hotSpot=(size/2, size/2)
+    )
+    return mainCursor
 
 # -----
 # Tools
 # -----
 
+@functools.lru_cache(maxsize=1024)
 def formatWidthHeightDistanceString(width, height, distance):
     if distance is None:
         return formatWidthHeightString(width, height)
@@ -1341,99 +2160,165 @@ def formatWidthHeightDistanceString(width, height, distance):
     s = f"{width} × {height} • {distance}"
     return s
 
+@functools.lru_cache(maxsize=1024)
 def formatWidthHeightString(width, height, distance=None):
     width = otRound(width)
     height = otRound(height)
     s = f"{width} × {height}"
     return s
 
-def formatNames(*args):
-    return "\n".join(args)
-
-# Adjacent Values
-# ---------------
+@functools.lru_cache(maxsize=1024)
+def formatSidebearingsString(left, right):
+    left = otRound(left)
+    right = otRound(right)
+    s = f"← {left} | {right} →"
+    return s
 
-def findAdjacentValues(
-        value,
-        otherValues,
-        beforeFallback,
-        afterFallback
-    ):
-    # XXX
-    # this can probably be optimized
-    # with bisect.bisect
-    before = []
-    after = []
-    for otherValue in otherValues:
-        d = abs(value - otherValue)
-        if otherValue <= value:
-            before.append((d, otherValue))
-        if otherValue >= value:
-            after.append((d, otherValue))
-    if not before:
-        before.append((0, beforeFallback))
-    if not after:
-        after.append((0, afterFallback))
-    v1 = min(before)[1]
-    v2 = min(after)[1]
-    d = int(round(abs(v1 - v2)))
-    return v1, v2, d
-
-
-# Named Measurements
-# ------------------
+@functools.lru_cache(maxsize=1024)
+def formatThicknessString(width, height, distance):
+    distance = otRound(distance)
+    s = f"⟂ {distance}"
+    return s
 
-def loadNamedMeasurements(font):
-    namedWidthMeasurements = {}
-    namedHeightMeasurements = {}
-    namedWidthHeightMeasurements = {}
-    libKey = extensionID + ".measurements"
-    if font is not None:
-        stored = font.lib.get(libKey, {})
-        for name, data in stored.items():
-            width = data.get("width")
-            height = data.get("height")
-            key = None
-            location = None
-            if width is not None and height is not None:
-                location = namedWidthHeightMeasurements
-                key = (width, height)
-            elif width is not None:
-                location = namedWidthMeasurements
-                key = width
-                name = f"W: {name}"
-            elif height is not None:
-                location = namedHeightMeasurements
-                key = height
-                name = f"H: {name}"
-            if location is None:
-                continue
-            if key not in location:
-                location[key] = []
-            location[key].append(name)
-        dicts = [
-            namedWidthMeasurements,
-            namedHeightMeasurements,
-            namedWidthHeightMeasurements
-        ]
-        for d in dicts:
-            for d, v in d.items():
-                v.sort()
-    return namedWidthHeightMeasurements, namedWidthMeasurements, namedHeightMeasurements
+def formatNames(*args):
+    return "\n".join(args)
 
+def formatSelectionStatistics(*rows):
+    lines = []
+    for label, values in rows:
+        if label == "count":
+            lines.append(f"{values} points")
+        elif label in ("nearest", "farthest"):
+            lines.append(f"{label}: {formatMasterValue(values)}")
+        elif label in ("x", "y"):
+            clusters = [
+                f"{formatMasterValue(value)} ({count})"
+                for (value, count) in values[:maximumSelectionStatisticsClusters]
+            ]
+            if len(values) > maximumSelectionStatisticsClusters:
+                clusters.append("…")
+            lines.append(f"{label}: " + " ".join(clusters))
+        else:
+            distances = [
+                f"{distance} ×{count}"
+                for (distance, count) in values
+            ]
+            lines.append(f"{label}: " + " ".join(distances))
+    return "\n".join(lines)
+
+def formatMasterMeasurements(*rows):
+    lines = []
+    for name, measurements in rows:
+        if measurements is None:
+            lines.append(f"{name}: –")
+            continue
+        width, height, distance = measurements
+        values = [formatMasterValue(width), formatMasterValue(height)]
+        s = " × ".join(values)
+        if distance is not None:
+            s += f" • {formatMasterValue(distance)}"
+        lines.append(f"{name}: {s}")
+    return "\n".join(lines)
+
+def formatMasterValue(value):
+    if value is None:
+        return "–"
+    return str(otRound(value))
+
+# Designspace
+# -----------
+
+designspaceLocationsCache = {}
+designspaceSourceFonts = {}
+
+def getDesignspaceLocations(path, locations):
+    if not path or not os.path.exists(path):
+        return None
+    key = (path, os.path.getmtime(path), repr(locations))
+    if key not in designspaceLocationsCache:
+        designspaceLocationsCache.clear()
+        designspaceSourceFonts.clear()
+        locations = [(name, dict(location)) for (name, location) in locations]
+        try:
+            designspace = interpolation.DesignspaceLocations(path, locations or None)
+        except Exception:
+            # an unreadable designspace shouldn't
+            # prevent measuring, so skip it.
+            designspace = None
+        designspaceLocationsCache[key] = designspace
+    return designspaceLocationsCache[key]
+
+def getDesignspaceSourceGlyph(path, layerName, glyphName, openFonts):
+    if path is None:
+        return None
+    path = os.path.normpath(path)
+    font = openFonts.get(path)
+    if font is None:
+        font = designspaceSourceFonts.get(path)
+    if font is None:
+        if not os.path.exists(path):
+            return None
+        from mojo.roboFont import OpenFont
+        font = designspaceSourceFonts[path] = OpenFont(path, showInterface=False)
+    if layerName is not None:
+        if layerName not in font.layerOrder:
+            return None
+        layer = font.getLayer(layerName)
+    else:
+        layer = font
+    if glyphName not in layer:
+        return None
+    return layer[glyphName]
 
-def findMatchingNamedMeasurements(
-        measurements,
-        namedWidthHeightMeasurements,
-        namedWidthMeasurements,
-        namedHeightMeasurements
-    ):
-    w, h = measurements
-    names = []
-    names += namedWidthHeightMeasurements.get((w, h), [])
-    names += namedWidthMeasurements.get(w, [])
-    names += namedHeightMeasurements.get(h, [])
-    return names
+def setMeasurementDesignspace(path, locations=None):
+    """
+    Measure at locations in the designspace at path
+    while the trigger character is pressed. locations
+    is a list of (name, userLocation) tuples. If it is
+    None, the designspace's instances are used. Give
+    None as the path to stop measuring the designspace.
+    """
+    if locations is None:
+        locations = []
+    internalSetDefault("designspacePath", path or "")
+    internalSetDefault(
+        "designspaceLocations",
+        [[name, dict(location)] for (name, location) in locations]
+    )
+    events.postEvent(extensionID + ".defaultsChanged")
+
+def getMasterName(font):
+    name = font.info.styleName
+    if not name and font.path:
+        name = os.path.splitext(os.path.basename(font.path))[0]
+    if not name:
+        name = "Untitled"
+    return name
+
+def makeTextLayerPosition(relative):
+    if relative is None:
+        return (
+            dict(
+                point="left",
+                relative="super"
+            ),
+            dict(
+                point="top",
+                relative="super"
+            )
+        )
+    return (
+        dict(
+            point="left",
+            relative=relative
+        ),
+        dict(
+            point="top",
+            relative=relative,
+            relativePoint="bottom",
+            offset=-textBlockOffset
+        )
+    )
 
 # Points
 # ------
@@ -1444,6 +2329,38 @@ def getSelectedPoints(glyph):
         points.extend([point for point in contour.selectedPoints])
     return points
 
+def getSelectedCoordinates(glyph):
+    coordinates = []
+    for contour in glyph.selectedContours:
+        coordinates.extend([(point.x, point.y) for point in contour.selectedPoints])
+    return coordinates
+
+maximumSelectionStatisticsClusters = 8
+
+def makeSelectionStatisticsRows(statistics, expanded=False):
+    """
+    Return a tuple of (label, values) rows for
+    formatSelectionStatistics or None if there
+    are fewer than three selected points.
+    """
+    count = len(statistics)
+    if count < 3:
+        return None
+    rows = [("count", count)]
+    nearest = statistics.nearestPair()
+    if nearest is not None:
+        rows.append(("nearest", nearest[0]))
+    farthest = statistics.farthestPair()
+    if farthest is not None:
+        rows.append(("farthest", farthest[0]))
+    if expanded:
+        rows.append(("x", tuple(statistics.xClusters())))
+        rows.append(("y", tuple(statistics.yClusters())))
+        for label, histogram in (("dx", statistics.dxHistogram()), ("dy", statistics.dyHistogram())):
+            if histogram:
+                rows.append((label, tuple(histogram)))
+    return tuple(rows)
+
 def measurePoints(points):
     xValues = set()
     yValues = set()
@@ -1466,6 +2383,27 @@ def measurePoints(points):
     measurements = (width, height, distance)
     return measurements
 
+# Representations
+# ---------------
+#
+# The factories are collected here and registered
+# with defcon when the first glyph editor is built.
+
+representationFactories = {}
+representationFactoriesRegistered = False
+
+def registerRepresentationFactories():
+    global representationFactoriesRegistered
+    if representationFactoriesRegistered:
+        return
+    for name, factory in representationFactories.items():
+        defcon.registerRepresentationFactory(
+            defcon.Glyph,
+            name,
+            factory
+        )
+    representationFactoriesRegistered = True
+
 # Segments and Handles
 # --------------------
 
@@ -1514,92 +2452,268 @@ def measureSegmentsAndHandles(
     return segmentType, points, (width, height, distance)
 
 
-class HandlesToLinesPen(BasePen):
+def measureHandleLines(
+        point,
+        handleLines,
+        scale,
+        highlightLayer
+    ):
+    found = handleLines.find(point, 5 / scale)
+    if found is None:
+        highlightLayer.setVisible(False)
+        return
+    (x1, y1), (x2, y2) = found
+    pen = merz.MerzPen()
+    pen.moveTo((x1, y1))
+    pen.lineTo((x2, y2))
+    pen.endPath()
+    highlightLayer.setPath(pen.path)
+    width = int(round(abs(x1 - x2)))
+    height = int(round(abs(y1 - y2)))
+    distance = calculateDistance((x1, y1), (x2, y2))
+    highlightLayer.setVisible(True)
+    return "line", [(x1, y1), (x2, y2)], (width, height, distance)
 
-    def __init__(self, outPen):
-        super().__init__()
-        self.outPen = outPen
-        self.prevPoint = None
-        self.handles = []
 
-    def _moveTo(self, pt):
-        self.prevPoint = pt
+def handlesAsLinesGlyphFactory(glyph):
+    return glyph.getRepresentation(extensionKeyStub + "combinedGeometry").handleLines
 
-    def _lineTo(self, pt):
-        self.prevPoint = pt
+representationFactories[extensionKeyStub + "handlesAsLines"] = handlesAsLinesGlyphFactory
 
-    def _curveToOne(self, pt1, pt2, pt3):
-        self.outPen.moveTo(self.prevPoint)
-        self.outPen.lineTo(pt1)
-        self.outPen.endPath()
-        self.outPen.moveTo(pt2)
-        self.outPen.lineTo(pt3)
-        self.outPen.endPath()
-        self.prevPoint = pt3
 
-    def _qCurveToOne(self, pt1, pt2):
-        self.outPen.moveTo(self.prevPoint)
-        self.outPen.lineTo(pt1)
-        self.outPen.endPath()
-        self.outPen.moveTo(pt1)
-        self.outPen.lineTo(pt2)
-        self.outPen.endPath()
-        self.prevPoint = pt2
+# Components
+# ----------
+#
+# The representations below include the components by
+# transforming the base glyph's representation instead
+# of decomposing and starting over. Components are added
+# after the contours, in the same order that they are
+# drawn into the decomposed outline.
+
+def iterateComponentRepresentations(glyph, name):
+    layer = glyph.layer
+    if layer is None:
+        return
+    for component in glyph.components:
+        baseGlyphName = component.baseGlyph
+        if baseGlyphName not in layer:
+            continue
+        baseGlyph = layer[baseGlyphName]
+        yield (
+            baseGlyph.getRepresentation(extensionKeyStub + name),
+            component.transformation
+        )
 
-    def _closePath(self):
-        self.prevPoint = None
 
-    def _endPath(self):
-        self.prevPoint = None
+# Decomposed Outline
+# ------------------
+#
+# The intersection based tests need the outline with the
+# components decomposed. The decomposed outline is stored
+# as a representation and components are drawn from the
+# base glyph's representation, so nested components are
+# only decomposed once. Changes to a base glyph are posted
+# by the composite glyph, so the representation is
+# invalidated then too.
+
+class DecomposingPointPen(AbstractPointPen):
+
+    def __init__(self, outPen, glyphSet):
+        self.outPen = outPen
+        self.glyphSet = glyphSet
 
-    def addComponent(self, *args, **kwargs):
-        pass
+    def beginPath(self, **kwargs):
+        self.outPen.beginPath(**kwargs)
 
+    def endPath(self):
+        self.outPen.endPath()
 
-def handlesAsLinesGlyphFactory(glyph):
+    def addPoint(self, pt, segmentType=None, smooth=False, name=None, **kwargs):
+        self.outPen.addPoint(pt, segmentType=segmentType, smooth=smooth, name=name, **kwargs)
+
+    def addComponent(self, baseGlyphName, transformation, **kwargs):
+        if self.glyphSet is None or baseGlyphName not in self.glyphSet:
+            return
+        baseGlyph = self.glyphSet[baseGlyphName]
+        decomposed = baseGlyph.getRepresentation(extensionKeyStub + "decomposedOutline")
+        decomposed.drawPoints(TransformPointPen(self.outPen, transformation))
+
+
+def decomposedOutlineGlyphFactory(glyph):
+    from fontParts.world import RGlyph
     outGlyph = RGlyph()
-    pen = HandlesToLinesPen(outGlyph.getPen())
-    glyph.draw(pen)
+    outGlyph.width = glyph.width
+    pen = DecomposingPointPen(outGlyph.getPointPen(), glyph.layer)
+    glyph.drawPoints(pen)
     return outGlyph
 
-defcon.registerRepresentationFactory(
-    defcon.Glyph,
-    extensionKeyStub + "handlesAsLines",
-    handlesAsLinesGlyphFactory
-)
+representationFactories[extensionKeyStub + "decomposedOutline"] = decomposedOutlineGlyphFactory
 
+def getOutlineGlyph(glyph):
+    if isinstance(glyph, ShearedGlyph):
+        return glyph.outline
+    if not glyph.components:
+        return glyph
+    return glyph.getRepresentation(extensionKeyStub + "decomposedOutline")
 
-# Collinear Points
-# ----------------
 
-class NearestPointsPointPen(AbstractPointPen):
+# Intersections
+# -------------
+#
+# The outline, anchor and point tests intersect lines
+# with the outline. The intersector is a representation,
+# so the segments are only prepared once per glyph change.
+# This has the same arguments as the function in
+# mojo.tools that it replaces.
 
-    def __init__(self):
-        self.onCurvePoints = []
-        self.contourOnCurveCounts = {}
-        self._currentContour = 0
-        self._pointIndex = 0
-        self._pointCombinationValidity = {}
+def outlineIntersectorGlyphFactory(glyph, canHaveComponent=True):
+    if canHaveComponent or not glyph.components:
+        segments = glyph.getRepresentation(extensionKeyStub + "relativeSegments")
+    else:
+        pen = geometry.RelativeSegmentsPen()
+        glyph.draw(pen)
+        segments = pen.segments
+    return intersection.OutlineIntersector(segments, glyph.width)
 
-    def beginPath(self, **kwargs):
-        pass
+representationFactories[extensionKeyStub + "outlineIntersector"] = outlineIntersectorGlyphFactory
+
+def intersectGlyphWithLine(glyph, line, canHaveComponent=True, addSideBearings=False):
+    intersector = glyph.getRepresentation(
+        extensionKeyStub + "outlineIntersector",
+        canHaveComponent=canHaveComponent
+    )
+    return intersector.intersectLine(line, addSideBearings=addSideBearings)
 
-    def endPath(self, **kwargs):
-        self.contourOnCurveCounts[self._currentContour] = self._pointIndex
-        self._currentContour += 1
-        self._pointIndex = 0
+# While the cursor is moving, the outline and anchor
+# tests cut a polyline version of the outline that is
+# only as precise as the view can show. Each level of
+# detail is cached separately, so zooming back and forth
+# doesn't rebuild them. Only the hits that are reported
+# are refined against the curves.
 
-    def addComponent(self, *args, **kwargs):
-        pass
+def flattenedOutlineGlyphFactory(glyph, tolerance=1):
+    segments = glyph.getRepresentation(extensionKeyStub + "relativeSegments")
+    return intersection.FlattenedOutline(segments, tolerance)
+
+representationFactories[extensionKeyStub + "flattenedOutline"] = flattenedOutlineGlyphFactory
+
+def getFlattenedOutline(glyph, scale):
+    return getOutlineGlyph(glyph).getRepresentation(
+        extensionKeyStub + "flattenedOutline",
+        tolerance=intersection.getFlatteningTolerance(scale)
+    )
+
+def findAdjacentOutlineHits(flattenedOutline, queries, approximate=False):
+    # this may be called in the measurement worker.
+    return [
+        flattenedOutline.adjacentHits(line, value, axis, approximate=approximate)
+        for (line, value, axis) in queries
+    ]
+
+
+# Sheared Outline
+# ---------------
+#
+# A de-slanted copy of the decomposed outline and the
+# anchors for measuring along the italic angle. The
+# copy acts like the glyph that it was made from, so
+# all of the other representations can be made from
+# it and are cached with it.
+
+class ShearedGlyph:
+
+    def __init__(self, glyph, outline, transformation):
+        self._sourceGlyph = weakref.ref(glyph)
+        self.outline = outline
+        self.transformation = transformation
+        self.inverseTransformation = transformation.inverse()
+
+    def __getattr__(self, attr):
+        return getattr(self.outline, attr)
+
+    def _get_sourceGlyph(self):
+        return self._sourceGlyph()
+
+    sourceGlyph = property(_get_sourceGlyph)
+
+    def _get_font(self):
+        return self.sourceGlyph.font
+
+    font = property(_get_font)
+
+
+def shearedOutlineGlyphFactory(glyph, italicAngle=0, italicSlantOffset=0):
+    from fontParts.world import RGlyph
+    transformation = geometry.makeDeslantTransform(italicAngle, italicSlantOffset)
+    outGlyph = RGlyph()
+    outGlyph.width = glyph.width
+    pen = TransformPointPen(outGlyph.getPointPen(), transformation)
+    getOutlineGlyph(glyph).drawPoints(pen)
+    for anchor in glyph.anchors:
+        outGlyph.appendAnchor(
+            anchor.name,
+            transformation.transformPoint((anchor.x, anchor.y))
+        )
+    return ShearedGlyph(glyph, outGlyph, transformation)
+
+representationFactories[extensionKeyStub + "shearedOutline"] = shearedOutlineGlyphFactory
+
+
+# Point Arrays
+# ------------
+#
+# pointArrays has the glyph's own contours. glyphGeometry
+# adds the components by joining the transformed snapshots
+# of the base glyphs. (It is the same object as pointArrays
+# when there are no components.) This is the only place
+# where the glyph's contours are walked.
+#
+# combinedGeometry is made in one pass over the glyph
+# geometry: the segments, handles, handle lines and the
+# on curve table for the point searcher. relativeSegments,
+# relativeHandles, handlesAsLines, segmentGroups and
+# nearestPointSearcher are views of it.
+
+def pointArraysGlyphFactory(glyph):
+    return geometry.makePointArrays(glyph)
+
+representationFactories[extensionKeyStub + "pointArrays"] = pointArraysGlyphFactory
 
-    def addPoint(self, pt, segmentType=None, **kwargs):
-        if segmentType is not None:
-            self.onCurvePoints.append((self._currentContour, self._pointIndex, pt))
-            self._pointIndex += 1
+def glyphGeometryGlyphFactory(glyph):
+    pointArrays = [glyph.getRepresentation(extensionKeyStub + "pointArrays")]
+    for baseGeometry, transformation in iterateComponentRepresentations(glyph, "glyphGeometry"):
+        pointArrays.append(baseGeometry.transformed(transformation))
+    return geometry.joinPointArrays(pointArrays)
 
-    def find(self, glyph, location):
+representationFactories[extensionKeyStub + "glyphGeometry"] = glyphGeometryGlyphFactory
+
+def combinedGeometryGlyphFactory(glyph):
+    return geometry.makeCombinedGeometry(glyph.getRepresentation(extensionKeyStub + "glyphGeometry"))
+
+representationFactories[extensionKeyStub + "combinedGeometry"] = combinedGeometryGlyphFactory
+
+
+# Collinear Points
+# ----------------
+
+class NearestPointsSearcher:
+
+    """
+    The on curve table comes from the combined geometry.
+    The searcher is kept as a representation because it
+    remembers which point combinations are invalid.
+    """
+
+    def __init__(self, onCurvePoints, contourOnCurveCounts):
+        self.onCurvePoints = onCurvePoints
+        self.contourOnCurveCounts = contourOnCurveCounts
+        self._pointCombinationValidity = {}
+
+    def find(self, glyph, location, checkCrossings=True):
         font = glyph.font
         unitsPerEm = font.info.unitsPerEm
+        # the contour indexes include the components
+        glyph = getOutlineGlyph(glyph)
         # filter to the closest points
         points = []
         for contourIndex, pointIndex, point in self.onCurvePoints:
@@ -1637,8 +2751,8 @@ class NearestPointsPointPen(AbstractPointPen):
                     # the distance must be lower than the max
                     # if the line is not a multiple of 90 degrees
                     angle = bezierTools.calculateAngle(point1, point2)
-                    angle = normalizeAngle(angle)
-                    if not isRightAngle(angle):
+                    angle = geometry.normalizeAngle(angle)
+                    if not geometry.isRightAngle(angle):
                         contour2 = glyph.contours[contour2Index]
                         contour2Width, contour2Height = getContourWidthHeight(contour2)
                         distanceLimit = max((contour1Width, contour1Height, contour2Width, contour2Height)) * 0.5
@@ -1653,8 +2767,8 @@ class NearestPointsPointPen(AbstractPointPen):
                         continue
                     # point1-location-point2 must be close to collinear
                     distance = calculateDistance(point1, point2)
-                    tolerance = calcCollinearityTolerance(distance, unitsPerEm)
-                    if not isCollinear(point1, location, point2, tolerance):
+                    tolerance = geometry.calcCollinearityTolerance(distance, unitsPerEm)
+                    if not geometry.isCollinear(point1, location, point2, tolerance):
                         continue
                     # store
                     candidates.append((distanceToCursor, (point1, point2)))
@@ -1664,8 +2778,10 @@ class NearestPointsPointPen(AbstractPointPen):
         # only test a limited number
         for candidate in candidates[:10]:
             point1, point2 = candidate[-1]
+            if not checkCrossings:
+                return (point1, point2)
             line = (point1, point2)
-            intersections = tools.IntersectGlyphWithLine(
+            intersections = intersectGlyphWithLine(
                 glyph,
                 line,
                 canHaveComponent=False,
@@ -1681,71 +2797,10 @@ class NearestPointsPointPen(AbstractPointPen):
 
 
 def nearestPointSearcherGlyphFactory(glyph):
-    pen = NearestPointsPointPen()
-    glyph.drawPoints(pen)
-    return pen
-
-defcon.registerRepresentationFactory(
-    defcon.Glyph,
-    extensionKeyStub + "nearestPointSearcher",
-    nearestPointSearcherGlyphFactory
-)
+    combined = glyph.getRepresentation(extensionKeyStub + "combinedGeometry")
+    return NearestPointsSearcher(combined.onCurvePoints, combined.contourOnCurveCounts)
 
-def normalizeAngle(angle):
-    if angle < 0:
-        angle = 360 + angle
-    return angle
-
-def roundTo(value, multiple):
-    value = int(round(value / float(multiple))) * multiple
-    return value
-
-def isRightAngle(angle):
-    tolerance = 1
-    if angle <= tolerance:
-        return True
-    elif angle >= (90 - tolerance) and angle <= (90 + tolerance):
-        return True
-    elif angle >= (180 - tolerance) and angle <= (180 + tolerance):
-        return True
-    elif angle >= (270 - tolerance) and angle <= (270 + tolerance):
-        return True
-    elif angle >= (360 - tolerance):
-        return True
-    return False
-
-def isCollinear(point1, location, point2, tolerance):
-    tolerance = math.radians(tolerance)
-    x1, y1 = point1
-    x2, y2 = location
-    x3, y3 = point2
-    dx1 = x2 - x1
-    dy1 = y2 - y1
-    dx2 = x3 - x2
-    dy2 = y3 - y2
-    a1 = math.atan2(dy1, dx1)
-    a2 = math.atan2(dy2, dx2)
-    collinearity = abs(a1 - a2)
-    if collinearity > math.pi:
-        collinearity = math.pi * 2 - collinearity
-    if collinearity > tolerance:
-       return False
-    return True
-
-maxCollinearityTolerance = 30
-minCollinearityTolerance = 2
-collinearityToleranceRange = maxCollinearityTolerance - minCollinearityTolerance
-
-def calcCollinearityTolerance(distance, unitsPerEm):
-    minDistance = unitsPerEm * 0.02
-    maxDistance = unitsPerEm * 0.5
-    if distance < minDistance:
-        return maxCollinearityTolerance
-    elif distance > maxDistance:
-        return minCollinearityTolerance
-    proportion = (distance - minDistance) / (maxDistance - minDistance)
-    tolerance = maxCollinearityTolerance - (collinearityToleranceRange * proportion)
-    return tolerance
+representationFactories[extensionKeyStub + "nearestPointSearcher"] = nearestPointSearcherGlyphFactory
 
 def getContourWidthHeight(contour):
     xMin, yMin, xMax, yMax = contour.bounds
@@ -1753,256 +2808,53 @@ def getContourWidthHeight(contour):
     h = yMax - yMin
     return (w, h)
 
-def angledPoint(pt, angle, offset=0):
-    if not angle:
-        return pt
-    x, y = pt
-    x = x - math.tan(math.radians(angle)) * y
-    x += offset
-    return x, y
-
-# Segment Matching
-# ----------------
-
-class RelativeSegment:
-
-    def __init__(self, type, segment):
-        if type == "move":
-            type = "line"
-        self.type = type
-        self.original = tuple(segment)
-        self._reversedOriginal = None
-        self._base = None
-        self._reversedBase = None
-
-    def __repr__(self):
-        o = repr(self.original)
-        b = repr(self.base)
-        return f"{o}-{b}"
-
-    def __hash__(self):
-        return hash(self.base)
-
-    def _get_base(self):
-        if self._base is None:
-            self._base = makePointsRelative(self.original)
-        return self._base
-
-    base = property(_get_base)
-
-    def _get_reversedBase(self):
-        if self._reversedBase is None:
-            points = reversePoints(self.original)
-            self._reversedBase = makePointsRelative(points)
-        return self._reversedBase
-
-    reversedBase = property(_get_reversedBase)
-
-    def _get_reversedOriginal(self):
-        if self._reversedOriginal is None:
-            self._reversedOriginal = reversePoints(self.original)
-        return self._reversedOriginal
-
-    reversedOriginal = property(_get_reversedOriginal)
-
-    def __cmp__(self, other):
-        return self.__eq__(other)
-
-    def __eq__(self, other):
-        segment = other.base
-        # obvious mismatches
-        if other.type != self.type:
-            return False
-        if len(segment) != len(self.original):
-            return False
-        # obvious matches
-        if segment == self.base:
-            return True
-        if segment == self.reversedBase:
-            return True
-        # transform and compare
-        base = self.base
-        reversedBase = self.reversedBase
-        transformers = (
-            ("rotated90", [base, rotate90Transform.transformPoints]),
-            ("rotated180", [base, rotate180Transform.transformPoints]),
-            ("rotated270", [base, rotate270Transform.transformPoints]),
-            ("flippedHorizontal", [base, flipHorizontalTransform.transformPoints]),
-            ("flippedVertical", [base, flipVerticalTransform.transformPoints]),
-            ("reversedRotated90", [reversedBase, rotate90Transform.transformPoints]),
-            ("reversedRotated180", [reversedBase, rotate180Transform.transformPoints]),
-            ("reversedRotated270", [reversedBase, rotate270Transform.transformPoints]),
-            ("reversedFlippedHorizontal", [reversedBase, flipHorizontalTransform.transformPoints]),
-            ("reversedFlippedVertical", [reversedBase, flipVerticalTransform.transformPoints]),
-        )
-        for attr, (points, transformer) in transformers:
-            if not hasattr(self, attr):
-                transformed = tuple(transformer(points))
-                setattr(self, attr, transformed)
-            transformed = getattr(self, attr)
-            if segment == transformed:
-                return True
-        return False
-
-    def isSame(self, other):
-        if other.original == self.original:
-            return True
-        if other.original == self.reversedOriginal:
-            return True
-        return False
-
-
-class RelativeSegmentsPen(BasePen):
-
-    def __init__(self):
-        super().__init__()
-        self.prevPoint = None
-        self.segments = []
-
-    def _moveTo(self, pt):
-        self.firstPoint = pt
-        self.prevPoint = pt
-
-    def _lineTo(self, pt):
-        self.segments.append(RelativeSegment("line", (self.prevPoint, pt)))
-        self.prevPoint = pt
-
-    def _curveToOne(self, pt1, pt2, pt3):
-        self.segments.append(RelativeSegment("curve", (self.prevPoint, pt1, pt2, pt3)))
-        self.prevPoint = pt3
-
-    def _qCurveToOne(self, pt1, pt2):
-        self.segments.append(RelativeSegment("qcurve", (self.prevPoint, pt1, pt2)))
-        self.prevPoint = pt2
-
-    def _closePath(self):
-        if self.prevPoint != self.firstPoint:
-            self.segments.append(RelativeSegment("line", (self.prevPoint, self.firstPoint)))
-        self.firstPoint = None
-        self.prevPoint = None
-
-    def _endPath(self):
-        self.firstPoint = None
-        self.prevPoint = None
-
-    def addComponent(self, *args, **kwargs):
-        pass
-
-
 def relativeSegmentsGlyphFactory(glyph):
-    segmentsPen = RelativeSegmentsPen()
-    glyph.draw(segmentsPen)
-    return segmentsPen.segments
-
-defcon.registerRepresentationFactory(
-    defcon.Glyph,
-    extensionKeyStub + "relativeSegments",
-    relativeSegmentsGlyphFactory
-)
-
-def segmentGroupsGlyphFactory(glyph):
-    segments = glyph.getRepresentation(extensionKeyStub + "relativeSegments")
-    tree = {}
-    for segment in segments:
-        key = None
-        for candidateKey in tree.keys():
-            if candidateKey == segment:
-                key = candidateKey
-                break
-        if key is None:
-            key = segment
-        if key not in tree:
-            tree[key] = []
-        tree[key].append(segment)
-    sorter = []
-    for key, segments in tree.items():
-        if len(segments) < 2:
-            continue
-        segments = tuple(sorted([s.original for s in segments]))
-        sorter.append((key.type, segments))
-    return list(sorted(sorter))
-
-defcon.registerRepresentationFactory(
-    defcon.Glyph,
-    extensionKeyStub + "segmentGroups",
-    segmentGroupsGlyphFactory
-)
-
-def makePointRelative(point, basePoint):
-    px, py = point
-    bx, by = basePoint
-    x = px - bx
-    y = py - by
-    return (x, y)
-
-def makePointsRelative(points):
-    points = [(0, 0)] + [
-        makePointRelative(p, points[0])
-        for p in points[1:]
-    ]
-    return tuple(points)
-
-def reversePoints(points):
-    return tuple(reversed(points))
-
-rotate90Transform = transform.Transform().rotate(math.radians(90))
-rotate180Transform = transform.Transform().rotate(math.radians(180))
-rotate270Transform = transform.Transform().rotate(math.radians(270))
-flipHorizontalTransform = transform.Scale(1, -1)
-flipVerticalTransform = transform.Scale(-1, 1)
-
-
-# Handle Matching
-# ---------------
-
-class RelativeHandle(RelativeSegment):
-
-    def __init__(self, points):
-        super().__init__("line", points)
-
+    return glyph.getRepresentation(extensionKeyStub + "combinedGeometry").segments
 
-class RelativeHandlesPen(BasePen):
+representationFactories[extensionKeyStub + "relativeSegments"] = relativeSegmentsGlyphFactory
 
-    def __init__(self):
-        super().__init__()
-        self.handles = []
-
-    def addComponent(self, *args, **kwargs):
-        pass
-
-    def _moveTo(self, pt):
-        self.prevPoint = pt
-
-    def _lineTo(self, pt):
-        self.prevPoint = pt
+def outlineIndexGlyphFactory(glyph):
+    segments = glyph.getRepresentation(extensionKeyStub + "relativeSegments")
+    return thickness.OutlineIndex(segments)
 
-    def _curveToOne(self, pt1, pt2, pt3):
-        self.handles.append(RelativeHandle((self.prevPoint, pt1)))
-        self.handles.append(RelativeHandle((pt2, pt3)))
-        self.prevPoint = pt3
+representationFactories[extensionKeyStub + "outlineIndex"] = outlineIndexGlyphFactory
 
-    def _qCurveToOne(self, pt1, pt2):
-        self.handles.append(RelativeHandle((self.prevPoint, pt1)))
-        self.handles.append(RelativeHandle((pt1, pt2)))
-        self.prevPoint = pt2
+def outlineProfileGlyphFactory(glyph):
+    segments = glyph.getRepresentation(extensionKeyStub + "relativeSegments")
+    return profiles.OutlineProfile(segments)
 
-    def _closePath(self):
-        self.prevPoint = None
+representationFactories[extensionKeyStub + "outlineProfile"] = outlineProfileGlyphFactory
 
-    def _endPath(self):
-        self.prevPoint = None
+def segmentGroupsGlyphFactory(glyph):
+    return glyph.getRepresentation(extensionKeyStub + "combinedGeometry").segmentGroups
+
+representationFactories[extensionKeyStub + "segmentGroups"] = segmentGroupsGlyphFactory
+
+def segmentGroupPathsGlyphFactory(glyph, colorCount=1):
+    # The groups are distributed over the colors in
+    # order and all groups that share a color are
+    # combined into a single path.
+    groups = glyph.getRepresentation(extensionKeyStub + "segmentGroups")
+    pens = [merz.MerzPen() for i in range(max(1, colorCount))]
+    for i, (type, segments) in enumerate(groups):
+        pen = pens[i % len(pens)]
+        for segment in segments:
+            pen.moveTo(segment[0])
+            if type == "line":
+                pen.lineTo(segment[1])
+            elif type == "curve":
+                pen.curveTo(*segment[1:])
+            elif type == "qcurve":
+                pen.qCurveTo(*segment[1:])
+            pen.endPath()
+    return [pen.path for pen in pens]
 
+representationFactories[extensionKeyStub + "segmentGroupPaths"] = segmentGroupPathsGlyphFactory
 
 def relativeHandlesGlyphFactory(glyph):
-    handlesPen = RelativeHandlesPen()
-    glyph.draw(handlesPen)
-    return handlesPen.handles
-
-defcon.registerRepresentationFactory(
-    defcon.Glyph,
-    extensionKeyStub + "relativeHandles",
-    relativeHandlesGlyphFactory
-)
+    return glyph.getRepresentation(extensionKeyStub + "combinedGeometry").handles
+
+representationFactories[extensionKeyStub + "relativeHandles"] = relativeHandlesGlyphFactory
 
 
 # ---
@@ -2010,11 +2862,29 @@ defcon.registerRepresentationFactory(
 # ---
 
 hudPadding = 10
+hudPointSize = 12
+hudButtonWidth = 42
+hudButtonHeight = 30
+hudXStart = -25
+hudYStart = 10
 
 class LaserMeasureNamedValuesHUD:
 
+    # Rendering
+    # ---------
+    #
+    # The rows are virtualized: only the rows that fit
+    # in the glyph editor get layers and those layers
+    # are kept in a pool and reused by the next update.
+    # The update is skipped completely if the items,
+    # colors and available height haven't changed.
+
     def __init__(self, glyphEditor, addButtonCallback, showButtonCallback):
-        self.items = {}
+        self.glyphEditor = glyphEditor
+        self.items = []
+        self.rowPool = []
+        self.topLineLayer = None
+        self.renderedState = None
 
         subview = vanilla.Group((0, 0, 0, 0))
         subview.background = merz.MerzView((0, 0, 0, 0))
@@ -2050,6 +2920,9 @@ class LaserMeasureNamedValuesHUD:
         )
 
     def show(self, showButton):
+        # the editor may have been resized since
+        # the last update. this is a no-op if not.
+        self.update()
         if self.addButton.isVisible() != showButton:
             self.addButton.show(showButton)
         if not self.subview.isVisible():
@@ -2059,57 +2932,6 @@ class LaserMeasureNamedValuesHUD:
         self.subview.show(False)
 
     def setItems(self, items):
-        self.items = items
-        self.update()
-
-    def update(self):
-        color = getExtensionDefault(extensionID + ".baseColor")
-        r, g, b, a = color
-        lineColor = (r, g, b, a * 0.25)
-        backgroundColor = tuple(UI.getDefault("glyphViewBackgroundColor"))
-
-        # Background
-        self.background.setBackgroundColor(backgroundColor)
-        self.background.setOpacity(0.9)
-
-        # Add Button
-        image = AppKit.NSImage.alloc().initWithSize_((20, 20))
-        linePath = AppKit.NSBezierPath.bezierPathWithOvalInRect_(((2, 2), (16, 16)))
-        linePath.moveToPoint_((10, 6))
-        linePath.lineToPoint_((10, 14))
-        linePath.moveToPoint_((6, 10))
-        linePath.lineToPoint_((14, 10))
-        linePath.setLineWidth_(1)
-        linePath.setLineCapStyle_(AppKit.NSLineCapStyleRound)
-        image.lockFocus()
-        AppKit.NSColor.colorWithCalibratedRed_green_blue_alpha_(*backgroundColor).set()
-        linePath.fill()
-        AppKit.NSColor.colorWithCalibratedRed_green_blue_alpha_(*color).set()
-        linePath.stroke()
-        image.unlockFocus()
-        self.addButton.setImage(imageObject=image)
-
-        # Edit Button
-        image = AppKit.NSImage.alloc().initWithSize_((20, 20))
-        linePath = AppKit.NSBezierPath.bezierPathWithOvalInRect_(((2, 2), (16, 16)))
-        linePath.setLineWidth_(1)
-        linePath.setLineCapStyle_(AppKit.NSLineCapStyleRound)
-        fillPath = AppKit.NSBezierPath.bezierPath()
-        fillPath.appendBezierPathWithOvalInRect_(((6, 9), (2, 2)))
-        fillPath.appendBezierPathWithOvalInRect_(((9, 9), (2, 2)))
-        fillPath.appendBezierPathWithOvalInRect_(((12, 9), (2, 2)))
-        image.lockFocus()
-        AppKit.NSColor.colorWithCalibratedRed_green_blue_alpha_(*backgroundColor).set()
-        linePath.fill()
-        AppKit.NSColor.colorWithCalibratedRed_green_blue_alpha_(*color).set()
-        linePath.stroke()
-        fillPath.fill()
-
-        image.unlockFocus()
-        self.editButton.setImage(imageObject=image)
-
-        # Text
-        items = self.items
         unpacked = []
         for name, item in items.items():
             width = item.get("width")
@@ -2122,12 +2944,51 @@ class LaserMeasureNamedValuesHUD:
                 height = ""
             else:
                 height = str(height)
-            item = dict(name=name, width=width, height=height)
-            unpacked.append((name.lower(), width, height, item))
+            unpacked.append((name.lower(), width, height, name))
         unpacked.sort()
-        items = [i[-1] for i in unpacked]
+        self.items = [
+            (name, width, height)
+            for (sortName, width, height, name) in unpacked
+        ]
+        self.update()
+
+    def getMaximumRowCount(self):
+        view = self.glyphEditor.getGlyphView()
+        availableHeight = view.visibleRect().size.height
+        availableHeight -= hudYStart * 2 + hudButtonHeight + hudPadding * 2
+        rowHeight = hudPointSize * 2
+        # one row is used by the column titles
+        return max(0, int(availableHeight // rowHeight) - 1)
+
+    def update(self):
+        color = tuple(getExtensionDefault(extensionID + ".baseColor"))
+        backgroundColor = tuple(UI.getDefault("glyphViewBackgroundColor"))
+        maximumRowCount = self.getMaximumRowCount()
+        state = (color, backgroundColor, maximumRowCount, tuple(self.items))
+        if state == self.renderedState:
+            return
+        previousState = self.renderedState
+        self.renderedState = state
+        r, g, b, a = color
+        lineColor = (r, g, b, a * 0.25)
 
-        pointSize = 12
+        if previousState is None or previousState[:2] != (color, backgroundColor):
+            # Background
+            self.background.setBackgroundColor(backgroundColor)
+            self.background.setOpacity(0.9)
+            # Buttons
+            self.addButton.setImage(imageObject=getHUDButtonImage("add", color, backgroundColor))
+            self.editButton.setImage(imageObject=getHUDButtonImage("edit", color, backgroundColor))
+
+        # Text
+        items = list(self.items)
+        if len(items) > maximumRowCount:
+            hiddenCount = len(items) - maximumRowCount + 1
+            items = items[:max(0, maximumRowCount - 1)]
+            if maximumRowCount:
+                items.append((f"+ {hiddenCount} more", "", ""))
+
+        pointSize = hudPointSize
         textAttributes = dict(
             pointSize=pointSize,
             padding=(0, pointSize / 4),
@@ -2138,8 +2999,7 @@ class LaserMeasureNamedValuesHUD:
         )
         nameTextAttributes = dict(textAttributes)
         nameTextAttributes["horizontalAlignment"] = "left"
-        font = merz.text.makeFont(
-            "system",
+        font = getHUDFont(
             weight=textAttributes["weight"],
             figureStyle=textAttributes["figureStyle"],
             pointSize=textAttributes["pointSize"],
@@ -2150,14 +3010,11 @@ class LaserMeasureNamedValuesHUD:
             calculateTextWidth("W", font),
             calculateTextWidth("H", font)
         ]
-        for item in items:
-            nameWidths.append(calculateTextWidth(item["name"], font))
-            numberWidths.append(calculateTextWidth(item["width"], font))
-            numberWidths.append(calculateTextWidth(item["height"], font))
-
-        buttonWidth = 42
-        buttonHeight = 30
-        pointSize = textAttributes["pointSize"]
+        for name, width, height in items:
+            nameWidths.append(calculateTextWidth(name, font))
+            numberWidths.append(calculateTextWidth(width, font))
+            numberWidths.append(calculateTextWidth(height, font))
+
         nameWidth = 0
         numberWidth = 0
         if items:
@@ -2166,86 +3023,166 @@ class LaserMeasureNamedValuesHUD:
         rowHeight = pointSize * 2
         columnSpacing = pointSize * 0.75
         totalWidth = nameWidth + columnSpacing + numberWidth + columnSpacing + numberWidth
-        totalWidth = max((buttonWidth, totalWidth))
+        totalWidth = max((hudButtonWidth, totalWidth))
         textViewHeight = 0
         if items:
             textViewHeight = rowHeight * (len(items) + 1)
-        totalHeight = textViewHeight + buttonHeight
+        totalHeight = textViewHeight + hudButtonHeight
         totalWidth += hudPadding * 2
         totalHeight += hudPadding * 2
-        xStart = -25
-        yStart = 10
 
         self.group.setPosSize((hudPadding, hudPadding, totalWidth - (hudPadding * 2), totalHeight - (hudPadding * 2)))
-        self.subview.setPosSize((-totalWidth + xStart, yStart, totalWidth, totalHeight))
+        self.subview.setPosSize((-totalWidth + hudXStart, hudYStart, totalWidth, totalHeight))
         if items:
-            items.insert(0, dict(name="", width="W", height="H"))
-
-        self.textContainer.clearSublayers()
+            items.insert(0, ("", "W", "H"))
 
         top = textViewHeight
 
-        if items:
-            self.textContainer.appendBaseSublayer(
-                name=f"topLine",
-                position=(0, top - 1),
-                size=(totalWidth, 1),
-                borderColor=lineColor,
+        if self.topLineLayer is None:
+            self.topLineLayer = self.textContainer.appendBaseSublayer(
+                name="topLine",
                 borderWidth=1
             )
-
-        for i, item in enumerate(items):
-            name = item["name"]
-            width = item["width"]
-            height = item["height"]
+        with self.topLineLayer.propertyGroup():
+            self.topLineLayer.setPosition((0, top - 1))
+            self.topLineLayer.setSize((totalWidth, 1))
+            self.topLineLayer.setBorderColor(lineColor)
+            self.topLineLayer.setVisible(bool(items))
+
+        while len(self.rowPool) < len(items):
+            i = len(self.rowPool)
+            self.rowPool.append(dict(
+                name=self.textContainer.appendTextBoxSublayer(name=f"name{i}"),
+                width=self.textContainer.appendTextBoxSublayer(name=f"width{i}"),
+                height=self.textContainer.appendTextBoxSublayer(name=f"height{i}"),
+                line=self.textContainer.appendBaseSublayer(name=f"line{i}", borderWidth=1)
+            ))
+
+        for i, row in enumerate(self.rowPool):
+            if i >= len(items):
+                for layer in row.values():
+                    layer.setVisible(False)
+                continue
+            name, width, height = items[i]
             y = top - rowHeight
             # name
-            self.textContainer.appendTextBoxSublayer(
-                name=f"name{i}",
+            row["name"].setPropertiesByName(dict(
                 text=name,
                 position=(0, y),
                 size=(nameWidth, rowHeight),
+                visible=True,
                 **nameTextAttributes
-            )
+            ))
             # width
-            self.textContainer.appendTextBoxSublayer(
-                name=f"width{i}",
+            row["width"].setPropertiesByName(dict(
                 text=width,
                 position=(
                     nameWidth + columnSpacing,
                     y
                 ),
                 size=(numberWidth, rowHeight),
+                visible=True,
                 **textAttributes
-            )
+            ))
             # height
-            self.textContainer.appendTextBoxSublayer(
-                name=f"height{i}",
+            row["height"].setPropertiesByName(dict(
                 text=height,
                 position=(
                     nameWidth + columnSpacing + numberWidth + columnSpacing,
                     y
                 ),
                 size=(numberWidth, rowHeight),
+                visible=True,
                 **textAttributes
-            )
+            ))
             # line
-            self.textContainer.appendBaseSublayer(
-                name=f"line{i}",
+            row["line"].setPropertiesByName(dict(
                 position=(0, y),
                 size=(totalWidth, 1),
                 borderColor=lineColor,
-                borderWidth=1
-            )
+                visible=True
+            ))
             top -= rowHeight
 
 
+# Buttons
+# -------
+
+_hudButtonImageCache = {}
+
+def getHUDButtonImage(kind, color, backgroundColor):
+    key = (kind, color, backgroundColor)
+    if key not in _hudButtonImageCache:
+        if kind == "add":
+            image = _drawHUDAddButtonImage(color, backgroundColor)
+        else:
+            image = _drawHUDEditButtonImage(color, backgroundColor)
+        _hudButtonImageCache[key] = image
+    return _hudButtonImageCache[key]
+
+def _drawHUDAddButtonImage(color, backgroundColor):
+    image = AppKit.NSImage.alloc().initWithSize_((20, 20))
+    linePath = AppKit.NSBezierPath.bezierPathWithOvalInRect_(((2, 2), (16, 16)))
+    linePath.moveToPoint_((10, 6))
+    linePath.lineToPoint_((10, 14))
+    linePath.moveToPoint_((6, 10))
+    linePath.lineToPoint_((14, 10))
+    linePath.setLineWidth_(1)
+    linePath.setLineCapStyle_(AppKit.NSLineCapStyleRound)
+    image.lockFocus()
+    AppKit.NSColor.colorWithCalibratedRed_green_blue_alpha_(*backgroundColor).set()
+    linePath.fill()
+    AppKit.NSColor.colorWithCalibratedRed_green_blue_alpha_(*color).set()
+    linePath.stroke()
+    image.unlockFocus()
+    return image
+
+def _drawHUDEditButtonImage(color, backgroundColor):
+    image = AppKit.NSImage.alloc().initWithSize_((20, 20))
+    linePath = AppKit.NSBezierPath.bezierPathWithOvalInRect_(((2, 2), (16, 16)))
+    linePath.setLineWidth_(1)
+    linePath.setLineCapStyle_(AppKit.NSLineCapStyleRound)
+    fillPath = AppKit.NSBezierPath.bezierPath()
+    fillPath.appendBezierPathWithOvalInRect_(((6, 9), (2, 2)))
+    fillPath.appendBezierPathWithOvalInRect_(((9, 9), (2, 2)))
+    fillPath.appendBezierPathWithOvalInRect_(((12, 9), (2, 2)))
+    image.lockFocus()
+    AppKit.NSColor.colorWithCalibratedRed_green_blue_alpha_(*backgroundColor).set()
+    linePath.fill()
+    AppKit.NSColor.colorWithCalibratedRed_green_blue_alpha_(*color).set()
+    linePath.stroke()
+    fillPath.fill()
+    image.unlockFocus()
+    return image
+
+# Text
+# ----
+
+_hudFontCache = {}
+
+def getHUDFont(weight, figureStyle, pointSize):
+    key = (weight, figureStyle, pointSize)
+    if key not in _hudFontCache:
+        _hudFontCache[key] = merz.text.makeFont(
+            "system",
+            weight=weight,
+            figureStyle=figureStyle,
+            pointSize=pointSize,
+        )
+    return _hudFontCache[key]
+
+_textWidthCache = {}
+
 def calculateTextWidth(text, font):
-    attrs = {
-        AppKit.NSFontAttributeName : font
-    }
-    s = AppKit.NSAttributedString.alloc().initWithString_attributes_(text, attrs)
-    width = s.size()[0]
+    key = (text, font.fontName(), font.pointSize())
+    width = _textWidthCache.get(key)
+    if width is None:
+        attrs = {
+            AppKit.NSFontAttributeName : font
+        }
+        s = AppKit.NSAttributedString.alloc().initWithString_attributes_(text, attrs)
+        width = s.size()[0]
+        _textWidthCache[key] = width
     return width
 
 
@@ -2254,7 +3191,79 @@ def calculateTextWidth(text, font):
 # --
 
 def main():
+    try:
+        subscriber.registerSubscriberEvent(
+            subscriberEventName=extensionID + ".measurementsChanged",
+            methodName="fontMeasurementsChanged",
+            lowLevelEventNames=[extensionID + ".measurementsChanged"],
+            dispatcher="roboFont",
+            delay=0.1
+        )
+    except AssertionError:
+        pass
     subscriber.registerGlyphEditorSubscriber(LaserMeasureSubscriber)
+    if LaserMeasureSubscriber.debug:
+        writeImportTimeReport(time.perf_counter() - _moduleImportStart)
+
+# Import Time Report
+# ------------------
+#
+# With the debug flag on, this writes a breakdown of what
+# the launch cost and what each deferred part costs on
+# first use. It is the same idea as python -X importtime
+# but limited to the things this extension controls. A
+# deferred module that costs nothing was loaded earlier
+# and the report says by what: something before this
+# extension launched, the launch itself or one of the
+# deferred modules listed before it. The report is
+# written to LaserMeasureImportTimes.txt in the
+# temporary directory.
+
+importTimeReportFileName = "LaserMeasureImportTimes.txt"
+
+def writeImportTimeReport(launchDuration, path=None):
+    if path is None:
+        path = os.path.join(tempfile.gettempdir(), importTimeReportFileName)
+    lines = [
+        f"{'ms':>10}  item",
+        f"{launchDuration * 1000:10.3f}  launch (module import + registration)",
+        "",
+        "deferred until first use:"
+    ]
+    total = 0
+    # module names and the deferred module
+    # that imported them
+    importedBy = {}
+    for module in deferredModules:
+        name = module._deferredName
+        note = ""
+        if name in _modulesBeforeLaunch:
+            note = " (imported before launch)"
+        elif name in importedBy:
+            note = f" (imported by {importedBy[name]})"
+        elif name in sys.modules:
+            note = " (imported during launch)"
+        modulesBefore = set(sys.modules)
+        start = time.perf_counter()
+        module.load()
+        duration = time.perf_counter() - start
+        total += duration
+        for imported in set(sys.modules) - modulesBefore:
+            importedBy[imported] = name
+        lines.append(f"{duration * 1000:10.3f}  import {name}{note}")
+    for name, function in (
+            ("representation factories", registerRepresentationFactories),
+            ("cursor", getMainCursor),
+            ("empty path", getEmptyPath)
+        ):
+        start = time.perf_counter()
+        function()
+        duration = time.perf_counter() - start
+        total += duration
+        lines.append(f"{duration * 1000:10.3f}  build {name}")
+    lines.append(f"{total * 1000:10.3f}  total deferred")
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
 
 if __name__ == "__main__":
     if AppKit.NSUserName() in ("tal", "talleming"):
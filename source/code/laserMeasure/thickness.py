@@ -0,0 +1,408 @@
+import math
+from array import array
+from .intersection import (
+    segmentPieces,
+    axisIntersectionHits,
+    rayIntersectionHits,
+    evaluateSegment
+)
+
+# ---------
+# Thickness
+# ---------
+#
+# The stroke thickness at a point on the outline is
+# the distance along the outline's normal, into the
+# ink, to the next place where the outline is crossed.
+#
+# An OutlineIndex is built once per glyph change. It
+# holds the segments, their control point bounds and
+# a flattened copy of the outline. The nearest point
+# on the outline is found by projecting onto the
+# flattened copy of the segments whose bounds are near
+# enough to matter and is then refined on the real
+# segment with Newton steps. Quadratic segments are
+# handled natively.
+#
+# Inside and outside follow the nonzero winding rule,
+# so overlapping contours, which are common in UFO
+# sources, are treated as one shape.
+#
+# Nothing in here may import from subscriber.py.
+
+flatteningStep = 8
+minimumSegmentSamples = 4
+maximumSegmentSamples = 64
+newtonIterations = 4
+insideTestOffset = 0.5
+selfHitTolerance = 0.01
+fieldSpacing = 10
+
+
+class OutlineIndex:
+
+    """
+    segments is a list of objects with .type and .original
+    (for example, the ones made by RelativeSegmentsPen).
+    Quadratic splines are split into their pieces, so the
+    segment indexes refer to those pieces.
+    """
+
+    def __init__(self, segments):
+        self.segments = segmentPieces(segments)
+        self.bounds = []
+        self.sampleXs = array("d")
+        self.sampleYs = array("d")
+        self.sampleTs = array("d")
+        self.sampleStarts = array("i")
+        # set by computeThicknessField
+        self.thicknessField = None
+        for index, (segmentType, points) in enumerate(self.segments):
+            self.sampleStarts.append(len(self.sampleXs))
+            xs = [x for (x, y) in points]
+            ys = [y for (x, y) in points]
+            self.bounds.append((min(xs), min(ys), max(xs), max(ys)))
+            polygonLength = sum(
+                math.hypot(x2 - x1, y2 - y1)
+                for ((x1, y1), (x2, y2)) in zip(points, points[1:])
+            )
+            if segmentType == "line":
+                count = 1
+            else:
+                count = int(polygonLength / flatteningStep)
+                count = min(maximumSegmentSamples, max(minimumSegmentSamples, count))
+            for i in range(count + 1):
+                t = i / count
+                self.sampleXs.append(evaluateSegment(segmentType, xs, t))
+                self.sampleYs.append(evaluateSegment(segmentType, ys, t))
+                self.sampleTs.append(t)
+        self.sampleStarts.append(len(self.sampleXs))
+
+    def __len__(self):
+        return len(self.segments)
+
+    # Nearest Point
+
+    def nearestPoint(self, point, maximumDistance=None):
+        """
+        Return (segmentIndex, t, point, tangent) for the
+        point on the outline nearest to point. None is
+        returned if nothing is within maximumDistance.
+        """
+        if not self.segments:
+            return None
+        x, y = point
+        best = None
+        bestDistance = None
+        limit = None
+        if maximumDistance is not None:
+            limit = maximumDistance ** 2
+        sampleXs = self.sampleXs
+        sampleYs = self.sampleYs
+        sampleStarts = self.sampleStarts
+        for segmentIndex, (xMin, yMin, xMax, yMax) in enumerate(self.bounds):
+            # a segment lies within its control point
+            # bounds, so it can be skipped if the bounds
+            # are farther away than maximumDistance or
+            # the best so far.
+            bx = max(xMin - x, 0, x - xMax)
+            by = max(yMin - y, 0, y - yMax)
+            boundsDistance = bx * bx + by * by
+            if limit is not None and boundsDistance > limit:
+                continue
+            if bestDistance is not None and boundsDistance > bestDistance:
+                continue
+            # project onto the segment's flattened edges
+            for i in range(sampleStarts[segmentIndex], sampleStarts[segmentIndex + 1] - 1):
+                x1 = sampleXs[i]
+                y1 = sampleYs[i]
+                ex = sampleXs[i + 1] - x1
+                ey = sampleYs[i + 1] - y1
+                length = ex * ex + ey * ey
+                f = 0
+                if length:
+                    f = ((x - x1) * ex + (y - y1) * ey) / length
+                    f = min(1, max(0, f))
+                px = x1 + ex * f
+                py = y1 + ey * f
+                distance = (px - x) ** 2 + (py - y) ** 2
+                if bestDistance is None or distance < bestDistance:
+                    bestDistance = distance
+                    t1 = self.sampleTs[i]
+                    t2 = self.sampleTs[i + 1]
+                    best = (segmentIndex, t1 + (t2 - t1) * f)
+        if best is None:
+            return None
+        segmentIndex, t = best
+        segmentType, points = self.segments[segmentIndex]
+        t = _refineNearestT(segmentType, points, (x, y), t)
+        nearest = _evaluatePoint(segmentType, points, t)
+        if maximumDistance is not None:
+            if math.hypot(nearest[0] - x, nearest[1] - y) > maximumDistance:
+                return None
+        tangent = _tangent(segmentType, points, t)
+        if tangent is None:
+            return None
+        return segmentIndex, t, nearest, tangent
+
+    # Inside
+
+    def winding(self, point):
+        """
+        The winding number of the outline around point,
+        found with a horizontal line to the right.
+        """
+        x, y = point
+        winding = 0
+        for position, index, t in axisIntersectionHits(self.segments, y, 1):
+            if position > x:
+                winding += self._crossingDirection(index, t, (1, 0))
+        return winding
+
+    def pointInside(self, point):
+        """
+        Nonzero winding test.
+        """
+        return self.winding(point) != 0
+
+    def _crossingDirection(self, segmentIndex, t, direction):
+        # 1 if the segment crosses a line going in
+        # direction from right to left, -1 if it
+        # crosses from left to right and 0 if it
+        # only touches the line.
+        segmentType, points = self.segments[segmentIndex]
+        tangent = _tangent(segmentType, points, t)
+        if tangent is None:
+            return 0
+        dx, dy = direction
+        tx, ty = tangent
+        cross = dx * ty - dy * tx
+        if cross > 0:
+            return 1
+        elif cross < 0:
+            return -1
+        return 0
+
+    # Thickness
+
+    def measureThickness(self, point, maximumDistance=None):
+        """
+        Find the stroke thickness at the point on the
+        outline nearest to point. Returns a tuple of
+        (start, end, thickness) or None.
+        """
+        nearest = self.nearestPoint(point, maximumDistance)
+        if nearest is None:
+            return None
+        segmentIndex, t, start, (tx, ty) = nearest
+        normal = (-ty, tx)
+        sx, sy = start
+        # point the normal into the ink
+        testPoint = (sx + normal[0] * insideTestOffset, sy + normal[1] * insideTestOffset)
+        if not self.pointInside(testPoint):
+            normal = (ty, -tx)
+            testPoint = (sx + normal[0] * insideTestOffset, sy + normal[1] * insideTestOffset)
+            if not self.pointInside(testPoint):
+                return None
+        return self.castNormal(start, normal)
+
+    def castNormal(self, start, normal):
+        # The ray is infinite, so the winding beyond the
+        # last hit is zero and the winding just past the
+        # start is the sum of the crossings after it. The
+        # stroke ends where the winding gets back to zero,
+        # which skips the edges of overlapping contours.
+        hits = [
+            (distance, self._crossingDirection(segmentIndex, t, normal))
+            for (distance, segmentIndex, t) in rayIntersectionHits(self.segments, start, normal, self.bounds)
+            if distance > selfHitTolerance
+        ]
+        winding = sum(direction for (distance, direction) in hits)
+        if not winding:
+            return None
+        for distance, direction in hits:
+            winding -= direction
+            if winding:
+                continue
+            nx, ny = normal
+            sx, sy = start
+            end = (sx + nx * distance, sy + ny * distance)
+            return start, end, distance
+        return None
+
+
+def _evaluatePoint(segmentType, points, t):
+    xs = [x for (x, y) in points]
+    ys = [y for (x, y) in points]
+    return (
+        evaluateSegment(segmentType, xs, t),
+        evaluateSegment(segmentType, ys, t)
+    )
+
+def _derivatives(segmentType, values, t):
+    mt = 1 - t
+    if segmentType == "line":
+        v0, v1 = values
+        return v1 - v0, 0
+    elif segmentType == "qcurve":
+        v0, v1, v2 = values
+        first = 2 * mt * (v1 - v0) + 2 * t * (v2 - v1)
+        second = 2 * (v2 - 2 * v1 + v0)
+        return first, second
+    v0, v1, v2, v3 = values
+    first = (
+        3 * mt * mt * (v1 - v0)
+        + 6 * mt * t * (v2 - v1)
+        + 3 * t * t * (v3 - v2)
+    )
+    second = (
+        6 * mt * (v2 - 2 * v1 + v0)
+        + 6 * t * (v3 - 2 * v2 + v1)
+    )
+    return first, second
+
+def _refineNearestT(segmentType, points, point, t):
+    # Newton's method on the derivative of the
+    # squared distance to the point.
+    if segmentType == "line":
+        return t
+    px, py = point
+    xs = [x for (x, y) in points]
+    ys = [y for (x, y) in points]
+    for i in range(newtonIterations):
+        x = evaluateSegment(segmentType, xs, t)
+        y = evaluateSegment(segmentType, ys, t)
+        dx, ddx = _derivatives(segmentType, xs, t)
+        dy, ddy = _derivatives(segmentType, ys, t)
+        numerator = (x - px) * dx + (y - py) * dy
+        denominator = dx * dx + dy * dy + (x - px) * ddx + (y - py) * ddy
+        if denominator == 0:
+            break
+        t = min(1, max(0, t - numerator / denominator))
+    return t
+
+def _tangent(segmentType, points, t):
+    xs = [x for (x, y) in points]
+    ys = [y for (x, y) in points]
+    dx = _derivatives(segmentType, xs, t)[0]
+    dy = _derivatives(segmentType, ys, t)[0]
+    length = math.hypot(dx, dy)
+    if not length:
+        # retracted handles have no derivative at
+        # the ends, so use the chord instead.
+        (x1, y1) = points[0]
+        (x2, y2) = points[-1]
+        dx = x2 - x1
+        dy = y2 - y1
+        length = math.hypot(dx, dy)
+        if not length:
+            return None
+    return (dx / length, dy / length)
+
+
+# Field
+# -----
+#
+# The thickness field samples the whole outline at
+# regular arc length intervals. The arc length comes
+# from the flattened outline and the ink side is only
+# tested once per segment. The result is stored on the
+# OutlineIndex so that it lives exactly as long as the
+# glyph geometry that it was made from. This may be
+# called from a thread other than the main thread.
+# isCurrent is an optional function that is checked
+# between segments. When it returns False the work is
+# abandoned, nothing is stored and None is returned.
+
+class ThicknessField:
+
+    """
+    pieces is a list of ((x1, y1), (x2, y2), thickness)
+    tuples that cover the outline. thickness is None if
+    it couldn't be measured. minimum and maximum are the
+    extremes of the measured thicknesses (or None).
+    """
+
+    def __init__(self, pieces):
+        self.pieces = pieces
+        values = [value for (start, end, value) in pieces if value is not None]
+        self.minimum = None
+        self.maximum = None
+        if values:
+            self.minimum = min(values)
+            self.maximum = max(values)
+
+
+def computeThicknessField(outlineIndex, spacing=fieldSpacing, isCurrent=None):
+    if outlineIndex.thicknessField is not None:
+        return outlineIndex.thicknessField
+    pieces = []
+    for index, (segmentType, points) in enumerate(outlineIndex.segments):
+        if isCurrent is not None and not isCurrent():
+            return None
+        ts = _arcLengthParameters(outlineIndex, index, spacing)
+        side = _inkSide(outlineIndex, segmentType, points, ts[len(ts) // 2])
+        samples = []
+        for t in ts:
+            point = _evaluatePoint(segmentType, points, t)
+            value = None
+            tangent = _tangent(segmentType, points, t)
+            if side and tangent is not None:
+                tx, ty = tangent
+                found = outlineIndex.castNormal(point, (-ty * side, tx * side))
+                if found is not None:
+                    value = found[2]
+            samples.append((point, value))
+        for (start, value1), (end, value2) in zip(samples, samples[1:]):
+            if value1 is None or value2 is None:
+                value = value1 if value2 is None else value2
+            else:
+                value = (value1 + value2) / 2
+            pieces.append((start, end, value))
+    field = ThicknessField(pieces)
+    outlineIndex.thicknessField = field
+    return field
+
+def _arcLengthParameters(outlineIndex, segmentIndex, spacing):
+    start = outlineIndex.sampleStarts[segmentIndex]
+    end = outlineIndex.sampleStarts[segmentIndex + 1]
+    xs = outlineIndex.sampleXs
+    ys = outlineIndex.sampleYs
+    sampleTs = outlineIndex.sampleTs
+    lengths = [0]
+    for i in range(start, end - 1):
+        lengths.append(lengths[-1] + math.hypot(xs[i + 1] - xs[i], ys[i + 1] - ys[i]))
+    total = lengths[-1]
+    count = max(1, int(round(total / spacing)))
+    ts = []
+    j = 0
+    for i in range(count + 1):
+        target = total * i / count
+        while j < len(lengths) - 2 and lengths[j + 1] < target:
+            j += 1
+        length = lengths[j + 1] - lengths[j]
+        f = 0
+        if length:
+            f = (target - lengths[j]) / length
+        t1 = sampleTs[start + j]
+        t2 = sampleTs[start + j + 1]
+        ts.append(t1 + (t2 - t1) * f)
+    return ts
+
+def _inkSide(outlineIndex, segmentType, points, t):
+    # 1 if the ink is on the left of the
+    # segment's direction, -1 if it is on
+    # the right and 0 if it can't be found.
+    tangent = _tangent(segmentType, points, t)
+    if tangent is None:
+        return 0
+    tx, ty = tangent
+    x, y = _evaluatePoint(segmentType, points, t)
+    for side in (1, -1):
+        testPoint = (
+            x - ty * side * insideTestOffset,
+            y + tx * side * insideTestOffset
+        )
+        if outlineIndex.pointInside(testPoint):
+            return side
+    return 0
@@ -0,0 +1,470 @@
+import gzip
+import json
+import time
+import argparse
+from .audit import (
+    makeGlyphSnapshot,
+    drawSnapshot
+)
+from .geometry import CombinedGeometryPointPen
+from .intersection import (
+    FlattenedOutline,
+    getFlatteningTolerance
+)
+from .profiles import OutlineProfile
+from .thickness import OutlineIndex
+
+# -----
+# Trace
+# -----
+#
+# A session trace is the sequence of events that drove
+# the measurements in a glyph editor: mouse moves, trigger
+# key downs and key ups with the modifier keys and the
+# view scale, plus a snapshot of the glyph (see audit.py)
+# whenever the glyph changed. The subscriber records one
+# with the debug flag on. Each event also has the time
+# that the subscriber spent handling it.
+#
+# The file is gzipped JSON lines. The first line is a
+# header and each following line is one event. Each
+# write appends the events recorded since the last write
+# as a new gzip member, which gzip reads as one stream.
+#
+#     [kind, time, duration, payload]
+#
+# time is seconds since the trace was started and
+# duration is seconds or null. The payloads are:
+#
+#     glyph     {name, width, contours, metrics}
+#     settings  {name : value}
+#     keyDown   [character, scale, modifiers]
+#     keyUp     [character, scale, modifiers]
+#     mouseMove [x, y, scale, modifiers]
+#     dropped   count
+#
+# At most maximumTraceEvents are held between writes.
+# The ones past that are counted in a dropped event.
+#
+# modifiers is a string with "o" (option), "s" (shift),
+# "c" (command) and "t" (control) for the keys that
+# were down.
+#
+# The replayer drives the headless engines through the
+# same events and times each one. The tests that need
+# RoboFont (anchors, segments and point pairs) and the
+# italic angle aren't replayed. A mouse move that is
+# followed by a pause of at least refinementDelay is also
+# measured exactly, as the subscriber does when the
+# cursor rests.
+#
+#     python -m laserMeasure.trace LaserMeasureTrace.json.gz
+#
+# Nothing in here may import from subscriber.py.
+
+traceFormatVersion = 1
+maximumTraceEvents = 100000
+defaultSlowestCount = 10
+
+# same as subscriber.thicknessHitRadius
+thicknessHitRadius = 25
+# same as LaserMeasureSubscriber.refinementDelay
+refinementDelay = 0.1
+handleHitRadius = 5
+
+modifierKeys = (
+    ("optionDown", "o"),
+    ("shiftDown", "s"),
+    ("commandDown", "c"),
+    ("controlDown", "t")
+)
+
+
+def makeModifierString(deviceState):
+    """
+    Return the modifiers string for a mojo deviceState.
+    """
+    if deviceState is None:
+        return ""
+    return "".join(
+        code for (key, code) in modifierKeys
+        if deviceState.get(key)
+    )
+
+
+# Recording
+# ---------
+
+class SessionTrace:
+
+    def __init__(self):
+        self.events = []
+        self.dropped = 0
+        self.startTime = time.perf_counter()
+        self.writtenPath = None
+
+    def __len__(self):
+        return len(self.events)
+
+    def record(self, kind, payload, start=None):
+        """
+        Add an event. start is the time.perf_counter()
+        value from when the handling of the event started.
+        The duration is the time from then to now.
+        """
+        now = time.perf_counter()
+        if len(self.events) >= maximumTraceEvents:
+            self.dropped += 1
+            return
+        duration = None
+        if start is None:
+            start = now
+        else:
+            duration = round(now - start, 7)
+        self.events.append((kind, round(start - self.startTime, 4), duration, payload))
+
+    def recordGlyph(self, glyph, glyphSet, info):
+        """
+        Add a snapshot of glyph. Components are decomposed
+        with the glyphs in glyphSet. The vertical metrics
+        are taken from info.
+        """
+        payload = dict(
+            name=glyph.name,
+            width=glyph.width,
+            contours=makeGlyphSnapshot(glyph, glyphSet),
+            metrics=dict(
+                unitsPerEm=info.unitsPerEm,
+                ascender=info.ascender,
+                descender=info.descender
+            )
+        )
+        self.record("glyph", payload)
+
+    def write(self, path):
+        """
+        Write the events recorded since the last write
+        and release them. The first write to path starts
+        a new file with the header and the later ones
+        append to it.
+        """
+        items = []
+        mode = "at"
+        if path != self.writtenPath:
+            mode = "wt"
+            items.append(dict(
+                format="laserMeasureTrace",
+                version=traceFormatVersion
+            ))
+        items.extend(self.events)
+        if self.dropped:
+            items.append(("dropped", round(time.perf_counter() - self.startTime, 4), None, self.dropped))
+        with gzip.open(path, mode, encoding="utf-8") as f:
+            for item in items:
+                f.write(json.dumps(item, separators=(",", ":")))
+                f.write("\n")
+        self.writtenPath = path
+        self.events = []
+        self.dropped = 0
+
+
+def readTrace(path):
+    """
+    Return (header, events) from a trace file. The
+    dropped events are totaled in the header.
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        lines = [line for line in f if line.strip()]
+    if not lines:
+        raise ValueError(f"{path} is empty.")
+    header = json.loads(lines[0])
+    if header.get("format") != "laserMeasureTrace":
+        raise ValueError(f"{path} is not a Laser Measure trace.")
+    if header.get("version", 0) > traceFormatVersion:
+        raise ValueError(f"{path} was written by a newer version.")
+    events = []
+    dropped = header.get("dropped", 0)
+    for line in lines[1:]:
+        event = tuple(json.loads(line))
+        if event[0] == "dropped":
+            dropped += event[3]
+            continue
+        events.append(event)
+    header["dropped"] = dropped
+    return header, events
+
+
+# Replaying
+# ---------
+
+class ReplayGlyph:
+
+    """
+    The headless equivalent of the glyph representations.
+    Everything is built the first time it is needed, so the
+    cost lands on the same event that would have built
+    the representation in RoboFont.
+    """
+
+    def __init__(self, payload):
+        self.name = payload["name"]
+        self.width = payload["width"]
+        self.contours = tuple(
+            tuple(tuple(point) for point in contour)
+            for contour in payload["contours"]
+        )
+        self.metrics = payload["metrics"]
+        self._geometry = None
+        self._profile = None
+        self._outlineIndex = None
+        self._flattenedOutlines = {}
+
+    def _get_geometry(self):
+        if self._geometry is None:
+            pen = CombinedGeometryPointPen()
+            drawSnapshot(self.contours, pen)
+            self._geometry = pen.getCombinedGeometry()
+        return self._geometry
+
+    geometry = property(_get_geometry)
+
+    def _get_segments(self):
+        return self.geometry.segments
+
+    segments = property(_get_segments)
+
+    def _get_handleLines(self):
+        return self.geometry.handleLines
+
+    handleLines = property(_get_handleLines)
+
+    def _get_profile(self):
+        if self._profile is None:
+            self._profile = OutlineProfile(self.segments)
+        return self._profile
+
+    profile = property(_get_profile)
+
+    def _get_outlineIndex(self):
+        if self._outlineIndex is None:
+            self._outlineIndex = OutlineIndex(self.segments)
+        return self._outlineIndex
+
+    outlineIndex = property(_get_outlineIndex)
+
+    def getFlattenedOutline(self, scale):
+        tolerance = getFlatteningTolerance(scale)
+        if tolerance not in self._flattenedOutlines:
+            self._flattenedOutlines[tolerance] = FlattenedOutline(self.segments, tolerance)
+        return self._flattenedOutlines[tolerance]
+
+
+class TraceReplayer:
+
+    def __init__(self):
+        self.settings = dict(
+            triggerCharacter="d",
+            testOffCurves=True,
+            testThickness=False,
+            testGeneral=True,
+            showSidebearings=False
+        )
+        self.glyph = None
+        self.wantsMeasurements = False
+        self.point = (0, 0)
+
+    def replay(self, events):
+        """
+        Replay the events and return a list of dicts:
+
+            {
+                index : event index,
+                kind : event kind or "refine",
+                time : recorded time,
+                recorded : recorded duration or None,
+                replayed : replayed duration,
+                result : what was found or None
+            }
+        """
+        rows = []
+        for index, (kind, eventTime, duration, payload) in enumerate(events):
+            method = getattr(self, "replay_" + kind, None)
+            if method is None:
+                continue
+            start = time.perf_counter()
+            result = method(payload)
+            replayed = time.perf_counter() - start
+            rows.append(dict(
+                index=index,
+                kind=kind,
+                time=eventTime,
+                recorded=duration,
+                replayed=replayed,
+                result=result
+            ))
+            if kind != "mouseMove" or not self.wantsMeasurements:
+                continue
+            if index + 1 < len(events) and events[index + 1][1] - eventTime < refinementDelay:
+                continue
+            start = time.perf_counter()
+            result = self.measure(payload[2], provisional=False)
+            replayed = time.perf_counter() - start
+            rows.append(dict(
+                index=index,
+                kind="refine",
+                time=eventTime + refinementDelay,
+                recorded=None,
+                replayed=replayed,
+                result=result
+            ))
+        return rows
+
+    def replay_settings(self, payload):
+        self.settings.update(payload)
+
+    def replay_glyph(self, payload):
+        self.glyph = ReplayGlyph(payload)
+
+    def replay_keyDown(self, payload):
+        character, scale, modifiers = payload
+        if character != self.settings["triggerCharacter"]:
+            self.wantsMeasurements = False
+            return None
+        self.wantsMeasurements = True
+        return self.measure(scale, provisional=False)
+
+    def replay_keyUp(self, payload):
+        character, scale, modifiers = payload
+        if character == self.settings["triggerCharacter"]:
+            self.wantsMeasurements = False
+
+    def replay_mouseMove(self, payload):
+        x, y, scale, modifiers = payload
+        self.point = (x, y)
+        if not self.wantsMeasurements:
+            return None
+        return self.measure(scale, provisional=True)
+
+    def measure(self, scale, provisional):
+        """
+        Run the headless tests in the subscriber's
+        order and return the kind that was found.
+        """
+        glyph = self.glyph
+        if glyph is None or not glyph.contours:
+            return None
+        settings = self.settings
+        point = self.point
+        found = None
+        if settings["testOffCurves"]:
+            if glyph.handleLines.find(point, handleHitRadius / scale) is not None:
+                found = "handle"
+        if found is None and settings["testThickness"]:
+            if glyph.outlineIndex.measureThickness(point, thicknessHitRadius / scale) is not None:
+                found = "thickness"
+        if found is None and settings["testGeneral"]:
+            self._measureOutline(glyph, point, scale, provisional)
+            found = "outline"
+        if settings["showSidebearings"]:
+            glyph.profile.sidebearingsAt(point[1], glyph.width)
+        return found
+
+    def _measureOutline(self, glyph, point, scale, provisional):
+        # same lines as LaserMeasureSubscriber.measureOutline
+        x, y = point
+        metrics = glyph.metrics
+        unitsPerEm = metrics["unitsPerEm"]
+        xLine = ((-unitsPerEm, y), (glyph.width + unitsPerEm, y))
+        yLine = ((x, metrics["descender"] - unitsPerEm), (x, metrics["ascender"] + unitsPerEm))
+        flattenedOutline = glyph.getFlattenedOutline(scale)
+        flattenedOutline.adjacentHits(xLine, x, 0, approximate=provisional)
+        flattenedOutline.adjacentHits(yLine, y, 1, approximate=provisional)
+
+
+def replayTrace(path):
+    """
+    Replay the trace at path and return
+    the rows from TraceReplayer.replay.
+    """
+    header, events = readTrace(path)
+    return TraceReplayer().replay(events)
+
+
+# Report
+# ------
+
+def summarizeReplay(rows):
+    """
+    Return a dict of event kinds and dicts
+    of count, median, p95 and max durations.
+    """
+    durations = {}
+    for row in rows:
+        if row["kind"] in ("glyph", "settings"):
+            continue
+        durations.setdefault(row["kind"], []).append(row["replayed"])
+    summary = {}
+    for kind, values in durations.items():
+        values.sort()
+        summary[kind] = dict(
+            count=len(values),
+            median=values[len(values) // 2],
+            p95=values[min(len(values) - 1, int(len(values) * 0.95))],
+            max=values[-1]
+        )
+    return summary
+
+def formatReplayReport(rows, slowestCount=defaultSlowestCount):
+    lines = [f"{'kind':<10} {'count':>6} {'median ms':>10} {'p95 ms':>10} {'max ms':>10}"]
+    for kind, values in sorted(summarizeReplay(rows).items()):
+        lines.append(
+            f"{kind:<10} {values['count']:>6} "
+            f"{values['median'] * 1000:>10.3f} "
+            f"{values['p95'] * 1000:>10.3f} "
+            f"{values['max'] * 1000:>10.3f}"
+        )
+    measured = [row for row in rows if row["kind"] not in ("glyph", "settings")]
+    measured.sort(key=lambda row: -row["replayed"])
+    if measured and slowestCount:
+        lines.append("")
+        lines.append("slowest:")
+        lines.append(f"{'event':>7} {'time s':>9} {'kind':<10} {'replay ms':>10} {'recorded ms':>12}  result")
+        for row in measured[:slowestCount]:
+            recorded = "–"
+            if row["recorded"] is not None:
+                recorded = f"{row['recorded'] * 1000:.3f}"
+            lines.append(
+                f"{row['index']:>7} {row['time']:>9.3f} {row['kind']:<10} "
+                f"{row['replayed'] * 1000:>10.3f} {recorded:>12}  {row['result'] or '–'}"
+            )
+    return "\n".join(lines)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        prog="lasermeasure-trace",
+        description="Replay Laser Measure session traces and report the time spent on each event."
+    )
+    parser.add_argument(
+        "paths",
+        nargs="+",
+        help="Trace paths."
+    )
+    parser.add_argument(
+        "--slowest",
+        type=int,
+        default=defaultSlowestCount,
+        help="Number of slowest events to list."
+    )
+    args = parser.parse_args(args)
+    for path in args.paths:
+        header, events = readTrace(path)
+        rows = TraceReplayer().replay(events)
+        print(path)
+        if header.get("dropped"):
+            print(f"{header['dropped']} events were dropped while recording.")
+        print(formatReplayReport(rows, slowestCount=args.slowest))
+
+
+if __name__ == "__main__":
+    main()
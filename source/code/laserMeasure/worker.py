@@ -0,0 +1,103 @@
+import threading
+import traceback
+
+# ------
+# Worker
+# ------
+#
+# Exact measurements can be made off the main thread.
+# The worker is only given objects that are never changed
+# after they are made: the representations that the
+# engines are built from (FlattenedOutline, OutlineIndex,
+# OutlineProfile) are replaced when the glyph changes,
+# not edited. Everything that needs defcon, such as the
+# fallbacks from the font info and the representations
+# themselves, is gathered on the main thread before a
+# query is submitted.
+#
+# Only the newest query matters. A query that hasn't
+# started is replaced when a newer one is submitted and
+# the result of a query that was superseded while it
+# was running is dropped. The results are handed back
+# with deliver, which should call its arguments on the
+# main thread (for example, AppHelper.callAfter.)
+#
+# A query that raises an exception is delivered with
+# None as the result, so the caller doesn't wait for it
+# forever, and the worker carries on with the next one.
+# The traceback is given to report, if there is one.
+#
+# Nothing in here may import from subscriber.py.
+
+
+class MeasurementWorker:
+
+    def __init__(self, deliver, report=None):
+        self.deliver = deliver
+        self.report = report
+        self._condition = threading.Condition()
+        self._pending = None
+        self._generation = None
+        self._stopped = False
+        self._thread = None
+
+    def submit(self, generation, function, args, callback):
+        """
+        Call function(*args) in the worker thread and
+        then callback(generation, result) with deliver.
+        result is None if function raised an exception.
+        generation identifies the query. The callback
+        isn't called if a query with a different
+        generation is submitted before the result is
+        ready.
+        """
+        with self._condition:
+            if self._stopped:
+                return
+            self._generation = generation
+            self._pending = (generation, function, args, callback)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    daemon=True
+                )
+                self._thread.start()
+            self._condition.notify()
+
+    def cancel(self):
+        """
+        Drop the pending query and the result
+        of the running query.
+        """
+        with self._condition:
+            self._generation = None
+            self._pending = None
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._generation = None
+            self._pending = None
+            self._condition.notify()
+
+    def isCurrent(self, generation):
+        with self._condition:
+            return generation == self._generation
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is None and not self._stopped:
+                    self._condition.wait()
+                if self._stopped:
+                    return
+                generation, function, args, callback = self._pending
+                self._pending = None
+            try:
+                result = function(*args)
+            except Exception:
+                result = None
+                if self.report is not None:
+                    self.report(traceback.format_exc())
+            if self.isCurrent(generation):
+                self.deliver(callback, generation, result)